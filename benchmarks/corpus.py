@@ -0,0 +1,107 @@
+"""
+Synthetic listing corpora for the benchmarks.
+
+Every listing is one line shaped like the real samples: optional country prefix, channel name and
+number, a title split by |/-/: separators, one or two times with ET/UK markers and a date.
+Times and dates are drawn from templates covering every time_formats/date_formats entry of config.json.
+"""
+import json
+import os
+import random
+import re
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "bin", "config.json")
+
+CHANNELS = ["SKY SPORTS", "ESPN", "BBC ONE", "FOX", "TSN", "DAZN", "NBC", "CBS", "beIN SPORTS", "Channel Seven", "TNT SPORTS", "Peacock"]
+PREFIXES = ["", "", "", "US| ", "UK: ", "CA - "]
+LEAGUES = ["Premier League", "NFL", "NBA", "NHL", "Champions League", "College Football", "Boxing", "UFC", "La Liga", "MLB"]
+TEAMS = ["Arsenal", "Chelsea", "Chiefs", "Bills", "Lakers", "Celtics", "Leafs", "Habs", "Real Madrid", "Barcelona", "Yankees", "Red Sox"]
+EXTRAS = ["", "", "(HD)", "[4K]", "Live", "Replay"]
+TITLE_SEPARATORS = ["|", "-", ":"]
+TIMEZONES = ["ET", "UK", "EST"]
+
+# Placeholders: {H} 0-23, {h} 1-12, {MM} minutes, {ap} am/pm, {AP} AM/PM
+TIME_TEMPLATES = [
+    "{H}:{MM}", "{h}:{MM} {AP}", "{h}:{MM}{ap}", "{h}:{MM} {ap}", "{H}-{MM}", "{h}-{MM} {ap}",
+    "{H}.{MM}", "{h}.{MM}{ap}", "{h}{AP}", "{h}:{MM}{AP}",
+]
+# Placeholders: {dow}/{Dow} short/long day, {mon}/{Mon} short/long month, {d} day, {dth} ordinal day, {m} month, {yyyy}, {yy}
+DATE_TEMPLATES = [
+    "{dow} {mon} {d}", "{Dow} {Mon} {d} {yyyy}", "{mon} {d}", "{Mon} {dth} {Dow} {yyyy}", "{d} {mon}",
+    "{d} {Mon} {yyyy}", "{dow} {d} {mon}", "{Dow} {dth} {Mon} {yyyy}", "{yyyy} {mon} {d}", "{mon} {dow} {d}",
+    "{d}/{m}/{yyyy}", "{d}-{m}-{yy}", "{yyyy}-{m}-{d}", "{d}/{m}", "{d} {m} {yyyy}",
+]
+
+def load_config(path=CONFIG_PATH):
+    with open(path, "r") as f:
+        return json.load(f)
+
+def _ordinal(day):
+    suffix = "th" if 10 <= day % 100 <= 20 else {1: "st", 2: "nd", 3: "rd"}.get(day % 10, "th")
+    return f"{day}{suffix}"
+
+def render_time(template, rng):
+    hour = rng.randint(0, 23)
+    return template.format(
+        H=f"{hour:02d}" if rng.random() < 0.5 else str(hour), h=str(hour % 12 or 12), MM=f"{rng.choice([0, 15, 30, 45, 5]):02d}",
+        ap=rng.choice(["am", "pm"]), AP=rng.choice(["AM", "PM"]),
+    )
+
+def render_date(template, config, rng):
+    weekday = rng.randrange(7)
+    month = rng.randrange(12)
+    day = rng.randint(1, 28)
+    year = rng.randint(2023, 2026)
+    return template.format(
+        dow=config["days"]["short"][weekday], Dow=config["days"]["long"][weekday],
+        mon=config["months"]["short"][month], Mon=config["months"]["long"][month],
+        d=str(day), dth=_ordinal(day), m=str(month + 1), yyyy=str(year), yy=f"{year % 100:02d}",
+    )
+
+def check_coverage(config, seed=0):
+    """Raise ValueError if a configured time/date format is not produced by any template."""
+    rng = random.Random(seed)
+    times = [render_time(t, rng) for t in TIME_TEMPLATES]
+    dates = [render_date(t, config, rng) for t in DATE_TEMPLATES]
+    for key, samples in (("time_formats", times), ("date_formats", dates)):
+        for fmt in config[key]:
+            if not any(re.fullmatch(fmt, s, re.IGNORECASE) for s in samples):
+                raise ValueError(f"No benchmark template produces {key} entry {fmt!r}")
+
+def make_listing(rng, config):
+    """
+    One synthetic listing.
+    Returns: (text, spans) with spans {"title"/"time"/"date": (start, end)} of the parts in text.
+    """
+    pieces = []
+    spans = {}
+
+    def add(part, field=None):
+        start = sum(len(p) for p in pieces)
+        pieces.append(part)
+        if field:
+            spans[field] = (start, start + len(part))
+
+    home, away = rng.sample(TEAMS, 2)
+    title_sep = rng.choice(TITLE_SEPARATORS)
+    add(f"{rng.choice(PREFIXES)}{rng.choice(CHANNELS)} {rng.randint(1, 99)} {title_sep} ")
+    if rng.random() < 0.6:
+        add(f"{rng.choice(LEAGUES)}{rng.choice([': ', ' - '])}")
+    add(f"{home} vs {away}", "title")
+    add(f" {rng.choice(TITLE_SEPARATORS)} ")
+    add(render_time(rng.choice(TIME_TEMPLATES), rng), "time")
+    add(f" {rng.choice(TIMEZONES)}")
+    if rng.random() < 0.4:
+        add(f" / {render_time(rng.choice(TIME_TEMPLATES), rng)} {rng.choice(TIMEZONES)}")
+    extra = rng.choice(EXTRAS)
+    if extra:
+        add(f" {extra}")
+    add(rng.choice([" ", " | ", " - "]))
+    add(render_date(rng.choice(DATE_TEMPLATES), config, rng), "date")
+    return "".join(pieces), spans
+
+def iter_listings(count, config, seed=0):
+    """Yield `count` synthetic listings as (text, spans), generated lazily so large corpora stay out of memory."""
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield make_listing(rng, config)
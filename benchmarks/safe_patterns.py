@@ -0,0 +1,150 @@
+"""
+Verify the backtracking-safe pattern mode against the standard generated patterns.
+
+    python -m benchmarks.safe_patterns [--lines 400] [--seed 0] [--sizes 40 80 1000 4000 16000]
+
+1. Equivalence: every anchored time/date pattern and title pattern shape (all separators,
+   separator counts 1-3, all config time/date formats) is generated in both modes and applied
+   to a synthetic single-line listings corpus; extracted values must be identical.
+2. Scaling: near-miss lines of growing length are searched with the safe patterns; the time
+   must grow linearly over the larger half of the sizes. The standard patterns are timed on the
+   short sizes only, for comparison.
+Exits with status 1 when a result differs or the safe patterns grow faster than linear.
+"""
+import argparse
+import math
+import random
+import timeit
+from bin.extract import extract_value
+from bin.patterns import SAFE_PATTERNS_SUPPORTED, anchored_field_pattern, title_field_pattern, compile_pattern
+from benchmarks.corpus import load_config
+
+# Growth exponent (log time / log length) above which the safe patterns count as super-linear
+MAX_SAFE_EXPONENT = 1.5
+# Standard patterns backtrack as n**(count+1); past this length a near-miss search takes minutes
+STANDARD_MAX_CHARS = 80
+
+WORDS = ["Arsenal", "Chelsea", "vs", "Live", "Final", "NBA", "Premier", "League", "HD", "Replay", "Sky", "Sports", "x", "4K"]
+TIMES = ["7:30 PM", "19:30", "8.15pm", "9-00 am", "12:45", "3pm", "10:05AM"]
+DATES = ["Sat 12 Oct", "Oct 12", "12 October", "Monday June 3rd 2024", "3/4", "12-10-2024", "Fri 1st Nov"]
+
+def corpus_lines(count, separators, seed=0):
+    """Single-line listings mixing words, separators, times, dates and timezone markers; some have no time/date."""
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(3, 12)):
+            roll = rng.random()
+            if roll < 0.45:
+                parts.append(rng.choice(WORDS))
+            elif roll < 0.75:
+                parts.append(rng.choice(separators))
+            elif roll < 0.87:
+                parts.append(rng.choice(TIMES))
+            else:
+                parts.append(rng.choice(DATES))
+        joiner = rng.choice([" ", "  ", ""])
+        lines.append(joiner.join(parts))
+    return lines
+
+def pattern_pairs(config):
+    """(field, standard, safe) for every generated pattern shape."""
+    separators = [item["symbol"] for item in config["separators"]]
+    pairs = []
+    for separator in separators:
+        for count in (1, 2, 3):
+            for field, formats in (("time", config["time_formats"]), ("date", config["date_formats"])):
+                for base_pattern in formats:
+                    pairs.append((field, anchored_field_pattern(separator, count, base_pattern, safe=False),
+                                  anchored_field_pattern(separator, count, base_pattern, safe=True)))
+            for closing_sep in separators:
+                pairs.append(("title", title_field_pattern(separator, count, closing_sep, safe=False),
+                              title_field_pattern(separator, count, closing_sep, safe=True)))
+    return pairs
+
+def extracted(regex, field, text):
+    match = regex.search(text)
+    return extract_value(field, match) if match else None
+
+def check_equivalence(pairs, lines):
+    """Returns (comparisons, mismatches) with mismatches as (field, standard, line, standard result, safe result)."""
+    comparisons = 0
+    mismatches = []
+    for field, standard, safe in pairs:
+        standard_regex = compile_pattern(standard)
+        safe_regex = compile_pattern(safe)
+        for text in lines:
+            comparisons += 1
+            expected = extracted(standard_regex, field, text)
+            actual = extracted(safe_regex, field, text)
+            if expected != actual:
+                mismatches.append((field, standard, text, expected, actual))
+    return comparisons, mismatches
+
+def near_miss_cases(config, size):
+    """Near-miss lines of about `size` characters: many separators, nothing to capture at the end."""
+    repeat = max(1, size // 9)
+    time_format = config["time_formats"][0]
+    return [
+        ("time |x3", anchored_field_pattern, ("|", 3, time_format), "CH 1 | " + "Team x | " * repeat + "no time"),
+        ("title -x3 (", title_field_pattern, ("-", 3, "("), "a - " * (repeat * 2)),
+        ("title -x2 |", title_field_pattern, ("-", 2, "|"), "a - b - c " + "| d " * (repeat * 2) + "x"),
+    ]
+
+def search_seconds(regex, text, repeat):
+    return min(timeit.repeat(lambda: regex.search(text), number=1, repeat=repeat))
+
+def exponent(lengths, seconds):
+    # Slope of log(time) over log(length) across the larger half of the sizes,
+    # where the fixed per-search overhead no longer hides the growth
+    half = len(lengths) // 2
+    lengths, seconds = lengths[half:], seconds[half:]
+    if len(lengths) < 2 or min(seconds) <= 0 or lengths[0] == lengths[-1]:
+        return 0.0
+    return math.log(seconds[-1] / seconds[0]) / math.log(lengths[-1] / lengths[0])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=400)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[40, 80, 1000, 4000, 16000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    if not SAFE_PATTERNS_SUPPORTED:
+        print("Backtracking-safe patterns need Python 3.11+ (atomic groups, possessive quantifiers).")
+        return 1
+
+    config = load_config()
+
+    lines = corpus_lines(args.lines, [item["symbol"] for item in config["separators"]], args.seed)
+    pairs = pattern_pairs(config)
+    comparisons, mismatches = check_equivalence(pairs, lines)
+    print(f"equivalence: {len(pairs)} pattern pairs x {len(lines)} lines = {comparisons} extractions, {len(mismatches)} differ")
+    for field, standard, text, expected, actual in mismatches[:10]:
+        print(f"  {field} {standard!r} on {text!r}: standard {expected!r}, safe {actual!r}")
+
+    sizes = sorted(args.sizes)
+    failed = bool(mismatches)
+    print(f"\n{'case':<14} {'chars':>7} {'standard ms':>12} {'safe ms':>10}")
+    for index, (name, build, build_args, _) in enumerate(near_miss_cases(config, sizes[0])):
+        standard_regex = compile_pattern(build(*build_args, safe=False))
+        safe_regex = compile_pattern(build(*build_args, safe=True))
+        lengths, safe_times = [], []
+        for size in sizes:
+            text = near_miss_cases(config, size)[index][3]
+            safe_time = search_seconds(safe_regex, text, args.repeat)
+            standard = f"{search_seconds(standard_regex, text, 1) * 1000:>12.3f}" if len(text) <= STANDARD_MAX_CHARS else f"{'-':>12}"
+            lengths.append(len(text))
+            safe_times.append(safe_time)
+            print(f"{name:<14} {len(text):>7} {standard} {safe_time * 1000:>10.3f}")
+        growth = exponent(lengths, safe_times)
+        linear = growth <= MAX_SAFE_EXPONENT
+        failed = failed or not linear
+        print(f"{name:<14} safe growth exponent {growth:.2f} ({'linear' if linear else 'SUPER-LINEAR'})")
+
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,271 @@
+"""
+Benchmark the field processors over synthetic listing corpora.
+
+    python -m benchmarks.suite [--sizes 1 100 10000 1000000] [--max-calls 2000] [--engine re] [--memory] [-o results.json] [--compare old.json]
+
+For every corpus size, auto_process, process_title_field, refresh_time_field, refresh_date_field
+and get_date_format are timed per call on up to --max-calls listings. The Test All extraction loop
+(patterns from Auto on the first listing, applied to every line by an Extractor) is timed over the whole corpus, and so is
+the bounded-memory batch mode (the same patterns through a bin.columns ColumnWriter with --memory-limit).
+Results (per-call latency percentiles in microseconds and lines/second) are written as JSON; pass an
+earlier results file to --compare to print the change between two commits (or, with --engine, two regex engines).
+--memory adds each benchmark's peak traced memory (tracemalloc, in a second, untimed pass), so a corpus size
+that makes a benchmark's memory grow shows up in peak_kib; meta records the process's peak RSS.
+"""
+import argparse
+import itertools
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from bin.auto import auto_process
+from bin.date_field import refresh_date_field, get_date_format
+from bin.columns import ColumnWriter
+from bin.extract import Extractor
+from bin.patterns import load_registry
+from bin.engines import ENGINES, available_engines
+from bin.separators import separator_helpers
+from bin.time_field import refresh_time_field
+from bin.title_field import process_title_field
+from benchmarks.corpus import load_config, check_coverage, iter_listings
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_SIZES = [1, 100, 10000, 1000000]
+PERCENTILES = [50, 90, 99]
+TIMEZONE = "ET/EST"
+# MiB of values the batch benchmark's ColumnWriter buffers between writes
+DEFAULT_MEMORY_LIMIT = 16
+
+def per_call_benchmarks(config):
+    """{name: fn(text, spans)} for the functions timed once per listing."""
+    separators = [item["symbol"] for item in config["separators"]]
+    days, months = config["days"], config["months"]
+    tz_matches = next(tz["match"] for tz in config["timezones"] if tz["friendly_name"] == TIMEZONE)
+    detect_separator, count_separators_before = separator_helpers(separators)
+
+    def selection(text, spans, field):
+        start, end = spans[field]
+        return text[start:end], start, end
+
+    def title(text, spans):
+        selected, start, end = selection(text, spans, "title")
+        process_title_field(selected, text, start, end, separators, detect_separator)
+
+    def refresh_date(text, spans):
+        selected, start, end = selection(text, spans, "date")
+        refresh_date_field(selected, text, start, end, config["date_formats"], separators, days, months, True, detect_separator, count_separators_before)
+
+    return {
+        "auto_process": lambda text, spans: auto_process(text, config, TIMEZONE, detect_separator, count_separators_before),
+        "process_title_field": title,
+        "refresh_time_field": lambda text, spans: refresh_time_field(
+            text, config["time_formats"], separators, days, months, True, detect_separator, count_separators_before, tz_matches
+        ),
+        "refresh_date_field": refresh_date,
+        "get_date_format": lambda text, spans: get_date_format(selection(text, spans, "date")[0], separators, days, months),
+    }
+
+def summarize(durations_ns, errors=0):
+    """Latency percentiles (microseconds) and throughput for a list of per-call durations."""
+    if not durations_ns:
+        return {"calls": 0, "errors": errors}
+    ordered = sorted(durations_ns)
+    total = sum(ordered)
+    stats = {"calls": len(ordered), "errors": errors, "total_s": round(total / 1e9, 6), "mean_us": round(total / len(ordered) / 1e3, 3)}
+    for p in PERCENTILES:
+        stats[f"p{p}_us"] = round(ordered[min(len(ordered) - 1, len(ordered) * p // 100)] / 1e3, 3)
+    stats["max_us"] = round(ordered[-1] / 1e3, 3)
+    stats["lines_per_s"] = round(len(ordered) / (total / 1e9), 1) if total else None
+    return stats
+
+def time_calls(fn, listings):
+    durations = []
+    errors = 0
+    clock = time.perf_counter_ns
+    for text, spans in listings:
+        start = clock()
+        try:
+            fn(text, spans)
+        except Exception:
+            errors += 1  # Timed anyway: a processor that raises is still work the GUI waits for
+        durations.append(clock() - start)
+    return summarize(durations, errors)
+
+def peak_kib(run):
+    """Peak memory traced by tracemalloc while run() runs, in KiB."""
+    tracemalloc.start()
+    try:
+        run()
+        return round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+    finally:
+        tracemalloc.stop()
+
+def call_all(fn, listings):
+    # The per-call loop of time_calls, untimed, for peak_kib
+    for text, spans in listings:
+        try:
+            fn(text, spans)
+        except Exception:
+            pass
+
+def test_all_patterns(config, text):
+    # What a user gets from Auto on Sample 1, as Test All would apply it
+    separators = [item["symbol"] for item in config["separators"]]
+    results = auto_process(text, config, TIMEZONE, *separator_helpers(separators))
+    return {field: results[field].pattern for field in ("name", "title", "time", "date")}
+
+def time_test_all(config, size, seed):
+    listings = iter_listings(size, config, seed)
+    first = next(listings, None)
+    if first is None:
+        return summarize([])
+    extract = Extractor(test_all_patterns(config, first[0])).extract
+    durations = []
+    clock = time.perf_counter_ns
+    for text, _ in itertools.chain([first], listings):
+        start = clock()
+        extract(text)
+        durations.append(clock() - start)
+    return summarize(durations)
+
+def run_test_all(config, size, seed):
+    # The Test All loop without the per-line timings (which grow with the corpus), for peak_kib
+    listings = iter_listings(size, config, seed)
+    first = next(listings, None)
+    if first is not None:
+        extract = Extractor(test_all_patterns(config, first[0])).extract
+        for text, _ in itertools.chain([first], listings):
+            extract(text)
+
+def run_batch(config, size, seed, memory_limit):
+    """
+    The bounded-memory batch mode over a corpus: Extractor with the Test All patterns, every record into a
+    ColumnWriter (in a temporary directory). Returns (lines, seconds, flushes); only the total is timed.
+    """
+    listings = iter_listings(size, config, seed)
+    first = next(listings, None)
+    if first is None:
+        return 0, 0.0, 0
+    extract = Extractor(test_all_patterns(config, first[0])).extract
+    with tempfile.TemporaryDirectory() as directory:
+        writer = ColumnWriter(directory, memory_limit=memory_limit * 1024 * 1024)
+        start = time.perf_counter()
+        for line_number, (text, _) in enumerate(itertools.chain([first], listings), 1):
+            writer.append((line_number, *extract(text)))
+        writer.close()
+        seconds = time.perf_counter() - start
+    return writer.rows, seconds, writer.flushes
+
+def time_batch(config, size, seed, memory_limit):
+    lines, seconds, flushes = run_batch(config, size, seed, memory_limit)
+    if not lines:
+        return {"calls": 0, "errors": 0}
+    return {"calls": lines, "errors": 0, "total_s": round(seconds, 6), "mean_us": round(seconds / lines * 1e6, 3),
+            "lines_per_s": round(lines / seconds, 1) if seconds else None, "flushes": flushes}
+
+def run_size(config, size, max_calls, seed, memory=False, memory_limit=DEFAULT_MEMORY_LIMIT):
+    results = {}
+    sample = list(iter_listings(min(size, max_calls), config, seed))
+    for name, fn in per_call_benchmarks(config).items():
+        results[name] = time_calls(fn, sample)
+        if memory:
+            results[name]["peak_kib"] = peak_kib(lambda: call_all(fn, sample))
+    results["test_all"] = time_test_all(config, size, seed)
+    if memory:
+        results["test_all"]["peak_kib"] = peak_kib(lambda: run_test_all(config, size, seed))
+    results["batch"] = time_batch(config, size, seed, memory_limit)
+    if memory:
+        results["batch"]["peak_kib"] = peak_kib(lambda: run_batch(config, size, seed, memory_limit))
+    return results
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_results(size, results):
+    print(f"\n{size} lines")
+    print(f"{'benchmark':<22} {'calls':>8} {'p50 us':>10} {'p90 us':>10} {'p99 us':>10} {'max us':>10} {'lines/s':>12} {'peak KiB':>10}")
+    for name, stats in results.items():
+        if not stats["calls"]:
+            continue
+        # The batch benchmark is only timed as a whole: no percentiles
+        latencies = " ".join(f"{stats[key]:>10.1f}" if key in stats else f"{'-':>10}" for key in ("p50_us", "p90_us", "p99_us", "max_us"))
+        peak = f"{stats['peak_kib']:>10.0f}" if "peak_kib" in stats else f"{'-':>10}"
+        print(f"{name:<22} {stats['calls']:>8} {latencies} {stats['lines_per_s']:>12.0f} {peak}"
+              + (f"  ({stats['errors']} errors)" if stats["errors"] else ""))
+
+def print_comparison(previous, current):
+    print(f"\nvs {previous['meta'].get('commit') or 'previous run'} (p50 and lines/s, current / previous)")
+    for size, results in current["results"].items():
+        for name, stats in results.items():
+            old = previous["results"].get(size, {}).get(name)
+            if not old or not old.get("calls") or not stats.get("calls"):
+                continue
+            line = f"{size:>8} {name:<22}"
+            if "p50_us" in stats and "p50_us" in old:
+                line += f" p50 {stats['p50_us'] / old['p50_us'] if old['p50_us'] else float('nan'):>6.2f}x"
+            line += f"  lines/s {stats['lines_per_s'] / old['lines_per_s']:>6.2f}x"
+            if stats.get("peak_kib") and old.get("peak_kib"):
+                line += f"  peak {stats['peak_kib'] / old['peak_kib']:>6.2f}x"
+            print(line)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--max-calls", type=int, default=2000, help="Listings timed per call for the per-call benchmarks.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="Earlier results JSON to compare against.")
+    parser.add_argument("--engine", choices=ENGINES, default="re", help="Regex engine for the field patterns (default: re).")
+    parser.add_argument("--memory", action="store_true", help="Also record each benchmark's peak traced memory (tracemalloc).")
+    parser.add_argument("--memory-limit", type=int, default=DEFAULT_MEMORY_LIMIT,
+                        help=f"MiB the batch benchmark buffers between writes (default: {DEFAULT_MEMORY_LIMIT}).")
+    args = parser.parse_args(argv)
+    if args.engine not in available_engines():
+        parser.error(f"regex engine {args.engine!r} is not installed")
+
+    config = load_config()
+    check_coverage(config)
+    load_registry(config, args.engine)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "seed": args.seed,
+            "max_calls": args.max_calls,
+            "engine": args.engine,
+            "memory_limit_mib": args.memory_limit,
+        },
+        "results": {},
+    }
+    for size in args.sizes:
+        results = run_size(config, size, args.max_calls, args.seed, args.memory, args.memory_limit)
+        report["results"][str(size)] = results
+        print_results(size, results)
+    if resource is not None:
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        report["meta"]["max_rss_kib"] = max_rss // 1024 if sys.platform == "darwin" else max_rss  # Bytes on macOS
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            print_comparison(json.load(f), report)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Per-format re.finditer loop vs the merged single-scan time candidate finder.
+
+    python -m benchmarks.time_candidates [--events 10 100 1000] [--repeat 5]
+"""
+import argparse
+import random
+import re
+import timeit
+from bin.time_field import find_time_candidates, _time_scan_plan
+from benchmarks.corpus import load_config
+
+def legacy_time_candidates(full_text, time_formats):
+    # The loop auto_process/refresh_time_field ran before the merged scanner
+    matches = []
+    for pattern in time_formats:
+        for match in re.finditer(pattern, full_text, re.IGNORECASE):
+            time_text = match.group(0)
+            is_am_pm = bool(re.search(r'[AaPp][Mm]$', time_text, re.IGNORECASE))
+            matches.append((match.start(), match.end(), time_text, pattern, is_am_pm))
+    return matches
+
+def cold_time_candidates(full_text, time_formats):
+    # Drop the per-format-set plan and window cache so every call starts from scratch
+    _time_scan_plan.cache_clear()
+    return find_time_candidates(full_text, time_formats)
+
+def multi_event_text(events, seed=0):
+    rng = random.Random(seed)
+    teams = ["Arsenal", "Chelsea", "Chiefs", "Bills", "Lakers", "Celtics", "Leafs", "Habs"]
+    times = ["7:30 PM", "19:30", "8.15pm", "9-00 am", "12:45", "3pm", "10:05AM"]
+    parts = []
+    for i in range(events):
+        home, away = rng.sample(teams, 2)
+        parts.append(f"CH {i % 99 + 1} | {home} vs {away} - Live @ {rng.choice(times)} ET / {rng.choice(times)} UK Sat {rng.randint(1, 28)} Oct")
+    return " ".join(parts)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--events", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    time_formats = load_config()["time_formats"]
+
+    print(f"{'events':>8} {'chars':>9} {'legacy ms':>10} {'cold ms':>10} {'warm ms':>10} {'speedup':>8} {'legacy n':>9} {'merged n':>9}")
+    for events in args.events:
+        text = multi_event_text(events)
+        number = max(1, 2000 // events)
+        legacy = min(timeit.repeat(lambda: legacy_time_candidates(text, time_formats), number=number, repeat=args.repeat)) / number
+        cold = min(timeit.repeat(lambda: cold_time_candidates(text, time_formats), number=number, repeat=args.repeat)) / number
+        warm = min(timeit.repeat(lambda: find_time_candidates(text, time_formats), number=number, repeat=args.repeat)) / number
+        print(f"{events:>8} {len(text):>9} {legacy * 1000:>10.3f} {cold * 1000:>10.3f} {warm * 1000:>10.3f} {legacy / cold:>7.2f}x "
+              f"{len(legacy_time_candidates(text, time_formats)):>9} {len(find_time_candidates(text, time_formats)):>9}")
+
+if __name__ == "__main__":
+    main()
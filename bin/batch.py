@@ -0,0 +1,144 @@
+import io
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from bin.extract import Extractor
+from bin.patterns import get_registry, set_engine
+from bin.templates import TemplateRouter
+from bin.guard import RegexGuard, guarded_lines
+
+# Bytes per shard: small enough to keep every worker busy and the merge memory bounded,
+# large enough that per-shard overhead (scheduling, pickling results) stays negligible
+DEFAULT_SHARD_SIZE = 16 * 1024 * 1024
+
+# Set once per worker process by _init_worker: an Extractor, or a TemplateRouter for a templates run,
+# and the RegexGuard of a run with a timeout
+_extractor = None
+_guard = None
+
+def cpu_count():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+def can_shard(encoding):
+    """Byte-range shards need an encoding where b"\\n" only ever means a newline (UTF-8, Latin-1, ...)."""
+    try:
+        return "\n".encode(encoding) == b"\n" and "\r".encode(encoding) == b"\r"
+    except LookupError:
+        return False
+
+def shard_ranges(path, shard_size=DEFAULT_SHARD_SIZE):
+    """
+    Split a file into (start, end) byte ranges of about shard_size bytes, each ending just after a newline
+    (the last one at end of file), so no line is split between shards.
+    """
+    size = os.path.getsize(path)
+    ranges = []
+    start = 0
+    with open(path, "rb") as f:
+        while start < size:
+            end = start + shard_size
+            if end >= size:
+                end = size
+            else:
+                f.seek(end)
+                f.readline()  # Extend to the end of the line the cut landed in
+                end = f.tell()
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+def _init_worker(patterns, router_spec=None, engine=None, timeout=None):
+    global _extractor, _guard
+    if engine is not None:
+        set_engine(engine)
+    # Compiled once per process, reused for every shard it runs
+    _extractor = TemplateRouter(*router_spec) if router_spec is not None else Extractor(patterns)
+    _guard = RegexGuard(timeout) if timeout else None
+
+def _extract_shard(path, start, end, encoding, matched_only):
+    """
+    Extract one shard. Returns (lines read, [(line number within the shard, JSON record body)],
+    [(line number within the shard, text)] of lines no template routed, seconds).
+    The body is the record's JSON minus its opening brace, so the parent only has to prepend the line number.
+    """
+    began = time.perf_counter()
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    # Same universal-newline splitting and decoding as iterating the file in text mode
+    text = io.StringIO(data.decode(encoding, errors="replace"), newline=None)
+    lines_read = 0
+    out = []
+    fallback = []
+    if _guard is not None:
+        lines = text.readlines()
+        lines_read = len(lines)
+        for (line_number, signature), record, timed_out, skipped in _guard.extract_many(guarded_lines(_extractor, lines, fallback)):
+            if matched_only and not any(record) and not timed_out and not skipped:
+                continue
+            body = {} if signature is None else {"template": signature}
+            body.update(record._asdict())
+            if timed_out:
+                body["timed_out"] = list(timed_out)
+            if skipped:
+                body["skipped"] = list(skipped)
+            out.append((line_number, json.dumps(body, ensure_ascii=False)[1:]))
+    elif isinstance(_extractor, TemplateRouter):
+        lines = text.readlines()
+        lines_read = len(lines)
+        for line_number, signature, record in _extractor.extract_many(lines, fallback):
+            if matched_only and not any(record):
+                continue
+            out.append((line_number, json.dumps({"template": signature, **record._asdict()}, ensure_ascii=False)[1:]))
+    else:
+        extract = _extractor.extract
+        for lines_read, line in enumerate(text, 1):
+            if line.isspace():
+                continue
+            record = extract(line)
+            if matched_only and not any(record):
+                continue
+            out.append((lines_read, json.dumps(record._asdict(), ensure_ascii=False)[1:]))
+    return lines_read, out, fallback, time.perf_counter() - began
+
+def extract_file_sharded(patterns, path, sink, jobs=None, encoding="utf-8", matched_only=False,
+                         shard_size=DEFAULT_SHARD_SIZE, report=None, router=None, fallback=None, timeout=None):
+    """
+    Extract a listings file across `jobs` processes (default: one per CPU) and write JSONL to sink,
+    in the original line order and byte-for-byte as the single-process `bossex extract` would.
+    router: optional TemplateRouter used instead of `patterns`; the lines it can't route are appended,
+    in order, to fallback (a list, deque, ...) as (line number, text), as TemplateRouter.extract_many does.
+    Workers compile with the regex engine of the active registry (bin.engines); with a timeout (seconds), each runs
+    its searches through its own bin.guard RegexGuard and records list the fields that ran out under "timed_out"
+    (and those it gave up on without a search under "skipped").
+    report(shard, shards, lines, seconds) is called as each shard is written.
+    Returns: total lines read.
+    """
+    jobs = jobs or cpu_count()
+    ranges = shard_ranges(path, shard_size)
+    line_offset = 0
+    initargs = (dict(patterns or {}), router.spec() if router is not None else None, get_registry().engine, timeout)
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=initargs) as executor:
+        pending = deque()
+        next_shard = 0
+        while next_shard < len(ranges) or pending:
+            # Keep a bounded window in flight so finished-but-unwritten shards don't pile up in memory
+            while next_shard < len(ranges) and len(pending) < jobs * 2:
+                start, end = ranges[next_shard]
+                pending.append(executor.submit(_extract_shard, path, start, end, encoding, matched_only))
+                next_shard += 1
+            lines_read, out, unrouted, seconds = pending.popleft().result()
+            for line_number, body in out:
+                sink.write(f'{{"line": {line_offset + line_number}, {body}\n')
+            if fallback is not None:
+                for line_number, text in unrouted:
+                    fallback.append((line_offset + line_number, text))
+            line_offset += lines_read
+            if report:
+                report(next_shard - len(pending), len(ranges), lines_read, seconds)
+    return line_offset
@@ -0,0 +1,132 @@
+import hashlib
+import json
+import sqlite3
+from bin.extract import ExtractionRecord, sample_hash
+
+# Bytes of cached records kept between runs; the least recently used go first beyond that
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+# Lines looked up (and stored) per query
+DEFAULT_CHUNK_LINES = 512
+# Part of every key, so records written by an older extraction are never served: bump when results change
+CACHE_VERSION = b"1"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    key BLOB PRIMARY KEY, name TEXT, title TEXT, time TEXT, date TEXT, used INTEGER
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER);
+"""
+
+def pattern_set_key(extractor):
+    """Digest of an Extractor's pattern set: the first half of its lines' cache keys."""
+    patterns = json.dumps(extractor.patterns, ensure_ascii=False).encode("utf-8")
+    return hashlib.blake2b(CACHE_VERSION + patterns, digest_size=16).digest()
+
+class ExtractionCache:
+    """
+    Extraction results kept on disk (SQLite) across runs, for feeds that are mostly the same from one run to
+    the next: keyed by (pattern set digest, line digest), so a line is only searched again when it or the
+    patterns changed. Each open is one run; records a run used are marked with it, and on close the least
+    recently used are evicted until the cache holds at most max_size bytes.
+    Not thread-safe: one cache per thread or process.
+    """
+
+    def __init__(self, path, max_size=DEFAULT_MAX_SIZE, rebuild=False):
+        """rebuild=True drops every cached record first."""
+        self.path = path
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self._keys = {}  # Extractor -> pattern_set_key
+        self._db = sqlite3.connect(path)
+        self._db.executescript(_SCHEMA)
+        if rebuild:
+            self._db.execute("DELETE FROM records")
+        row = self._db.execute("SELECT value FROM meta WHERE name = 'run'").fetchone()
+        self.run = (row[0] if row else 0) + 1
+        self._db.execute("INSERT OR REPLACE INTO meta VALUES ('run', ?)", (self.run,))
+
+    def __repr__(self):
+        return f"ExtractionCache({self.path!r})"
+
+    def _key(self, extractor, text):
+        prefix = self._keys.get(extractor)
+        if prefix is None:
+            prefix = self._keys[extractor] = pattern_set_key(extractor)
+        return prefix + sample_hash(text)
+
+    def _lookup(self, keys):
+        # {key: ExtractionRecord} for the cached keys; marks them used by this run
+        found = {}
+        stale = []
+        placeholders = ",".join("?" * len(keys))
+        for key, name, title, time, date, used in self._db.execute(
+            f"SELECT key, name, title, time, date, used FROM records WHERE key IN ({placeholders})", keys
+        ):
+            found[key] = ExtractionRecord(name, title, time, date)
+            if used != self.run:
+                stale.append(key)
+        if stale:
+            self._db.execute(f"UPDATE records SET used = ? WHERE key IN ({','.join('?' * len(stale))})", [self.run, *stale])
+        return found
+
+    def extract_many(self, items, chunk_lines=DEFAULT_CHUNK_LINES):
+        """
+        Extraction through the cache. items: iterable of (tag, Extractor, stripped non-blank line), as bin.guard
+        guarded_lines makes them. Yields (tag, ExtractionRecord) in input order; lines the cache lacks are extracted
+        and stored. Looks up chunk_lines lines per query.
+        """
+        chunk = []
+        for item in items:
+            chunk.append(item)
+            if len(chunk) >= chunk_lines:
+                yield from self._extract_chunk(chunk)
+                chunk = []
+        if chunk:
+            yield from self._extract_chunk(chunk)
+
+    def _extract_chunk(self, chunk):
+        keys = [self._key(extractor, text) for _, extractor, text in chunk]
+        found = self._lookup(list(set(keys)))
+        new = []
+        for (tag, extractor, text), key in zip(chunk, keys):
+            record = found.get(key)
+            if record is None:
+                record = found[key] = extractor.extract(text)
+                new.append((key, *record, self.run))
+                self.misses += 1
+            else:
+                self.hits += 1
+            yield tag, record
+        if new:
+            self._db.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?)", new)
+
+    def size(self):
+        """Bytes the cached records take up in the database file (freed pages not counted)."""
+        page_size, = self._db.execute("PRAGMA page_size").fetchone()
+        pages, = self._db.execute("PRAGMA page_count").fetchone()
+        free, = self._db.execute("PRAGMA freelist_count").fetchone()
+        return (pages - free) * page_size
+
+    def evict(self):
+        """Drop the least recently used records until the cache fits max_size. Returns how many went."""
+        size = self.size()
+        if size <= self.max_size:
+            return 0
+        rows, = self._db.execute("SELECT COUNT(*) FROM records").fetchone()
+        # Records are about the same size: aim a little under the limit so the next runs don't evict again at once
+        excess = rows - int(rows * self.max_size * 0.9 / size)
+        # No index on used (it would be rewritten on every hit): a full sort, only when the cache is over size
+        self._db.execute("DELETE FROM records WHERE key IN (SELECT key FROM records ORDER BY used LIMIT ?)", (excess,))
+        self.evicted += excess
+        return excess
+
+    def close(self):
+        """Commit this run's records, evict down to max_size and close the database."""
+        try:
+            self._db.commit()
+            self.evict()
+            self._db.commit()
+        finally:
+            self._db.close()
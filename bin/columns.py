@@ -0,0 +1,80 @@
+import json
+import os
+import sys
+from bin.extract import FIELDS
+
+# Bytes of buffered values a ColumnWriter holds before appending them to its column files
+DEFAULT_MEMORY_LIMIT = 64 * 1024 * 1024
+# Columns whose values repeat from line to line in a feed (the same channels, the same events): kept once per buffer
+INTERNED = ("name", "title")
+# Buffer cost of a value on top of the value itself: a list slot, plus a table entry for an interned one
+_SLOT_SIZE = 8
+_ENTRY_SIZE = 64
+
+def column_paths(directory, columns):
+    """{column: path of its file} for the columns of a ColumnWriter directory."""
+    return {column: os.path.join(directory, f"{column}.jsonl") for column in columns}
+
+class ColumnWriter:
+    """
+    Bounded-memory output for batch runs over feeds of any length: rows are buffered column by column and appended
+    to one JSON-lines file per column (column_paths; line i of every file belongs to the same listing) whenever the
+    buffered values reach memory_limit bytes, so memory stays flat however many lines go through. Repeated name
+    and title values are stored once per buffer. Sizes are estimated with sys.getsizeof, so the ceiling is approximate.
+
+        writer = ColumnWriter("out", ("line",) + tuple(FIELDS))
+        writer.append((line_number, *record))
+        writer.close()
+    """
+
+    def __init__(self, directory, columns=("line",) + tuple(FIELDS), memory_limit=DEFAULT_MEMORY_LIMIT):
+        self.columns = tuple(columns)
+        self.memory_limit = memory_limit
+        self.rows = 0  # Rows appended so far
+        self.flushes = 0  # Times the buffers went to disk
+        self.peak_size = 0  # Largest buffered size reached, in (estimated) bytes
+        self._buffers = [[] for _ in self.columns]
+        self._tables = [{} if column in INTERNED else None for column in self.columns]
+        self._size = 0
+        os.makedirs(directory, exist_ok=True)
+        self._files = [open(path, "w", encoding="utf-8") for path in column_paths(directory, self.columns).values()]
+
+    def __repr__(self):
+        return f"ColumnWriter({self.columns!r}, rows={self.rows})"
+
+    def append(self, row):
+        """Buffer one row: a value per column, in column order. Flushes when the buffers reach the memory limit."""
+        size = self._size
+        for value, buffer, table in zip(row, self._buffers, self._tables):
+            if table is not None:
+                count = len(table)
+                value = table.setdefault(value, value)
+                if len(table) != count:
+                    size += sys.getsizeof(value) + _ENTRY_SIZE
+            else:
+                size += sys.getsizeof(value)
+            buffer.append(value)
+        self._size = size + _SLOT_SIZE * len(self.columns)
+        self.rows += 1
+        if self._size >= self.memory_limit:
+            self.flush()
+
+    def flush(self):
+        """Append the buffered rows to the column files and empty the buffers."""
+        if self._size > self.peak_size:
+            self.peak_size = self._size
+        if not self._buffers[0]:
+            return
+        dumps = json.dumps
+        for buffer, table, f in zip(self._buffers, self._tables, self._files):
+            f.writelines(f"{dumps(value, ensure_ascii=False)}\n" for value in buffer)  # No joined copy of the buffer
+            buffer.clear()
+            if table is not None:
+                table.clear()
+        self._size = 0
+        self.flushes += 1
+
+    def close(self):
+        self.flush()
+        for f in self._files:
+            f.close()
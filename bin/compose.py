@@ -0,0 +1,81 @@
+import re
+from functools import lru_cache
+from bin.patterns import compile_pattern, normalize_flags, DEFAULT_FLAGS
+from bin.prefilter import sre_parse, sre_constants, anchored_at_start
+
+# Group names of the composed regex; user patterns can't collide with them by accident
+GROUP_PREFIX = "bossex_"
+
+_REFERENCES = {
+    sre_constants.GROUPREF, sre_constants.GROUPREF_EXISTS,
+    getattr(sre_constants, "GROUPREF_IGNORE", None), getattr(sre_constants, "GROUPREF_UNI_IGNORE", None),
+    getattr(sre_constants, "GROUPREF_LOC_IGNORE", None),
+}
+
+def _has_references(items):
+    for op, av in items:
+        if op in _REFERENCES:
+            return True
+        if op == sre_constants.SUBPATTERN:
+            nested = [av[3]]
+        elif op == sre_constants.BRANCH:
+            nested = av[1]
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT, getattr(sre_constants, "POSSESSIVE_REPEAT", None)):
+            nested = [av[2]]
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            nested = [av[1]]
+        elif op == getattr(sre_constants, "ATOMIC_GROUP", None):
+            nested = [av]
+        else:
+            continue
+        if any(_has_references(items) for items in nested):
+            return True
+    return False
+
+def composable(pattern, flags=DEFAULT_FLAGS):
+    """
+    Whether pattern can run inside a composed regex unchanged: no backreferences (their group numbers
+    would shift) and no inline global flags (only allowed at the very start of a regex).
+    """
+    flags = normalize_flags(flags)
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except (re.error, RecursionError, OverflowError):
+        return False
+    if (parsed.state.flags ^ flags) & ~re.UNICODE:
+        return False
+    return not _has_references(list(parsed))
+
+@lru_cache(maxsize=256)
+def compose_patterns(patterns, flags=DEFAULT_FLAGS):
+    """
+    One regex evaluating several field patterns in a single match() call, with the exact results of a
+    separate search() per pattern: each field becomes an optional lookahead (?=[\\s\\S]*?(?P<f>pattern)) at
+    position 0, and the lazy prefix tries start positions in the order search() does (^-anchored patterns
+    go without it, as they can only match at 0).
+    patterns: ((field, pattern), ...). Returns (compiled regex or None, ((field, group, first group or None), ...),
+    (fields left to search one by one)); None when fewer than two patterns compose or the result doesn't compile.
+    """
+    parts = []
+    composed = []
+    rest = []
+    for field, pattern in patterns:
+        if composable(pattern, flags):
+            group = f"{GROUP_PREFIX}{field}"
+            scan = "" if anchored_at_start(pattern, flags) else r"[\s\S]*?"
+            parts.append(f"(?:(?={scan}(?P<{group}>{pattern})))?")
+            composed.append((field, group))
+        else:
+            rest.append(field)
+    if len(composed) < 2:
+        return None, (), tuple(field for field, _ in patterns)
+    try:
+        regex = compile_pattern("".join(parts), flags)
+    except re.error:
+        return None, (), tuple(field for field, _ in patterns)
+    groups = []
+    for field, group in composed:
+        index = regex.groupindex[group]
+        inner = compile_pattern(dict(patterns)[field], flags).groups
+        groups.append((field, index, index + 1 if inner else None))
+    return regex, tuple(groups), tuple(rest)
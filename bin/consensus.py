@@ -0,0 +1,155 @@
+import re
+from bin.auto import auto_process
+from bin.name_field import process_name_field, NAME_FALLBACK_PATTERN
+from bin.title_field import process_title_field
+from bin.time_field import process_time_field
+from bin.date_field import process_date_field
+from bin.patterns import compile_pattern, expand_name_pattern
+from bin.extract import FIELDS, NO_PATTERN
+from bin.instrument import instrumented, stage, count_candidates
+
+# Unmarked lines that Auto is run on to propose candidates (spread evenly over the input)
+DEFAULT_PROBE_COUNT = 8
+# Failing line indices reported per field
+MAX_REPORTED_FAILURES = 10
+
+# Candidate tiers, most specific first
+ANCHORED, UNANCHORED, GENERIC = 0, 1, 2
+
+def probe_indices(count, probe_count):
+    """Up to probe_count line indices spread evenly over range(count), first and last included."""
+    if count <= probe_count:
+        return list(range(count))
+    if probe_count <= 1:
+        return [0]
+    return sorted({round(i * (count - 1) / (probe_count - 1)) for i in range(probe_count)})
+
+def _field_span(field, match):
+    # The part of the match that extract_value returns
+    if field == "name" or not match.groups():
+        return match.span(0)
+    return match.span(1)
+
+def _propose(field, line, start_idx, end_idx, anchored, config, tz_matches, detect_separator, count_separators_before):
+    # The pattern select_field would build for line[start_idx:end_idx]
+    separators = [item["symbol"] for item in config["separators"]]
+    selected = line[start_idx:end_idx]
+    if field == "name":
+        return process_name_field(selected, line, start_idx, end_idx, config.get("name_patterns", []), separators)[0]
+    if field == "title":
+        return process_title_field(selected, line, start_idx, end_idx, separators, detect_separator)[0]
+    if field == "time":
+        return process_time_field(
+            selected, line, start_idx, end_idx, config["time_formats"], separators, config["days"], config["months"],
+            anchored, detect_separator, count_separators_before, tz_matches
+        )[0]
+    return process_date_field(
+        selected, line, start_idx, end_idx, config.get("date_formats", []), separators, config["days"], config["months"],
+        anchored, detect_separator, count_separators_before, tz_matches
+    )[0]
+
+def _verify(field, pattern, lines, marks, stop_after=None):
+    """
+    Lines (indices) where `pattern` fails to find the field: no match, an empty value, or, on a line with
+    a marked span for the field, a value outside that span. Marked lines are tried first: they fail most often
+    and a marked failure outranks any number of unmarked ones.
+    stop_after: (marked failures, failures) of the current best; give up once this candidate can't beat it.
+    Returns: (marked failures, [failing line indices])
+    """
+    regex = compile_pattern(pattern)
+    marked = [i for i in marks if field in marks[i]]
+    marked_failures = 0
+    failures = []
+    for position, i in enumerate(marked + [i for i in range(len(lines)) if field not in marks.get(i, {})]):
+        match = regex.search(lines[i])
+        if match is not None:
+            start, end = _field_span(field, match)
+            if lines[i][start:end].strip():
+                span = marks.get(i, {}).get(field)
+                if span is None or (start < span[1] and span[0] < end):
+                    continue
+        failures.append(i)
+        if position < len(marked):
+            marked_failures += 1
+        if stop_after is not None and (marked_failures, len(failures)) >= stop_after:
+            break
+    return marked_failures, failures
+
+@instrumented()
+def synthesize_patterns(lines, config, timezone, detect_separator, count_separators_before, marks=None,
+                        probe_count=DEFAULT_PROBE_COUNT, token=None):
+    """
+    Consensus patterns: for each field, the most specific pattern that finds the field on every line.
+    Args:
+        lines: Example listing lines (stripped).
+        marks: Optional {line index: {field: (start_idx, end_idx)}}, field spans marked in some of the lines.
+        probe_count: Unmarked lines Auto is run on to propose candidates.
+        token: Optional bin.worker CancelToken, checked between candidates.
+    Candidates come from the marked spans and from Auto on the probe lines, through the same field processors
+    as select_field, so time/date keep their separator-count anchoring; unanchored forms and the config's
+    name patterns are the fallbacks. They are tried anchored first, then by how many lines proposed them,
+    and the first one that holds on every line wins (otherwise the one failing the fewest marked lines, then lines).
+    Returns: {field: {"pattern", "matched", "total", "failures": [line indices, at most MAX_REPORTED_FAILURES]}}
+    """
+    marks = marks or {}
+    tz_matches = next(tz for tz in config["timezones"] if tz["friendly_name"] == timezone)["match"]
+    candidates = {field: {} for field in FIELDS}  # field -> {pattern: [tier, votes, first seen]}
+
+    def add(field, pattern, tier):
+        if not pattern or pattern in (NO_PATTERN, NAME_FALLBACK_PATTERN):
+            return  # Nothing found on that line: not a proposal
+        entry = candidates[field].setdefault(pattern, [tier, 0, len(candidates[field])])
+        entry[0] = min(entry[0], tier)
+        entry[1] += 1
+
+    def add_span(field, line, start_idx, end_idx):
+        if field in ("time", "date"):
+            add(field, _propose(field, line, start_idx, end_idx, True, config, tz_matches, detect_separator, count_separators_before), ANCHORED)
+            add(field, _propose(field, line, start_idx, end_idx, False, config, tz_matches, detect_separator, count_separators_before), UNANCHORED)
+        else:
+            add(field, _propose(field, line, start_idx, end_idx, True, config, tz_matches, detect_separator, count_separators_before), ANCHORED)
+
+    with stage("propose"):
+        for i, fields in marks.items():
+            for field, (start_idx, end_idx) in fields.items():
+                add_span(field, lines[i], start_idx, end_idx)
+        for i in probe_indices(len(lines), probe_count):
+            if token is not None:
+                token.check()
+            results = auto_process(lines[i], config, timezone, detect_separator, count_separators_before)
+            for field in FIELDS:
+                result = results[field]
+                if field in ("time", "date") and result.start_idx is not None:
+                    add_span(field, lines[i], result.start_idx, result.end_idx)
+                else:
+                    add(field, result.pattern, ANCHORED)
+        timezone_matches = {m for tz in config["timezones"] for m in tz["match"]}
+        separators = [item["symbol"] for item in config["separators"] if item["symbol"] not in timezone_matches]
+        for name_pattern in config.get("name_patterns", []):
+            add("name", expand_name_pattern(name_pattern["pattern"], separators), GENERIC)
+
+    consensus = {}
+    with stage("verify"):
+        for field in FIELDS:
+            ranked = sorted(candidates[field].items(), key=lambda item: (item[1][0], -item[1][1], item[1][2]))
+            count_candidates(len(ranked))
+            best = None  # (pattern, (marked failures, failure count), failures)
+            for pattern, _ in ranked:
+                if token is not None:
+                    token.check()
+                try:
+                    marked_failures, failures = _verify(field, pattern, lines, marks, best[1] if best else None)
+                except re.error:
+                    continue  # A proposal that doesn't compile just drops out
+                if best is None or (marked_failures, len(failures)) < best[1]:
+                    best = (pattern, (marked_failures, len(failures)), failures)
+                if not failures:
+                    break
+            pattern, _, failures = best if best else ("", None, list(range(len(lines))))
+            consensus[field] = {
+                "pattern": pattern,
+                "matched": len(lines) - len(failures),
+                "total": len(lines),
+                "failures": failures[:MAX_REPORTED_FAILURES],
+            }
+    return consensus
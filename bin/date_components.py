@@ -0,0 +1,53 @@
+import re
+from bin.patterns import word_alternation
+
+# Shared by both GUIs for the selection-based date highlight pattern (last_pattern).
+# bin.date_field has its own stricter variants (days dropped, ordinal suffixes kept in the pattern) for generated regexes.
+
+def build_base_pattern(components, days, months, spacing=r"\s+"):
+    day_short_pattern = word_alternation(days["short"])
+    day_long_pattern = word_alternation(days["long"])
+    month_short_pattern = word_alternation(months["short"])
+    month_long_pattern = word_alternation(months["long"])
+    date_pattern = r"\d{1,2}"
+    year_pattern = r"\d{2,4}"
+
+    pattern_parts = []
+    for comp_type, _, _, length in components:
+        if comp_type == "day":
+            pattern = f"({day_short_pattern})" if length == "short" else f"({day_long_pattern})"
+        elif comp_type == "month":
+            pattern = f"({month_short_pattern})" if length == "short" else f"({month_long_pattern})"
+        elif comp_type == "date":
+            pattern = f"({date_pattern})"
+        elif comp_type == "year":
+            pattern = f"({year_pattern})"
+        pattern_parts.append(pattern)
+
+    return spacing.join(pattern_parts)
+
+def identify_components(selected_text, days, months):
+    cleaned_text = re.sub(r"(th|st|nd|rd)", "", selected_text).strip()
+    parts = re.findall(r'\S+', cleaned_text)
+    components = []
+
+    for i, part in enumerate(parts):
+        part_lower = part.lower()
+        if part_lower in [d.lower() for d in days["short"]]:
+            components.append(("day", part, i, "short"))
+        elif part_lower in [d.lower() for d in days["long"]]:
+            components.append(("day", part, i, "long"))
+        elif part_lower in [m.lower() for m in months["short"]]:
+            components.append(("month", part, i, "short"))
+        elif part_lower in [m.lower() for m in months["long"]]:
+            components.append(("month", part, i, "long"))
+        elif re.match(r"^\d{1,2}$", part):
+            try:
+                if int(part) <= 31:
+                    components.append(("date", part, i, None))
+            except ValueError:
+                pass
+        elif re.match(r"^\d{2,4}$", part):
+            components.append(("year", part, i, None))
+
+    return sorted(components, key=lambda x: x[2])
@@ -1,18 +1,25 @@
 import re
+from bin.separators import separator_index
+from bin.patterns import compile_pattern, anchored_field_pattern, word_alternation, factor_word_alternations, FALLBACK_DATE_PATTERN
+from bin.timezones import timezone_score
+from bin.instrument import instrumented, count_candidates
 
+@instrumented()
 def process_date_field(selected_text, full_text, start_idx, end_idx, date_formats, possible_separators, days, months, anchor_enabled, detect_separator, count_separators_before, tz_matches=None):
     pattern, extracted = get_date_pattern(selected_text, full_text, start_idx, possible_separators, date_formats, anchor_enabled, detect_separator, count_separators_before, days, months, tz_matches)
     format_str = get_date_format(extracted, possible_separators, days, months)
     return pattern, extracted, format_str
 
+@instrumented()
 def refresh_date_field(selected_text, full_text, start_idx, end_idx, date_formats, possible_separators, days, months, anchor_enabled, detect_separator, count_separators_before):
     components = identify_components(selected_text, days, months)
     if not components:
         return "No pattern detected", selected_text, "No format detected"
 
     base_pattern = build_base_pattern(components, days, months)
-    matches = [(m.start(), m.end(), m.group(0)) for m in re.finditer(base_pattern, full_text, re.IGNORECASE)]
+    matches = [(m.start(), m.end(), m.group(0)) for m in compile_pattern(base_pattern).finditer(full_text)]
     matches.sort(key=lambda x: x[0])
+    count_candidates(len(matches))
 
     if not matches:
         return "No pattern detected", selected_text, "No format detected"
@@ -50,8 +57,8 @@ def identify_components(selected_text, days, months):
     return sorted(components, key=lambda x: x[2])
 
 def build_base_pattern(components, days, months):
-    month_short_pattern = "|".join(months["short"])
-    month_long_pattern = "|".join(months["long"])
+    month_short_pattern = word_alternation(months["short"])
+    month_long_pattern = word_alternation(months["long"])
     date_pattern = r"(\d{1,2})(?:st|nd|rd|th)?"
     year_pattern = r"\d{2,4}"
 
@@ -72,34 +79,33 @@ def get_closest_separator(full_text, start_idx, possible_separators, tz_matches=
     min_distance = float('inf')
     sep_count = 0
     sep_pos = None
+    index = separator_index(full_text, possible_separators, ignore_case=True)
 
     if tz_matches:
         for sep in [s for s in possible_separators if s in tz_matches]:
-            escaped_sep = re.escape(sep)
-            matches = list(re.finditer(fr"(?:(?<=[\S])\s*{escaped_sep}\s*|^\s*{escaped_sep}\s*|\s*{escaped_sep}\s*(?=[\S])|\s*{escaped_sep}\s*$)", full_text[:start_idx], re.IGNORECASE))
-            if matches:
-                last_match = matches[-1]
-                distance = start_idx - last_match.end()
+            last = index.last_before(start_idx, sep)
+            if last:
+                last_start, last_end, count = last
+                distance = start_idx - last_end
                 if distance < min_distance:
                     min_distance = distance
                     closest_sep = sep
-                    sep_count = len(matches)
-                    sep_pos = last_match.start()
+                    sep_count = count
+                    sep_pos = last_start
 
     if not closest_sep:
         for sep in possible_separators:
             if tz_matches and sep in tz_matches:
                 continue
-            escaped_sep = re.escape(sep)
-            matches = list(re.finditer(fr"(?:(?<=[\S])\s*{escaped_sep}\s*|^\s*{escaped_sep}\s*|\s*{escaped_sep}\s*(?=[\S])|\s*{escaped_sep}\s*$)", full_text[:start_idx], re.IGNORECASE))
-            if matches:
-                last_match = matches[-1]
-                distance = start_idx - last_match.end()
+            last = index.last_before(start_idx, sep)
+            if last:
+                last_start, last_end, count = last
+                distance = start_idx - last_end
                 if distance < min_distance:
                     min_distance = distance
                     closest_sep = sep
-                    sep_count = len(matches)
-                    sep_pos = last_match.start()
+                    sep_count = count
+                    sep_pos = last_start
 
     return closest_sep, sep_count, sep_pos
 
@@ -108,16 +114,17 @@ def get_date_pattern(selected_text, full_text, start_idx, possible_separators, d
     components = identify_components(cleaned_text, days, months)
 
     if not components:
-        for pattern in date_formats:
-            if re.search(fr"^{pattern}$", cleaned_text, re.IGNORECASE):
+        for pattern in map(factor_word_alternations, date_formats):
+            if compile_pattern(fr"^{pattern}$").search(cleaned_text):
                 base_pattern = pattern
                 break
         else:
-            base_pattern = r"\d{1,2}[-./]\d{1,2}(?:[-./]\d{2,4})?"
+            base_pattern = FALLBACK_DATE_PATTERN
     else:
         base_pattern = build_base_pattern(components, days, months)
 
-    matches = list(re.finditer(base_pattern, full_text, re.IGNORECASE))
+    matches = list(compile_pattern(base_pattern).finditer(full_text))
+    count_candidates(len(matches))
     if not matches:
         return "No pattern detected", cleaned_text
 
@@ -125,12 +132,7 @@ def get_date_pattern(selected_text, full_text, start_idx, possible_separators, d
         best_match = None
         max_tz_score = -1
         for match in matches:
-            match_start = match.start()
-            tz_score = 0
-            for m in tz_matches:
-                tz_pos = full_text[max(0, match_start-20):match_start].upper().rfind(m)
-                if tz_pos != -1:
-                    tz_score = max(tz_score, 20 - tz_pos)
+            tz_score = timezone_score(full_text, match.start(), tz_matches)
             if tz_score > max_tz_score:
                 max_tz_score = tz_score
                 best_match = match
@@ -147,10 +149,7 @@ def get_date_pattern(selected_text, full_text, start_idx, possible_separators, d
         if not separator:
             separator = detect_separator(full_text) or "|"
             sep_count = count_separators_before(full_text, best_match.start(), separator)
-        escaped_sep = re.escape(separator)
-        sep_pattern = fr"\s*{escaped_sep}\s*"
-        prior_pattern = fr"(?:{sep_pattern}.*?){{{sep_count}}}"
-        pattern = fr"{prior_pattern}\s*({base_pattern})"
+        pattern = anchored_field_pattern(separator, sep_count, base_pattern)
 
     # Do not clean suffixes here — they are already excluded from capture
     extracted = extracted.strip()
@@ -0,0 +1,208 @@
+import re
+
+try:
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+try:
+    import regex
+except ImportError:
+    regex = None
+
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+# Regex engines a registry can compile with: stdlib re, the regex module, google-re2 (both optional)
+ENGINES = ("re", "regex", "re2")
+DEFAULT_ENGINE = "re"
+
+# Flags re2 has an option or an inline flag for; a pattern compiled with any other stays on re
+_RE2_FLAGS = re.IGNORECASE | re.MULTILINE | re.DOTALL | re.UNICODE
+# Characters where re2 and re disagree on an ASCII line: \s only covers [\t\n\f\r ] in re2, and
+# $ matches before a trailing newline in re only
+_RE2_UNSAFE_TEXT = re.compile(r"[\n\x0b\x1c-\x1f]")
+# Syntax both engines accept with different meanings (or that re2 rejects late): \Z, {,n} (literal text in re2),
+# [:alpha:] (a POSIX class in re2, a plain set in re) and comments
+_RE2_DIFFERENT = ("\\Z", "{,", "[:", "(?#")
+
+def available_engines():
+    """The engines that can be used here, in ENGINES order."""
+    installed = {"re": True, "regex": regex is not None, "re2": re2 is not None}
+    return [engine for engine in ENGINES if installed[engine]]
+
+def check_engine(engine):
+    """Raise ValueError for an unknown or uninstalled engine."""
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown regex engine {engine!r} (choose from {', '.join(ENGINES)})")
+    if engine not in available_engines():
+        raise ValueError(f"Regex engine {engine!r} is not installed (pip install {'google-re2' if engine == 're2' else engine})")
+
+class Re2Pattern:
+    """
+    A pattern compiled by both re2 and re. search/match/fullmatch run on re2 (linear time) for lines where the
+    two engines agree: ASCII text without the characters of _RE2_UNSAFE_TEXT, and a pattern re2 parses the same
+    way. Everything else (other lines, finditer, sub, ...) goes to the re object, so results never differ.
+    """
+    __slots__ = ("_re2", "_re", "pattern", "flags", "groups", "groupindex")
+
+    def __init__(self, compiled_re2, compiled_re):
+        self._re2 = compiled_re2
+        self._re = compiled_re
+        self.pattern = compiled_re.pattern
+        self.flags = compiled_re.flags
+        self.groups = compiled_re.groups
+        self.groupindex = compiled_re.groupindex
+
+    def __repr__(self):
+        return f"Re2Pattern({self.pattern!r})"
+
+    def __getattr__(self, name):
+        return getattr(self._re, name)
+
+    def _engine(self, text):
+        if text.isascii() and not _RE2_UNSAFE_TEXT.search(text):
+            return self._re2
+        return self._re
+
+    def search(self, text, *args):
+        return self._engine(text).search(text, *args)
+
+    def match(self, text, *args):
+        return self._engine(text).match(text, *args)
+
+    def fullmatch(self, text, *args):
+        return self._engine(text).fullmatch(text, *args)
+
+def _empty_repeat_captures(items):
+    # A repeated group that can match empty with a capture inside: re runs one more (empty) iteration than re2
+    # and reports that group as "", where re2 keeps the last non-empty capture
+    for op, av in items:
+        if op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            low, high, body = av
+            if high > 1 and body.getwidth()[0] == 0 and _has_capture(body):
+                return True
+            nested = [body]
+        elif op == sre_constants.SUBPATTERN:
+            nested = [av[3]]
+        elif op == sre_constants.BRANCH:
+            nested = av[1]
+        elif op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            nested = [av[1]]
+        else:
+            continue
+        if any(_empty_repeat_captures(items) for items in nested):
+            return True
+    return False
+
+def _has_capture(items):
+    for op, av in items:
+        if op == sre_constants.SUBPATTERN and av[0] is not None:
+            return True
+        if op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            nested = [av[2]]
+        elif op == sre_constants.SUBPATTERN:
+            nested = [av[3]]
+        elif op == sre_constants.BRANCH:
+            nested = av[1]
+        else:
+            continue
+        if any(_has_capture(items) for items in nested):
+            return True
+    return False
+
+def _compile_re2(pattern, flags, compiled_re):
+    if flags & ~_RE2_FLAGS or not pattern.isascii():
+        return None  # Flags re2 lacks; non-ASCII literals can case-fold onto ASCII differently (e.g. the Kelvin sign)
+    if any(token in pattern for token in _RE2_DIFFERENT):
+        return None
+    if _empty_repeat_captures(sre_parse.parse(pattern, flags)):
+        return None
+    options = re2.Options()
+    options.log_errors = False
+    options.case_sensitive = not flags & re.IGNORECASE
+    options.dot_nl = bool(flags & re.DOTALL)
+    try:
+        compiled = re2.compile(f"(?m:{pattern})" if flags & re.MULTILINE else pattern, options)
+    except Exception:  # re2 raises its own error for what it doesn't support (lookarounds, backreferences, ...)
+        return None
+    if compiled.groups != compiled_re.groups:
+        return None
+    return Re2Pattern(compiled, compiled_re)
+
+def _regex_whitespace(pattern):
+    # re's \s matches what str.isspace() accepts, which includes \x1c-\x1f; the regex module's \s is Unicode
+    # White_Space, which doesn't. Spell those out; None for a \S inside a set, which can't be spelled out in VERSION0
+    out = []
+    i = 0
+    set_start = None  # Index just after the "[" (and "^") opening the current set
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\" and i + 1 < len(pattern):
+            escape = pattern[i + 1]
+            if escape == "s":
+                out.append(r"\s\x1c-\x1f" if set_start is not None else r"[\s\x1c-\x1f]")
+            elif escape == "S":
+                if set_start is not None:
+                    return None
+                out.append(r"[^\s\x1c-\x1f]")
+            else:
+                out.append(pattern[i:i + 2])
+            i += 2
+            continue
+        if set_start is None and char == "[":
+            set_start = i + 2 if pattern.startswith("^", i + 1) else i + 1
+            out.append(pattern[i:set_start])
+            i = set_start
+            continue
+        if char == "]" and set_start is not None and i > set_start:
+            set_start = None  # A "]" right after the opening is a literal
+        out.append(char)
+        i += 1
+    return "".join(out)
+
+def _compile_regex(pattern, flags, compiled_re):
+    if flags & re.VERBOSE:
+        return None  # "[" in comments would throw off _regex_whitespace
+    if not flags & re.ASCII:
+        pattern = _regex_whitespace(pattern)
+        if pattern is None:
+            return None
+    try:
+        compiled = regex.compile(pattern, flags | regex.VERSION0)
+    except Exception:
+        return None
+    return compiled if compiled.groups == compiled_re.groups else None
+
+def compile_with(engine, pattern, flags):
+    """
+    Compile pattern for engine, falling back to re per pattern where the engine can't run it identically.
+    Every pattern compiles with re first, so invalid patterns raise re.error whatever the engine, as callers expect.
+    """
+    compiled = re.compile(pattern, flags)
+    if engine == "regex" and regex is not None:
+        return _compile_regex(pattern, compiled.flags, compiled) or compiled
+    if engine == "re2" and re2 is not None:
+        return _compile_re2(pattern, compiled.flags, compiled) or compiled
+    return compiled
+
+def regex_module_pattern(pattern, flags):
+    """
+    The regex-module form of pattern, when the regex module is installed and runs it identically (its search()
+    takes a timeout), else None. Raises re.error for an invalid pattern.
+    """
+    compiled = re.compile(pattern, flags)
+    if regex is None:
+        return None
+    return _compile_regex(pattern, compiled.flags, compiled)
+
+def engine_of(compiled):
+    """Which engine a compiled pattern from compile_with runs on ("re2" when it can use re2 at all)."""
+    if isinstance(compiled, Re2Pattern):
+        return "re2"
+    if isinstance(compiled, re.Pattern):
+        return "re"
+    return "regex"
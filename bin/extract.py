@@ -0,0 +1,325 @@
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict, namedtuple
+from bin.patterns import compile_pattern, normalize_flags, DEFAULT_FLAGS
+from bin.prefilter import build_prefilter, lowered_text
+from bin.compose import compose_patterns
+
+FIELDS = ["name", "title", "time", "date"]
+NO_PATTERN = "No pattern detected"
+# Extracted value of a cell a bin.guard RegexGuard didn't search (its pattern had timed out too often): never kept
+SKIPPED = "<skipped>"
+ORDINAL_SUFFIX = re.compile(r"(th|rd|st|nd)")
+# "Name Regex: ..." lines, as written by Copy All / Copy in the GUIs
+COPY_ALL_LINE = re.compile(r"^(Name|Title|Time|Date) Regex:\s?(.*)$")
+# One extracted listing: a plain tuple in FIELDS order, with ._asdict() for JSON output
+ExtractionRecord = namedtuple("ExtractionRecord", FIELDS)
+EMPTY_RECORD = ExtractionRecord("", "", "", "")
+_DATE = FIELDS.index("date")
+# Test All cells remembered across runs, keyed by (field, pattern, flags, sample hash)
+TEST_ALL_CACHE_SIZE = 4096
+
+def extract_value(field, match):
+    """
+    Turn a field regex match into the extracted value, with the same rules as Test All:
+    group(0) for name, group(1) (when the pattern has groups) otherwise, "" when group 1 took no part in the match,
+    ordinal suffixes removed from dates.
+    """
+    grouped = bool(match.groups())
+    return field_value(field, match.group(0), match.group(1) if grouped else None, grouped)
+
+def field_value(field, whole, first, grouped):
+    """
+    extract_value from the text of a match (whole) and of its group 1 (first, None when it didn't participate),
+    for patterns with groups (grouped).
+    """
+    if field == "name" or not grouped:
+        extracted = whole.strip()
+    elif first is None:
+        return ""
+    else:
+        extracted = first.strip()
+    if field == "date":
+        extracted = ORDINAL_SUFFIX.sub("", extracted).strip()
+    return extracted
+
+def span_values(text, spans):
+    """
+    The field values of Extractor.extract_spans's (text, spans), as extract_value makes them: each span sliced
+    out of text and stripped, "" for None, ordinal suffixes removed from the date.
+    """
+    values = ["" if span is None else text[span[0]:span[1]].strip() for span in spans]
+    if values[_DATE]:
+        values[_DATE] = ORDINAL_SUFFIX.sub("", values[_DATE]).strip()
+    return values
+
+def load_pattern_set(path):
+    """
+    Load a saved name/title/time/date pattern set.
+    Accepts a JSON object keyed by field, or the text produced by Copy All ("Name Regex: ..." lines).
+    Returns: {field: pattern string}, with "" for fields that have no pattern.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError:
+        data = {}
+        for line in content.splitlines():
+            match = COPY_ALL_LINE.match(line.strip())
+            if match:
+                data[match.group(1).lower()] = match.group(2)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path} does not contain a pattern set")
+    patterns = {field: (data.get(field) or "").strip() for field in FIELDS}
+    if not any(patterns.values()):
+        raise ValueError(f"No name/title/time/date patterns found in {path}")
+    return patterns
+
+def compile_pattern_set(patterns):
+    """
+    Compile a pattern set once for repeated use.
+    Returns: {field: compiled pattern or None}. Raises re.error naming the field on an invalid pattern.
+    """
+    compiled = {}
+    for field in FIELDS:
+        pattern = (patterns.get(field) or "").strip()
+        if not pattern or pattern == NO_PATTERN:
+            compiled[field] = None
+            continue
+        try:
+            compiled[field] = compile_pattern(pattern)
+        except re.error as e:
+            raise re.error(f"{field} regex: {e}") from e
+    return compiled
+
+class Extractor:
+    """
+    GUI-free extraction with a saved name/title/time/date pattern set, for embedding BossEx in other services.
+    The patterns are compiled once, when the Extractor is built, and it can't be modified afterwards,
+    so a single instance can be shared by any number of threads. Each pattern's required literals
+    (bin.prefilter) are checked before its regex, so lines that can't match skip the search.
+    compose=True evaluates the patterns without required literals in one composed regex (bin.compose)
+    instead of one search each; the results are the same, but with re it is usually slower, so it is off by default.
+
+        extractor = Extractor.from_file("patterns.json")
+        record = extractor.extract(line)  # ExtractionRecord(name=..., title=..., time=..., date=...)
+    """
+    __slots__ = ("patterns", "_regexes", "_composed", "_groups")
+
+    def __init__(self, patterns, compose=False):
+        """patterns: {field: pattern}, as returned by load_pattern_set. Raises re.error naming the field on an invalid pattern."""
+        compiled = compile_pattern_set(patterns)
+        prefilters = {field: build_prefilter(regex.pattern) for field, regex in compiled.items() if regex is not None}
+        composed, groups = None, ()
+        if compose:
+            composed, groups, _ = compose_patterns(tuple(
+                (field, compiled[field].pattern) for field in FIELDS if field in prefilters and prefilters[field] is None
+            ))
+        in_composed = {field for field, _, _ in groups}
+        object.__setattr__(self, "patterns", tuple((field, (patterns.get(field) or "").strip()) for field in FIELDS))
+        # The group holding each field's value, as extract_value picks it
+        object.__setattr__(self, "_regexes", tuple(
+            (FIELDS.index(field), compiled[field], prefilters[field], 1 if field != "name" and compiled[field].groups else 0)
+            for field in FIELDS if field in prefilters and field not in in_composed
+        ))
+        object.__setattr__(self, "_composed", composed)
+        object.__setattr__(self, "_groups", tuple(
+            (FIELDS.index(field), group, first if first and field != "name" else group) for field, group, first in groups
+        ))
+
+    @classmethod
+    def from_file(cls, path, compose=False):
+        return cls(load_pattern_set(path), compose)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Extractor is immutable")
+
+    def __repr__(self):
+        return f"Extractor({dict(self.patterns)!r})"
+
+    def _spans(self, text):
+        # The span of the group each field's value comes from, or None
+        spans = [None] * len(FIELDS)
+        if self._composed is not None:
+            match = self._composed.match(text)
+            for position, group, value_group in self._groups:
+                if match.start(group) >= 0:
+                    spans[position] = match.span(value_group)
+        lowered = lowered_text(text)
+        for position, regex, prefilter, value_group in self._regexes:
+            if prefilter is not None and not prefilter(text, lowered):
+                continue
+            match = regex.search(text)
+            if match:
+                spans[position] = match.span(value_group)
+        return spans
+
+    def extract(self, line):
+        """Extract every field from one listing line (surrounding whitespace ignored). Returns an ExtractionRecord."""
+        text = line.strip()
+        if not text:
+            return EMPTY_RECORD
+        spans = self._spans(text)
+        # Values are only sliced out of lines where something matched
+        return ExtractionRecord._make(span_values(text, spans)) if any(spans) else EMPTY_RECORD
+
+    def extract_spans(self, line):
+        """
+        Where extract() finds each field, without building the values: (text, spans), text being the stripped line
+        and spans[i] the (start, end) in text of the match group FIELDS[i]'s value comes from, or None.
+        span_values(text, spans) gives extract()'s values; the spans themselves are for highlighting matches.
+        """
+        text = line.strip()
+        return text, (self._spans(text) if text else [None] * len(FIELDS))
+
+    def extract_many(self, lines):
+        """
+        Lazily extract an iterable of lines, one ExtractionRecord per line in input order
+        (blank lines give EMPTY_RECORD, so results zip with the input). Memory stays constant.
+        """
+        extract = self.extract
+        for line in lines:
+            yield extract(line)
+
+def sample_hash(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+class TestAllGrid:
+    """
+    Incremental Test All: one row per sample, one column per field.
+    Each run compares the samples and patterns with the previous run, so editing one regex
+    re-evaluates only its column and editing one sample only its row; every other cell is reused.
+    Cells are also kept in a bounded cache keyed by (pattern, flags, sample hash), so switching a
+    regex or a sample back to an earlier value costs nothing either. Cells whose sample lacks the
+    pattern's required literals (bin.prefilter) are filled in without running the regex; with compose=True
+    the other cells a row needs are evaluated together by one composed regex (bin.compose), as in Extractor.
+    guard: optional bin.guard RegexGuard the searches of a run go through, in one batch, so a pattern that
+    runs away shows as timed out (cached like any other cell) instead of hanging the run; compose is then ignored.
+    Cells the guard skipped (SKIPPED) are neither cached nor reused: the next run searches them.
+    Safe to share between worker threads: runs are serialized, and a cancelled run keeps the previous state.
+    """
+
+    def __init__(self, flags=DEFAULT_FLAGS, maxsize=TEST_ALL_CACHE_SIZE, compose=False, guard=None):
+        self.flags = normalize_flags(flags)
+        self.maxsize = maxsize
+        self.compose = compose
+        self.guard = guard
+        self.evaluated = 0  # Cells computed by the last run
+        self.reused = 0  # Cells taken from the previous run or the cache
+        self.skipped = 0  # Evaluated cells the prefilter answered without a search
+        self._cache = OrderedDict()
+        self._samples = {}  # row -> sample text of the last completed run
+        self._patterns = {}  # field -> pattern of the last completed run
+        self._rows = {}  # row -> {field: (extracted, error)}
+        self._lock = threading.Lock()
+
+    def _cached(self, field, pattern, digest):
+        key = (field, pattern, self.flags, digest)
+        cell = self._cache.get(key)
+        if cell is not None:
+            self._cache.move_to_end(key)
+            self.reused += 1
+        return cell
+
+    def _store(self, field, pattern, digest, cell):
+        self._cache[(field, pattern, self.flags, digest)] = cell
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+    def _evaluate(self, fields, patterns, text, digest, lowered):
+        # The cells of one row that neither the previous run nor the cache had, except those left to the guard:
+        # returns (cells, [(field, pattern)] still to search)
+        cells = {}
+        searched = []
+        for field in fields:
+            pattern = patterns[field]
+            self.evaluated += 1
+            try:
+                compile_pattern(pattern, self.flags)  # Reports an invalid pattern before the prefilter hides it
+            except re.error as e:
+                cells[field] = ("", str(e))
+                continue
+            prefilter = build_prefilter(pattern, self.flags)
+            if prefilter is not None and not prefilter(text, lowered):
+                self.skipped += 1
+                cells[field] = ("", None)
+            else:
+                searched.append((field, pattern))
+        if self.guard is not None:
+            for field, cell in cells.items():
+                self._store(field, patterns[field], digest, cell)
+            return cells, searched
+        composed, groups, rest = None, (), [field for field, _ in searched]
+        if self.compose and len(searched) > 1:
+            composed, groups, rest = compose_patterns(tuple(searched), self.flags)
+        if composed is not None:
+            match = composed.match(text)
+            for field, group, first in groups:
+                whole = match.group(group)
+                value = field_value(field, whole, match.group(first) if first else None, first is not None) if whole is not None else ""
+                cells[field] = (value, None)
+        for field in rest:
+            match = compile_pattern(patterns[field], self.flags).search(text)
+            cells[field] = (extract_value(field, match) if match else "", None)
+        for field, cell in cells.items():
+            self._store(field, patterns[field], digest, cell)
+        return cells, []
+
+    def run(self, samples, patterns, token=None):
+        """
+        Evaluate Test All for samples [(row, text)] and patterns {field: pattern}.
+        token: optional bin.worker CancelToken, checked between rows (and between guarded searches).
+        Returns: list of (row, {field: extracted}, [(field, error message)]), in sample order.
+        """
+        patterns = {field: (patterns.get(field) or "").strip() for field in FIELDS}
+        with self._lock:
+            self.evaluated = self.reused = self.skipped = 0
+            changed_fields = {field for field in FIELDS if self._patterns.get(field) != patterns[field]}
+            rows = {}
+            results = []
+            guarded = []  # (row cells, field, pattern, text, digest) left to the guard
+            for row, text in samples:
+                if token is not None:
+                    token.check()
+                previous = self._rows.get(row) if self._samples.get(row) == text else None
+                digest = None
+                cells = {}
+                missing = []
+                for field in FIELDS:
+                    pattern = patterns[field]
+                    if previous is not None and field not in changed_fields and previous[field][0] != SKIPPED:
+                        cells[field] = previous[field]
+                        self.reused += 1
+                    elif not pattern or pattern == NO_PATTERN:
+                        cells[field] = ("", None)
+                    else:
+                        if digest is None:
+                            digest = sample_hash(text)
+                        cell = self._cached(field, pattern, digest)
+                        if cell is None:
+                            missing.append(field)
+                        else:
+                            cells[field] = cell
+                if missing:
+                    evaluated, searched = self._evaluate(missing, patterns, text, digest, lowered_text(text))
+                    cells.update(evaluated)
+                    guarded.extend((cells, field, pattern, text, digest) for field, pattern in searched)
+                rows[row] = cells
+            if guarded:
+                # One guarded batch for the whole run: a round trip to the guard's process per search would cost more
+                outcomes = self.guard.evaluate([(field, pattern, self.flags, text) for _, field, pattern, text, _ in guarded], token)
+                for (cells, field, pattern, _, digest), cell in zip(guarded, outcomes):
+                    cells[field] = cell
+                    if cell[0] != SKIPPED:  # Searched by the next run instead
+                        self._store(field, pattern, digest, cell)
+            for row, _ in samples:
+                cells = rows[row]
+                results.append((row, {field: cells[field][0] for field in FIELDS},
+                                [(field, cells[field][1]) for field in FIELDS if cells[field][1]]))
+            self._samples = dict(samples)
+            self._patterns = patterns
+            self._rows = rows
+            return results
@@ -0,0 +1,287 @@
+import multiprocessing
+import re
+import threading
+from functools import lru_cache
+from bin.engines import regex_module_pattern
+from bin.extract import extract_value, FIELDS, NO_PATTERN, SKIPPED, ExtractionRecord
+from bin.patterns import compile_pattern, get_registry, set_engine, DEFAULT_FLAGS
+from bin.prefilter import build_prefilter, lowered_text
+
+# Seconds one pattern may spend on one line before it is given up on
+DEFAULT_TIMEOUT = 0.5
+# Extracted value shown for a cell whose pattern timed out
+TIMED_OUT = "<timed out>"
+# Searches of one pattern that may time out in one evaluation; its later items are skipped (SKIPPED), not searched
+MAX_PATTERN_TIMEOUTS = 3
+# Seconds the evaluation process may take to start (imports, config) before guarded runs give up on it
+STARTUP_TIMEOUT = 30
+# Lines evaluated per round trip to the process by extract_many
+DEFAULT_CHUNK_LINES = 512
+
+def timeout_message(timeout):
+    return f"timed out after {timeout:g} s"
+
+def skipped_message(timeouts):
+    return f"not searched: the pattern timed out on {timeouts} other lines"
+
+@lru_cache(maxsize=512)
+def _timed_pattern(pattern, flags):
+    # The regex-module form of a pattern when it runs identically there (bin.engines), for its timeout argument
+    return regex_module_pattern(pattern, flags)
+
+def _evaluate(field, pattern, flags, text):
+    try:
+        match = compile_pattern(pattern, flags).search(text)
+    except re.error as e:
+        return "", str(e)
+    return (extract_value(field, match) if match else ""), None
+
+def _serve(conn, engine):
+    # Evaluation process: answers each batch of items one result at a time, so the caller can time every call
+    set_engine(engine)
+    conn.send(None)
+    while True:
+        try:
+            items = conn.recv()
+        except EOFError:
+            return
+        for field, pattern, flags, text in items:
+            conn.send(_evaluate(field, pattern, flags, text))
+
+def check_patterns(guard, patterns, samples, token=None):
+    """
+    Copy-time validation: run each pattern of {field: pattern} over the samples [(row, text)] through guard.
+    Returns: ["Title regex on sample 3: timed out after 0.5 s", ...], one message per failing field.
+    """
+    items = [(field, pattern, DEFAULT_FLAGS, text) for field, pattern in patterns.items()
+             if pattern and pattern != NO_PATTERN for _, text in samples]
+    rows = [row for field, pattern in patterns.items() if pattern and pattern != NO_PATTERN for row, _ in samples]
+    problems = {}
+    for (field, _, _, _), row, (_, error) in zip(items, rows, guard.evaluate(items, token)):
+        if error and field not in problems:
+            problems[field] = f"{field.capitalize()} regex on sample {row + 1}: {error}"
+    return list(problems.values())
+
+def guarded_lines(extractor, lines, fallback):
+    """
+    The items RegexGuard.extract_many takes for an Extractor or a bin.templates TemplateRouter over an iterable of lines:
+    ((line number, template signature or None), Extractor, stripped text), blank lines skipped; lines no template
+    routes go to fallback as (line number, text).
+    """
+    if hasattr(extractor, "route_many"):
+        for line_number, signature, routed, text in extractor.route_many(lines, fallback):
+            yield (line_number, signature), routed, text
+        return
+    for line_number, line in enumerate(lines, 1):
+        text = line.strip()
+        if text:
+            yield (line_number, None), extractor, text
+
+class RegexGuard:
+    """
+    Runs user-edited patterns with a time budget per search, so one catastrophic pattern (nested quantifiers
+    and the like) is reported as timed out instead of hanging Test All, copying or a batch run.
+    Patterns the regex module runs identically (bin.engines) are searched in this process with its timeout
+    argument; the others go to one long-lived evaluation process, which is killed and restarted only when a
+    search overruns. Items are sent in batches and answered one by one, so the budget is per search while the
+    cost of a round trip is shared. Without multiprocessing (e.g. on Android) such patterns run unguarded.
+    Thread-safe: evaluations are serialized.
+    """
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT, engine=None):
+        self.timeout = timeout
+        self.engine = engine  # Engine of the evaluation process (default: the active registry's when it starts)
+        self.timed_out = 0  # Searches given up on so far
+        self.skipped = 0  # Searches not made because their pattern had timed out too often (MAX_PATTERN_TIMEOUTS)
+        self.restarts = 0  # Evaluation processes killed for overrunning
+        self._process = None
+        self._conn = None
+        self._pending = 0  # Answers still on their way from a cancelled batch
+        self._unavailable = False
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"RegexGuard(timeout={self.timeout!r})"
+
+    def _start(self):
+        context = multiprocessing.get_context("spawn")
+        conn, child_conn = context.Pipe()
+        process = context.Process(target=_serve, args=(child_conn, self.engine or get_registry().engine), daemon=True)
+        process.start()
+        child_conn.close()
+        if not conn.poll(STARTUP_TIMEOUT):
+            process.kill()
+            raise RuntimeError("regex evaluation process did not start")
+        conn.recv()
+        self._process, self._conn, self._pending = process, conn, 0
+
+    def _stop(self):
+        if self._process is not None:
+            self._process.kill()
+            self._process.join()
+            self._conn.close()
+        self._process = self._conn = None
+        self._pending = 0
+
+    def close(self):
+        """Stop the evaluation process (a later evaluation starts a new one)."""
+        with self._lock:
+            self._stop()
+
+    def _connection(self):
+        # The running process, with the answers of a cancelled batch drained; None when processes can't be used
+        if self._unavailable:
+            return None
+        while self._process is not None and self._pending:
+            if not self._conn.poll(self.timeout):
+                self._stop()
+                self.restarts += 1
+                break
+            self._conn.recv()
+            self._pending -= 1
+        if self._process is None:
+            try:
+                self._start()
+            except (OSError, ImportError, RuntimeError, ValueError):
+                self._unavailable = True
+                return None
+        return self._conn
+
+    def _timed_out(self, item, given_up):
+        # Record a search that ran out of time; returns its result
+        _, pattern, flags, text = item
+        given_up.setdefault((pattern, flags), set()).add(text)
+        self.timed_out += 1
+        return TIMED_OUT, timeout_message(self.timeout)
+
+    def _known(self, item, given_up):
+        # The result of an item that isn't searched, or None: the repeat of a search that timed out is TIMED_OUT,
+        # and once a pattern has timed out MAX_PATTERN_TIMEOUTS times its other items are SKIPPED
+        _, pattern, flags, text = item
+        texts = given_up.get((pattern, flags))
+        if not texts:
+            return None
+        if text in texts:
+            self.timed_out += 1
+            return TIMED_OUT, timeout_message(self.timeout)
+        if len(texts) >= MAX_PATTERN_TIMEOUTS:
+            self.skipped += 1
+            return SKIPPED, skipped_message(len(texts))
+        return None
+
+    def _remote(self, items, results, indices, token, given_up):
+        while indices:
+            waiting = []
+            for i in indices:
+                known = self._known(items[i], given_up)
+                if known is None:
+                    waiting.append(i)
+                else:
+                    results[i] = known
+            if not waiting:
+                return
+            conn = self._connection()
+            if conn is None:
+                for i in waiting:
+                    results[i] = _evaluate(*items[i])
+                return
+            conn.send([items[i] for i in waiting])
+            self._pending = len(waiting)
+            indices = []
+            for n, i in enumerate(waiting):
+                if token is not None and token.cancelled:
+                    token.check()  # The rest of the answers are drained by the next evaluation
+                if not conn.poll(self.timeout):
+                    # The process is stuck on this search: restart it and send the rest again
+                    self._stop()
+                    self.restarts += 1
+                    results[i] = self._timed_out(items[i], given_up)
+                    indices = waiting[n + 1:]
+                    break
+                results[i] = conn.recv()
+                self._pending -= 1
+
+    def evaluate(self, items, token=None):
+        """
+        items: [(field, pattern, flags, text)]. token: optional bin.worker CancelToken, checked between searches.
+        Returns: [(extracted value, error message or None)] in item order, as Test All shows them:
+        ("", message) for an invalid pattern, (TIMED_OUT, message) for a search that ran out of time.
+        A search that timed out isn't repeated for an identical item of the same evaluation. A pattern that times out
+        on MAX_PATTERN_TIMEOUTS lines isn't searched on the rest of them: those items are (SKIPPED, message), which
+        bounds what a runaway pattern costs an evaluation.
+        """
+        results = [None] * len(items)
+        remote = []
+        given_up = {}  # (pattern, flags) -> texts it ran out of time on in this evaluation
+        with self._lock:
+            for i, item in enumerate(items):
+                field, pattern, flags, text = item
+                if token is not None:
+                    token.check()
+                known = self._known(item, given_up)
+                if known is not None:
+                    results[i] = known
+                    continue
+                try:
+                    timed = _timed_pattern(pattern, flags)
+                except re.error as e:
+                    results[i] = ("", str(e))
+                    continue
+                if timed is None:
+                    remote.append(i)
+                    continue
+                try:
+                    match = timed.search(text, timeout=self.timeout)
+                except TimeoutError:
+                    results[i] = self._timed_out(item, given_up)
+                    continue
+                results[i] = ((extract_value(field, match) if match else ""), None)
+            if remote:
+                self._remote(items, results, remote, token, given_up)
+        return results
+
+    def extract_many(self, items, flags=DEFAULT_FLAGS, chunk_lines=DEFAULT_CHUNK_LINES):
+        """
+        Guarded extraction for batch runs. items: iterable of (tag, Extractor, stripped non-blank line), e.g. the line
+        number and the Extractor (or the template's) for that line. Yields (tag, ExtractionRecord, (fields that timed out),
+        (fields skipped)) in input order; the lines are evaluated chunk_lines at a time, and the patterns' prefilters still
+        apply. A field is skipped on lines where its pattern had already timed out MAX_PATTERN_TIMEOUTS times in the chunk.
+        """
+        plans = {}  # Extractor -> [(field, pattern, prefilter)]
+        chunk = []
+        for tag, extractor, text in items:
+            plan = plans.get(extractor)
+            if plan is None:
+                plan = plans[extractor] = [(field, pattern, build_prefilter(pattern, flags)) for field, pattern
+                                           in extractor.patterns if pattern and pattern != NO_PATTERN]
+            chunk.append((tag, plan, text))
+            if len(chunk) >= chunk_lines:
+                yield from self._extract_chunk(chunk, flags)
+                chunk = []
+        if chunk:
+            yield from self._extract_chunk(chunk, flags)
+
+    def _extract_chunk(self, chunk, flags):
+        searches = []
+        counts = []  # Searches of each line
+        for _, plan, text in chunk:
+            count = len(searches)
+            lowered = lowered_text(text)
+            for field, pattern, prefilter in plan:
+                if prefilter is None or prefilter(text, lowered):
+                    searches.append((field, pattern, flags, text))
+            counts.append(len(searches) - count)
+        results = iter(zip(searches, self.evaluate(searches)))
+        for (tag, _, _), count in zip(chunk, counts):
+            values = dict.fromkeys(FIELDS, "")
+            timed_out = []
+            skipped = []
+            for _ in range(count):
+                (field, _, _, _), (value, _) = next(results)
+                if value == TIMED_OUT:
+                    timed_out.append(field)
+                elif value == SKIPPED:
+                    skipped.append(field)
+                else:
+                    values[field] = value
+            yield tag, ExtractionRecord(**values), tuple(timed_out), tuple(skipped)
@@ -4,13 +4,33 @@ import re
 import base64
 import io
 import json
+import multiprocessing
 import os
 import sys
 from bin.name_field import process_name_field
 from bin.title_field import process_title_field
-from bin.time_field import process_time_field, refresh_time_field
+from bin.time_field import process_time_field, refresh_time_field, find_time_candidates
 from bin.date_field import process_date_field, refresh_date_field
 from bin.auto import auto_process
+from bin.separators import separator_index, separator_helpers
+from bin.date_components import build_base_pattern, identify_components
+from bin.patterns import compile_pattern, load_registry
+from bin.timezones import configure_timezones, timezone_score
+from bin.extract import TestAllGrid
+from bin.guard import RegexGuard, check_patterns, DEFAULT_TIMEOUT
+from bin.instrument import record_stages, format_stages
+from bin.worker import BackgroundRunner
+from bin.samples import SampleList
+from bin.consensus import synthesize_patterns
+
+# Pause in typing before a live Test All runs
+LIVE_TEST_ALL_DELAY_MS = 300
+# Sample rows with widgets; the rest of the sample list is scrolled through them
+VISIBLE_SAMPLE_ROWS = 5
+
+# This module is started from a launcher script rather than run itself. A PyInstaller build starts the RegexGuard
+# evaluation process (spawn) by re-running that script, which imports this module first: hand the process over here
+multiprocessing.freeze_support()
 
 def resource_path(relative_path):
     """Get the absolute path to a resource, works for dev, PyInstaller, and potential Android use."""
@@ -23,23 +43,132 @@ def resource_path(relative_path):
     
     return os.path.join(base_path, relative_path)
 
+class SampleListView:
+    """
+    Windowed view over a SampleList: a fixed pool of row widgets (number, check, Copy, text) is
+    reused for whichever rows are scrolled into view, so thousands of samples cost no more widgets
+    or highlight tags than the visible ones. Edits are written back to the SampleList as they happen.
+    """
+
+    def __init__(self, parent, samples, visible_rows, on_copy, on_edit, add_menu):
+        self.samples = samples
+        self.on_edit = on_edit
+        self.first = 0
+        self.frame = tk.Frame(parent)
+        self.rows = []
+        for r in range(visible_rows):
+            label = tk.Label(self.frame, width=5, anchor="e")
+            label.grid(row=r, column=0)
+            var = tk.BooleanVar()
+            check = tk.Checkbutton(self.frame, variable=var, command=lambda r=r: self.on_check(r))
+            check.grid(row=r, column=1, padx=5)
+            tk.Button(self.frame, text="Copy", command=lambda r=r: on_copy(self.first + r)).grid(row=r, column=2, padx=2)
+            text = tk.Text(self.frame, height=1, width=50, bg="white")
+            text.grid(row=r, column=3, padx=5, pady=2, sticky="ew")
+            text.tag_configure("highlight", background="lightgreen")
+            add_menu(text)
+            text.bind("<<Modified>>", lambda event, r=r: self.on_modified(r))
+            for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+                text.bind(sequence, self.on_wheel)
+            self.rows.append((label, check, var, text))
+        self.scrollbar = tk.Scrollbar(self.frame, orient="vertical", command=self.yview)
+        self.scrollbar.grid(row=0, column=4, rowspan=visible_rows, sticky="ns")
+        self.frame.grid_columnconfigure(3, weight=1)
+        self.render()
+
+    def visible_rows(self):
+        """[(sample row, text widget)] for the samples currently in view."""
+        count = len(self.samples)
+        return [(self.first + r, widgets[3]) for r, widgets in enumerate(self.rows) if self.first + r < count]
+
+    def render(self):
+        count = len(self.samples)
+        self.first = max(0, min(self.first, count - len(self.rows)))
+        for r, (label, check, var, text) in enumerate(self.rows):
+            row = self.first + r
+            present = row < count
+            content = self.samples.texts[row] if present else ""
+            label.config(text=f"{row+1}" if present else "")
+            var.set(present and row in self.samples.checked)
+            text.config(state="normal")
+            if text.get("1.0", "end-1c") != content:
+                text.delete("1.0", "end")
+                text.insert("1.0", content)
+            text.edit_modified(False)
+            self.apply_highlights(r)
+            text.config(state="normal" if present else "disabled")
+            check.config(state="normal" if present else "disabled")
+        if count:
+            self.scrollbar.set(self.first / count, min(1.0, (self.first + len(self.rows)) / count))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def apply_highlights(self, r):
+        text = self.rows[r][3]
+        text.tag_remove("highlight", "1.0", "end")
+        row = self.first + r
+        if row < len(self.samples):
+            for start_idx, end_idx, _ in self.samples.row_highlights(row):
+                text.tag_add("highlight", f"1.0 + {start_idx} chars", f"1.0 + {end_idx} chars")
+
+    def refresh_highlights(self, rows=None):
+        """Redraw highlights of the given sample rows (all visible rows by default), if they are in view."""
+        for r in range(len(self.rows)):
+            if rows is None or self.first + r in rows:
+                self.apply_highlights(r)
+
+    def yview(self, *args):
+        if args[0] == "moveto":
+            self.first = int(float(args[1]) * len(self.samples))
+        elif args[0] == "scroll":
+            self.first += int(args[1]) * (len(self.rows) if args[2] == "pages" else 1)
+        self.render()
+
+    def on_wheel(self, event):
+        self.yview("scroll", -1 if event.num == 4 or event.delta > 0 else 1, "units")
+        return "break"
+
+    def on_check(self, r):
+        row = self.first + r
+        if row < len(self.samples):
+            self.samples.set_checked(row, self.rows[r][2].get())
+
+    def on_modified(self, r):
+        text = self.rows[r][3]
+        text.edit_modified(False)  # Re-arm <<Modified>> for the next edit
+        row = self.first + r
+        content = text.get("1.0", "end-1c")
+        if row < len(self.samples) and content != self.samples.texts[row]:
+            self.samples.set_text(row, content)
+            self.on_edit(row)
+
 class BossEx:
     def __init__(self, root, config):
         self.root = root
         self.config = config
         self.root.title("BossEx Alpha V4: AED Regex Builder - A GoonerB Project")
         self.root.geometry("800x720")
-        self.max_samples = 5
+        self.samples = SampleList()  # Sample texts, Copy All checks and highlights
         self.current_field = None
-        self.calculated_samples = {i: [] for i in range(self.max_samples)}
         self.check_vars = {}
         self.anchor_enabled = {"time": True, "date": True}
         self.last_separator = {"time": None, "date": None}
         self.last_pattern = {"time": None, "date": None}
         self.last_time_matches = []  # Store time matches from auto_process
+        self.last_stages = []  # Stage timings of the last Auto/Alt. run
+        # Auto/Alt./Test All run on worker threads; results come back through root.after on the Tk thread
+        self.worker = BackgroundRunner(lambda fn: self.root.after(0, fn), on_busy=self.set_busy)
+        # Edited patterns run with a time budget per search ("regex_timeout" in config.json), so a runaway one can't hang the app
+        self.regex_guard = RegexGuard(self.config.get("regex_timeout", DEFAULT_TIMEOUT))
+        self.test_all_grid = TestAllGrid(guard=self.regex_guard)  # Only cells whose sample or regex changed are re-evaluated
+        self.live_test_all = tk.BooleanVar(value=False)
+        self.live_test_all_job = None
 
         # Load config
         self.possible_separators = [item["symbol"] for item in config["separators"]]
+        self.detect_separator, self.count_separators_before = separator_helpers(self.possible_separators)
+        load_registry(config)
+        configure_timezones(config)
 
         # Load and display the logo from logo.json
         try:
@@ -62,34 +191,25 @@ class BossEx:
         timezone_dropdown = tk.OptionMenu(self.timezone_frame, self.timezone_var, *[tz["friendly_name"] for tz in config["timezones"]])
         timezone_dropdown.pack(side=tk.LEFT, padx=5)
         tk.Button(self.timezone_frame, text="Auto", command=self.auto_process).pack(side=tk.LEFT, padx=5)
+        tk.Button(self.timezone_frame, text="Consensus", command=self.consensus_process).pack(side=tk.LEFT, padx=5)
+        self.busy_label = tk.Label(self.timezone_frame, text="", fg="gray", width=10)
+        self.busy_label.pack(side=tk.LEFT, padx=5)
 
-        # Sample area
+        # Sample area (only the visible rows have widgets)
         self.sample_frame = tk.Frame(root)
         self.sample_frame.pack(pady=10, fill="x", padx=10)
-        self.sample_texts = []
-        self.sample_checks = []
-        self.sample_copy_buttons = []
-        for i in range(self.max_samples):
-            var = tk.BooleanVar()
-            check = tk.Checkbutton(self.sample_frame, variable=var)
-            check.grid(row=i, column=0, padx=5)
-            self.check_vars[f"sample_{i}"] = var
-            self.sample_checks.append(check)
-
-            copy_btn = tk.Button(self.sample_frame, text="Copy", command=lambda idx=i: self.copy_single_field(f"sample_{idx}"))
-            copy_btn.grid(row=i, column=1, padx=2)
-            self.sample_copy_buttons.append(copy_btn)
-
-            text = tk.Text(self.sample_frame, height=1, width=50, bg="white")
-            text.grid(row=i, column=2, padx=5, pady=2, sticky="ew")
-            text.insert("1.0", f"SAMPLE DATA {i+1}")
-            text.tag_configure("highlight", background="lightgreen")
-            menu = tk.Menu(text, tearoff=0)
-            menu.add_command(label="Cut", command=lambda t=text: self.cut_text(t))
-            menu.add_command(label="Copy", command=lambda t=text: self.copy_text(t))
-            menu.add_command(label="Paste", command=lambda t=text: self.paste_text(t))
-            text.bind("<Button-3>", lambda event, m=menu: m.post(event.x_root, event.y_root))
-            self.sample_texts.append(text)
+        self.sample_view = SampleListView(
+            self.sample_frame, self.samples, VISIBLE_SAMPLE_ROWS,
+            on_copy=lambda idx: self.copy_single_field(f"sample_{idx}"),
+            on_edit=lambda idx: self.schedule_live_test_all(),
+            add_menu=self.add_edit_menu
+        )
+        self.sample_view.frame.pack(fill="x")
+        self.sample_tools = tk.Frame(self.sample_frame)
+        self.sample_tools.pack(fill="x")
+        tk.Button(self.sample_tools, text="Paste Lines", command=self.paste_samples).pack(side=tk.LEFT, padx=5)
+        self.sample_count_label = tk.Label(self.sample_tools, text=f"{len(self.samples)} samples", fg="gray")
+        self.sample_count_label.pack(side=tk.LEFT, padx=5)
 
         # Selection buttons
         self.button_frame = tk.Frame(root)
@@ -100,6 +220,8 @@ class BossEx:
         tk.Button(self.button_frame, text="Date", command=lambda: self.select_field("date")).grid(row=0, column=3, padx=5)
         tk.Button(self.button_frame, text="Copy All", command=self.copy_all).grid(row=0, column=4, padx=5)
         tk.Button(self.button_frame, text="Test All", command=self.test_all).grid(row=0, column=5, padx=5)
+        tk.Button(self.button_frame, text="Timings", command=self.show_timings).grid(row=0, column=6, padx=5)
+        tk.Checkbutton(self.button_frame, text="Live", variable=self.live_test_all, command=self.schedule_live_test_all).grid(row=0, column=7, padx=5)
 
         # Regex and extraction
         self.regex_frame = tk.Frame(root)
@@ -117,9 +239,13 @@ class BossEx:
             "time": tk.Entry(self.regex_frame, width=50),
             "date": tk.Entry(self.regex_frame, width=50)
         }
+        self.regex_vars = {}
         self.regex_checks = {}
         self.regex_copy_buttons = {}
         for field in ["name", "title", "time", "date"]:
+            self.regex_vars[field] = tk.StringVar()
+            self.regex_vars[field].trace_add("write", lambda *args: self.schedule_live_test_all())
+            self.regex_entries[field].config(textvariable=self.regex_vars[field])
             var = tk.BooleanVar()
             self.regex_checks[field] = tk.Checkbutton(self.regex_frame, variable=var)
             self.check_vars[f"regex_{field}"] = var
@@ -217,7 +343,6 @@ class BossEx:
         self.test_all_text.grid(row=1, column=0, columnspan=2, pady=5, sticky="nsew")
         self.test_all_text.config(state="disabled")
 
-        self.sample_frame.grid_columnconfigure(2, weight=1)
         self.regex_frame.grid_columnconfigure(3, weight=1)
         self.format_frame.grid_columnconfigure(3, weight=1)
         self.extraction_frame.grid_columnconfigure(2, weight=1)
@@ -254,12 +379,15 @@ class BossEx:
         output = ""
         if field_key.startswith("sample_"):
             idx = int(field_key.split("_")[1])
-            content = self.sample_texts[idx].get("1.0", "end-1c").strip()
+            content = self.samples.text(idx) if idx < len(self.samples) else ""
             output = f"Sample {idx+1}: {content}"
         elif field_key.startswith("regex_"):
             field = field_key.split("_")[1]
             content = self.regex_entries[field].get().strip()
             output = f"{field.capitalize()} Regex: {content}"
+            if content:
+                self.copy_checked({field: content}, output, f"Copied to clipboard: {output}")
+                return
         elif field_key.startswith("format_"):
             field = field_key.split("_")[1]
             content = self.format_entries[field].get().strip()
@@ -269,28 +397,49 @@ class BossEx:
             output = f"Extraction: {content}"
 
         if output:
-            try:
-                self.root.clipboard_clear()
-                self.root.clipboard_append(output)
-                self.root.update()
-                messagebox.showinfo("Success", f"Copied to clipboard: {output}")
-            except tk.TclError as e:
-                messagebox.showerror("Error", f"Failed to copy to clipboard: {e}")
+            self.copy_to_clipboard(output, f"Copied to clipboard: {output}")
         else:
             messagebox.showwarning("Warning", "No content to copy.")
 
+    def copy_to_clipboard(self, output, success_message):
+        try:
+            self.root.clipboard_clear()
+            self.root.clipboard_append(output)
+            self.root.update()
+            messagebox.showinfo("Success", success_message)
+        except tk.TclError as e:
+            messagebox.showerror("Error", f"Failed to copy to clipboard: {e}")
+
+    def copy_checked(self, patterns, output, success_message):
+        # Copy-time validation: the patterns run over the samples through the guard, off the UI thread
+        samples = self.samples.valid_samples()
+
+        def confirm(problems):
+            if problems and not messagebox.askyesno("Warning", "\n".join(problems) + "\n\nCopy anyway?"):
+                return
+            self.copy_to_clipboard(output, success_message)
+
+        self.worker.submit("copy", lambda token: check_patterns(self.regex_guard, patterns, samples, token), confirm, self.show_worker_error)
+
+    def show_timings(self):
+        if not self.last_stages:
+            messagebox.showinfo("Timings", "No timings yet. Run Auto or Alt. first.")
+            return
+        messagebox.showinfo("Timings", "\n".join(format_stages(self.last_stages)))
+
     def copy_all(self):
         output = []
-        for i in range(self.max_samples):
-            if self.check_vars[f"sample_{i}"].get():
-                content = self.sample_texts[i].get("1.0", "end-1c").strip()
-                if content:
-                    output.append(f"Sample {i+1}: {content}")
+        for i in self.samples.checked_rows():
+            content = self.samples.text(i)
+            if content:
+                output.append(f"Sample {i+1}: {content}")
+        patterns = {}
         for field in ["name", "title", "time", "date"]:
             if self.check_vars[f"regex_{field}"].get():
                 content = self.regex_entries[field].get().strip()
                 if content:
                     output.append(f"{field.capitalize()} Regex: {content}")
+                    patterns[field] = content
         for field in ["time", "date"]:
             if self.check_vars[f"format_{field}"].get():
                 content = self.format_entries[field].get().strip()
@@ -305,59 +454,18 @@ class BossEx:
             if content:
                 output.append("Test All Extractions:\n" + content)
 
-        if output:
-            try:
-                self.root.clipboard_clear()
-                self.root.clipboard_append("\n".join(output))
-                self.root.update()
-                messagebox.showinfo("Success", "Selected fields copied to clipboard!")
-            except tk.TclError as e:
-                messagebox.showerror("Error", f"Failed to copy to clipboard: {e}")
+        if output and patterns:
+            self.copy_checked(patterns, "\n".join(output), "Selected fields copied to clipboard!")
+        elif output:
+            self.copy_to_clipboard("\n".join(output), "Selected fields copied to clipboard!")
         else:
             messagebox.showwarning("Warning", "No fields selected or no content to copy.")
 
     def find_previous_separator(self, text, end_idx):
-        latest_pos = -1
-        latest_sep = None
-        for sep in self.possible_separators:
-            pattern = fr"(?:(?<=[\S])\s*{re.escape(sep)}\s*|^\s*{re.escape(sep)}\s*|\s*{re.escape(sep)}\s*(?=[\S])|\s*{re.escape(sep)}\s*$)"
-            matches = [m for m in re.finditer(pattern, text[:end_idx])]
-            if matches:
-                pos = matches[-1].start()
-                if pos > latest_pos:
-                    latest_pos = pos
-                    latest_sep = sep
-        return latest_sep, latest_pos
+        return separator_index(text, self.possible_separators).previous_separator(end_idx)
 
     def find_next_separator(self, text, start_idx):
-        earliest_pos = len(text)
-        earliest_sep = None
-        for sep in self.possible_separators:
-            pattern = fr"(?:(?<=[\S])\s*{re.escape(sep)}\s*|^\s*{re.escape(sep)}\s*|\s*{re.escape(sep)}\s*(?=[\S])|\s*{re.escape(sep)}\s*$)"
-            matches = [m for m in re.finditer(pattern, text[start_idx:])]
-            if matches:
-                pos = matches[0].start() + start_idx
-                if pos < earliest_pos:
-                    earliest_pos = pos
-                    earliest_sep = sep
-        return earliest_sep, earliest_pos
-
-    def count_separators_before(self, text, start_idx, separator):
-        pattern = fr"(?:(?<=[\S])\s*{re.escape(separator)}\s*|^\s*{re.escape(separator)}\s*|\s*{re.escape(separator)}\s*(?=[\S])|\s*{re.escape(separator)}\s*$)"
-        matches = list(re.finditer(pattern, text[:start_idx]))
-        return len(matches)
-
-    def detect_separator(self, text):
-        max_segments = 1
-        selected_separator = None
-        for sep in self.possible_separators:
-            pattern = fr"(?:(?<=[\S])\s*{re.escape(sep)}\s*|^\s*{re.escape(sep)}\s*|\s*{re.escape(sep)}\s*(?=[\S])|\s*{re.escape(sep)}\s*$)"
-            matches = list(re.finditer(pattern, text))
-            segments = len(matches) + 1
-            if segments > max_segments:
-                max_segments = segments
-                selected_separator = sep
-        return selected_separator if selected_separator else "|"
+        return separator_index(text, self.possible_separators).next_separator(start_idx)
 
     def toggle_anchor(self, field):
         if field not in ["time", "date"]:
@@ -370,7 +478,7 @@ class BossEx:
         self.current_field = field
         selections = []
         new_highlights = {}
-        for i, text_widget in enumerate(self.sample_texts):
+        for i, text_widget in self.sample_view.visible_rows():
             full_text = text_widget.get("1.0", "end-1c").strip()
             if full_text and not full_text.startswith("SAMPLE DATA"):
                 try:
@@ -398,14 +506,14 @@ class BossEx:
                 selected_text, full_text, start_idx, end_idx,
                 self.config["name_patterns"], self.possible_separators
             )
-            matches = list(re.finditer(pattern, full_text, re.IGNORECASE))
+            matches = list(compile_pattern(pattern).finditer(full_text))
             self.anchor_enabled[field] = False
         elif field == "title":
             pattern, part = process_title_field(
                 selected_text, full_text, start_idx, end_idx,
                 self.possible_separators, self.detect_separator
             )
-            matches = list(re.finditer(pattern, full_text, re.IGNORECASE))
+            matches = list(compile_pattern(pattern).finditer(full_text))
             self.anchor_enabled[field] = False
         elif field == "time":
             pattern, part, format_str = process_time_field(
@@ -416,7 +524,7 @@ class BossEx:
                 self.count_separators_before, tz_matches
             )
             base_pattern = r"|".join(self.config["time_formats"])
-            matches = list(re.finditer(base_pattern, full_text, re.IGNORECASE))
+            matches = list(compile_pattern(base_pattern).finditer(full_text))
             separator, _ = self.find_previous_separator(full_text, start_idx)
             self.last_separator[field] = separator if separator else "|"
             self.last_pattern[field] = fr"({base_pattern})"
@@ -430,7 +538,7 @@ class BossEx:
             )
             components = identify_components(selected_text, self.config["days"], self.config["months"])
             base_pattern = build_base_pattern(components, self.config["days"], self.config["months"])
-            matches = list(re.finditer(base_pattern, full_text, re.IGNORECASE))
+            matches = list(compile_pattern(base_pattern).finditer(full_text))
             separator, _ = self.find_previous_separator(full_text, start_idx)
             self.last_separator[field] = separator if separator else "|"
             self.last_pattern[field] = fr"({base_pattern})"
@@ -447,80 +555,103 @@ class BossEx:
 
         # Update highlights
         for sample_idx, highlights in new_highlights.items():
-            existing_highlights = self.calculated_samples[sample_idx]
-            text_widget = self.sample_texts[sample_idx]
-            text_widget.tag_remove("highlight", "1.0", "end")
-            for start_idx, end_idx, f in existing_highlights:
-                if f != field:
-                    start_pos = f"1.0 + {start_idx} chars"
-                    end_pos = f"1.0 + {end_idx} chars"
-                    text_widget.tag_add("highlight", start_pos, end_pos)
-            for start_idx, end_idx, f in highlights:
-                start_pos = f"1.0 + {start_idx} chars"
-                end_pos = f"1.0 + {end_idx} chars"
-                text_widget.tag_add("highlight", start_pos, end_pos)
-            self.calculated_samples[sample_idx] = [
-                h for h in existing_highlights if h[2] != field
-            ] + highlights
+            self.samples.replace_field(sample_idx, field, highlights)
+        self.sample_view.refresh_highlights(new_highlights)
 
     def auto_process(self):
-        full_text = self.sample_texts[0].get("1.0", "end-1c").strip()
+        full_text = self.samples.text(0)
         if not full_text or full_text.startswith("SAMPLE DATA"):
             messagebox.showwarning("Warning", "Please enter valid text in Sample 1.")
             return
 
         timezone = self.timezone_var.get()
-        results = auto_process(full_text, self.config, timezone, self.detect_separator, self.count_separators_before)
-
-        # Store time matches for refresh
-        self.last_time_matches = []
-        for pattern in self.config["time_formats"]:
-            for match in re.finditer(pattern, full_text, re.IGNORECASE):
-                time_text = match.group(0)
-                start_idx = match.start()
-                is_am_pm = bool(re.search(r'[AaPp][Mm]$', time_text, re.IGNORECASE))
-                selected_tz = next(tz for tz in self.config["timezones"] if tz["friendly_name"] == timezone)
-                tz_score = 0
-                for m in selected_tz["match"]:
-                    tz_pos = full_text[max(0, start_idx-20):start_idx].upper().rfind(m)
-                    if tz_pos != -1:
-                        tz_score = max(tz_score, 20 - tz_pos)
-                self.last_time_matches.append((start_idx, start_idx + len(time_text), time_text, pattern, is_am_pm, tz_score))
-        self.last_time_matches.sort(key=lambda x: (-x[5], not x[4], x[0]))
+
+        def job(token):
+            with record_stages() as stages:
+                results = auto_process(full_text, self.config, timezone, self.detect_separator, self.count_separators_before)
+            token.check()
+
+            # Store time matches for refresh
+            time_matches = []
+            selected_tz = next(tz for tz in self.config["timezones"] if tz["friendly_name"] == timezone)
+            for start_idx, end_idx, time_text, pattern, is_am_pm in find_time_candidates(full_text, self.config["time_formats"]):
+                tz_score = timezone_score(full_text, start_idx, selected_tz["match"])
+                time_matches.append((start_idx, end_idx, time_text, pattern, is_am_pm, tz_score))
+            time_matches.sort(key=lambda x: (-x[5], not x[4], x[0]))
+            return results, time_matches, stages
+
+        # A new Auto click replaces the one still running
+        self.worker.submit("auto", job, self.apply_auto_results, self.show_worker_error)
+
+    def apply_auto_results(self, outcome):
+        results, self.last_time_matches, self.last_stages = outcome
 
         # Clear existing fields
         for field in ["name", "title", "time", "date"]:
             self.regex_entries[field].delete(0, tk.END)
-            self.regex_entries[field].insert(0, results[field]["pattern"] or "No pattern detected")
+            self.regex_entries[field].insert(0, results[field].pattern or "No pattern detected")
             if field in ["time", "date"]:
                 self.format_entries[field].delete(0, tk.END)
-                self.format_entries[field].insert(0, results[field]["format"] or "No format detected")
+                self.format_entries[field].insert(0, results[field].format or "No format detected")
             self.anchor_enabled[field] = True if field in ["time", "date"] else False
             if field in ["time", "date"]:
                 self.anchor_buttons[field].config(text="Anchor")
 
         # Update extraction
         self.extraction_entry.delete(0, tk.END)
-        extraction_parts = [f"{field}: {results[field]['extracted']}" for field in ["name", "title", "time", "date"] if results[field]["extracted"]]
+        extraction_parts = [f"{field}: {results[field].extracted}" for field in ["name", "title", "time", "date"] if results[field].extracted]
         self.extraction_entry.insert(0, " | ".join(extraction_parts))
 
         # Update highlights
-        self.sample_texts[0].tag_remove("highlight", "1.0", "end")
-        self.calculated_samples[0] = []
+        highlights = []
+        for field in ["name", "title", "time", "date"]:
+            if results[field].pattern and results[field].start_idx is not None:
+                highlights.append((results[field].start_idx, results[field].end_idx, field))
+        self.samples.set_highlights(0, highlights)
+        self.sample_view.refresh_highlights([0])
+
+    def consensus_process(self):
+        # Patterns that hold on every sample; highlighted spans (from Auto or the field buttons) mark the fields
+        samples = self.samples.valid_samples()
+        if not samples:
+            messagebox.showwarning("Warning", "Please enter sample text.")
+            return
+        rows = [row for row, _ in samples]
+        lines = [text for _, text in samples]
+        positions = {row: i for i, row in enumerate(rows)}
+        marks = {}
+        for row, highlights in self.samples.highlights.items():
+            if row in positions:
+                marks[positions[row]] = {field: (start_idx, end_idx) for start_idx, end_idx, field in highlights}
+        timezone = self.timezone_var.get()
+
+        def job(token):
+            with record_stages() as stages:
+                consensus = synthesize_patterns(lines, self.config, timezone, self.detect_separator, self.count_separators_before, marks, token=token)
+            return consensus, rows, stages
+
+        # Shares Auto's slot: either one replaces the other while it runs
+        self.worker.submit("auto", job, self.apply_consensus, self.show_worker_error)
+
+    def apply_consensus(self, outcome):
+        consensus, rows, self.last_stages = outcome
         for field in ["name", "title", "time", "date"]:
-            if results[field]["pattern"] and results[field]["start_idx"] is not None:
-                start_idx = results[field]["start_idx"]
-                end_idx = results[field]["end_idx"]
-                start_pos = f"1.0 + {start_idx} chars"
-                end_pos = f"1.0 + {end_idx} chars"
-                self.sample_texts[0].tag_add("highlight", start_pos, end_pos)
-                self.calculated_samples[0].append((start_idx, end_idx, field))
+            self.regex_entries[field].delete(0, tk.END)
+            self.regex_entries[field].insert(0, consensus[field]["pattern"] or "No pattern detected")
+        self.extraction_entry.delete(0, tk.END)
+        self.extraction_entry.insert(0, " | ".join(f"{field}: {result['matched']}/{result['total']}" for field, result in consensus.items()))
+        misses = [
+            f"{field}: sample {', '.join(str(rows[i] + 1) for i in result['failures'])}"
+            for field, result in consensus.items() if result["failures"]
+        ]
+        if misses:
+            messagebox.showwarning("Consensus", "No pattern matched every sample. First misses:\n" + "\n".join(misses))
 
     def refresh_field(self, field):
         if field not in ["time", "date"]:
             return
 
-        full_text = self.sample_texts[0].get("1.0", "end-1c").strip()
+        full_text = self.samples.text(0)
         if not full_text or full_text.startswith("SAMPLE DATA"):
             messagebox.showwarning("Warning", "Please enter valid text in Sample 1.")
             return
@@ -528,6 +659,7 @@ class BossEx:
         timezone = self.timezone_var.get()
         selected_tz = next(tz for tz in self.config["timezones"] if tz["friendly_name"] == timezone)
         tz_matches = selected_tz["match"]
+        anchor_enabled = self.anchor_enabled[field]
 
         if field == "time" and self.last_time_matches:
             current_time = self.regex_entries["time"].get().strip()
@@ -536,36 +668,22 @@ class BossEx:
                 current_time = current_time.group(0) if current_time else None
             else:
                 current_time = None
-            pattern, extracted, format_str = refresh_time_field(
-                full_text, self.config["time_formats"], self.possible_separators,
-                self.config["days"], self.config["months"], self.anchor_enabled["time"],
-                self.detect_separator, self.count_separators_before, tz_matches, current_time
-            )
-            self.regex_entries["time"].delete(0, tk.END)
-            self.regex_entries["time"].insert(0, pattern if pattern else "No pattern detected")
-            self.extraction_entry.delete(0, tk.END)
-            self.extraction_entry.insert(0, f"[time: {extracted}]")
-            self.format_entries["time"].delete(0, tk.END)
-            self.format_entries["time"].insert(0, format_str if format_str else "No format detected")
-            # Update highlights
-            start_idx = full_text.find(extracted)
-            end_idx = start_idx + len(extracted) if start_idx != -1 else start_idx
-            self.sample_texts[0].tag_remove("highlight", "1.0", "end")
-            for h in self.calculated_samples[0]:
-                if h[2] != "time":
-                    start_pos = f"1.0 + {h[0]} chars"
-                    end_pos = f"1.0 + {h[1]} chars"
-                    self.sample_texts[0].tag_add("highlight", start_pos, end_pos)
-            if start_idx != -1:
-                start_pos = f"1.0 + {start_idx} chars"
-                end_pos = f"1.0 + {end_idx} chars"
-                self.sample_texts[0].tag_add("highlight", start_pos, end_pos)
-                self.calculated_samples[0] = [h for h in self.calculated_samples[0] if h[2] != "time"] + [(start_idx, end_idx, "time")]
+
+            def cycle_time(token):
+                with record_stages() as stages:
+                    refreshed = refresh_time_field(
+                        full_text, self.config["time_formats"], self.possible_separators,
+                        self.config["days"], self.config["months"], anchor_enabled,
+                        self.detect_separator, self.count_separators_before, tz_matches, current_time
+                    )
+                return refreshed, stages
+
+            self.worker.submit("refresh", cycle_time, lambda outcome: self.apply_cycled_time(full_text, outcome), self.show_worker_error)
             return
 
         selections = []
         current_selection = None
-        for i, text_widget in enumerate(self.sample_texts):
+        for i, text_widget in self.sample_view.visible_rows():
             full_text = text_widget.get("1.0", "end-1c").strip()
             if full_text and not full_text.startswith("SAMPLE DATA"):
                 try:
@@ -584,22 +702,45 @@ class BossEx:
             return
 
         full_text, selected_text, start_idx, end_idx = current_selection
-        if field == "time":
-            pattern, part, format_str = refresh_time_field(
-                full_text, self.config["time_formats"], self.possible_separators,
-                self.config["days"], self.config["months"],
-                self.anchor_enabled["time"], self.detect_separator,
-                self.count_separators_before, tz_matches
-            )
-        elif field == "date":
-            pattern, part, format_str = refresh_date_field(
-                selected_text, full_text, start_idx, end_idx,
-                self.config["date_formats"], self.possible_separators,
-                self.config["days"], self.config["months"],
-                self.anchor_enabled["date"], self.detect_separator,
-                self.count_separators_before
-            )
 
+        def refresh(token):
+            with record_stages() as stages:
+                if field == "time":
+                    refreshed = refresh_time_field(
+                        full_text, self.config["time_formats"], self.possible_separators,
+                        self.config["days"], self.config["months"],
+                        anchor_enabled, self.detect_separator,
+                        self.count_separators_before, tz_matches
+                    )
+                else:
+                    refreshed = refresh_date_field(
+                        selected_text, full_text, start_idx, end_idx,
+                        self.config["date_formats"], self.possible_separators,
+                        self.config["days"], self.config["months"],
+                        anchor_enabled, self.detect_separator,
+                        self.count_separators_before
+                    )
+            return refreshed, stages
+
+        self.worker.submit("refresh", refresh, lambda outcome: self.apply_refreshed_field(field, start_idx, end_idx, outcome), self.show_worker_error)
+
+    def apply_cycled_time(self, full_text, outcome):
+        (pattern, extracted, format_str), self.last_stages = outcome
+        self.regex_entries["time"].delete(0, tk.END)
+        self.regex_entries["time"].insert(0, pattern if pattern else "No pattern detected")
+        self.extraction_entry.delete(0, tk.END)
+        self.extraction_entry.insert(0, f"[time: {extracted}]")
+        self.format_entries["time"].delete(0, tk.END)
+        self.format_entries["time"].insert(0, format_str if format_str else "No format detected")
+        # Update highlights
+        start_idx = full_text.find(extracted)
+        end_idx = start_idx + len(extracted) if start_idx != -1 else start_idx
+        if start_idx != -1:
+            self.samples.replace_field(0, "time", [(start_idx, end_idx, "time")])
+        self.sample_view.refresh_highlights([0])
+
+    def apply_refreshed_field(self, field, start_idx, end_idx, outcome):
+        (pattern, part, format_str), self.last_stages = outcome
         self.regex_entries[field].delete(0, tk.END)
         self.regex_entries[field].insert(0, pattern if pattern else "No pattern detected")
         self.extraction_entry.delete(0, tk.END)
@@ -608,21 +749,8 @@ class BossEx:
         self.format_entries[field].insert(0, format_str if format_str else "No format detected")
 
         # Update highlights
-        for i, text_widget in enumerate(self.sample_texts):
-            text_widget.tag_remove("highlight", "1.0", "end")
-            existing_highlights = self.calculated_samples[i]
-            for start_idx, end_idx, f in existing_highlights:
-                if f != field:
-                    start_pos = f"1.0 + {start_idx} chars"
-                    end_pos = f"1.0 + {end_idx} chars"
-                    text_widget.tag_add("highlight", start_pos, end_pos)
-            if i == 0:
-                start_pos = f"1.0 + {start_idx} chars"
-                end_pos = f"1.0 + {end_idx} chars"
-                text_widget.tag_add("highlight", start_pos, end_pos)
-                self.calculated_samples[i] = [
-                    h for h in existing_highlights if h[2] != field
-                ] + [(start_idx, end_idx, field)]
+        self.samples.replace_field(0, field, [(start_idx, end_idx, field)])
+        self.sample_view.refresh_highlights([0])
 
     def clear_field(self, field):
         self.regex_entries[field].delete(0, tk.END)
@@ -636,92 +764,68 @@ class BossEx:
             self.anchor_buttons[field].config(text="Anchor")
         self.extraction_entry.delete(0, tk.END)
 
-        for sample_idx in range(self.max_samples):
-            text_widget = self.sample_texts[sample_idx]
-            text_widget.tag_remove("highlight", "1.0", "end")
-            remaining_highlights = [
-                (start_idx, end_idx, f) for start_idx, end_idx, f in self.calculated_samples[sample_idx]
-                if f != field
-            ]
-            for start_idx, end_idx, _ in remaining_highlights:
-                start_pos = f"1.0 + {start_idx} chars"
-                end_pos = f"1.0 + {end_idx} chars"
-                text_widget.tag_add("highlight", start_pos, end_pos)
-            self.calculated_samples[sample_idx] = remaining_highlights
+        self.sample_view.refresh_highlights(self.samples.clear_field(field))
 
     def test_all(self):
-        summary = []
-        for i, text_widget in enumerate(self.sample_texts):
-            full_text = text_widget.get("1.0", "end-1c").strip()
-            if full_text and not full_text.startswith("SAMPLE DATA"):
-                sample_summary = {"name": "", "title": "", "time": "", "date": ""}
-
-                for field in ["name", "title", "time", "date"]:
-                    pattern = self.regex_entries[field].get().strip() or "No pattern detected"
-                    if pattern != "No pattern detected":
-                        try:
-                            match = re.search(pattern, full_text, re.IGNORECASE)
-                            if match:
-                                extracted = match.group(0).strip() if field == "name" else (match.group(1).strip() if match.groups() else match.group(0).strip())
-                                if field == "date":
-                                    extracted = re.sub(r"(th|rd|st|nd)", "", extracted).strip()
-                                sample_summary[field] = extracted
-                        except re.error as e:
-                            print(f"Error in {field} regex for sample {i+1}: {e}")
-
+        samples = self.samples.valid_samples()
+        patterns = {field: self.regex_entries[field].get().strip() or "No pattern detected" for field in ["name", "title", "time", "date"]}
+
+        def job(token):
+            summary = []
+            for i, sample_summary, errors in self.test_all_grid.run(samples, patterns, token):
+                for field, error in errors:
+                    print(f"Error in {field} regex for sample {i+1}: {error}")
                 summary.append((f"SAMPLE {i+1}", sample_summary))
+            return summary
+
+        self.worker.submit("test_all", job, self.show_test_all, self.show_worker_error)
 
+    def show_test_all(self, summary):
         self.test_all_text.config(state="normal")
         self.test_all_text.delete("1.0", "end")
         if summary:
-            for sample_name, sample_summary in summary:
-                self.test_all_text.insert("end", f"{sample_name:<12} name: {sample_summary['name']:<30} title: {sample_summary['title']:<40} time: {sample_summary['time']:<15} date: {sample_summary['date']}\n")
+            # One insert for the whole table: per-line inserts crawl with thousands of samples
+            self.test_all_text.insert("end", "".join(
+                f"{sample_name:<12} name: {sample_summary['name']:<30} title: {sample_summary['title']:<40} time: {sample_summary['time']:<15} date: {sample_summary['date']}\n"
+                for sample_name, sample_summary in summary
+            ))
         self.test_all_text.config(state="disabled")
 
-def build_base_pattern(components, days, months):
-    day_short_pattern = "|".join(days["short"])
-    day_long_pattern = "|".join(days["long"])
-    month_short_pattern = "|".join(months["short"])
-    month_long_pattern = "|".join(months["long"])
-    date_pattern = r"\d{1,2}"
-    year_pattern = r"\d{2,4}"
-
-    pattern_parts = []
-    for comp_type, _, _, length in components:
-        if comp_type == "day":
-            pattern = f"({day_short_pattern})" if length == "short" else f"({day_long_pattern})"
-        elif comp_type == "month":
-            pattern = f"({month_short_pattern})" if length == "short" else f"({month_long_pattern})"
-        elif comp_type == "date":
-            pattern = f"({date_pattern})"
-        elif comp_type == "year":
-            pattern = f"({year_pattern})"
-        pattern_parts.append(pattern)
-
-    return r"\s+".join(pattern_parts)
-
-def identify_components(selected_text, days, months):
-    cleaned_text = re.sub(r"(th|st|nd|rd)", "", selected_text).strip()
-    parts = re.findall(r'\S+', cleaned_text)
-    components = []
-
-    for i, part in enumerate(parts):
-        part_lower = part.lower()
-        if part_lower in [d.lower() for d in days["short"]]:
-            components.append(("day", part, i, "short"))
-        elif part_lower in [d.lower() for d in days["long"]]:
-            components.append(("day", part, i, "long"))
-        elif part_lower in [m.lower() for m in months["short"]]:
-            components.append(("month", part, i, "short"))
-        elif part_lower in [m.lower() for m in months["long"]]:
-            components.append(("month", part, i, "long"))
-        elif re.match(r"^\d{1,2}$", part):
-            try:
-                if int(part) <= 31:
-                    components.append(("date", part, i, None))
-            except ValueError:
-                pass
-        elif re.match(r"^\d{2,4}$", part):
-            components.append(("year", part, i, None))
-
-    return sorted(components, key=lambda x: x[2])
\ No newline at end of file
+    def add_edit_menu(self, widget):
+        menu = tk.Menu(widget, tearoff=0)
+        menu.add_command(label="Cut", command=lambda: self.cut_text(widget))
+        menu.add_command(label="Copy", command=lambda: self.copy_text(widget))
+        menu.add_command(label="Paste", command=lambda: self.paste_text(widget))
+        widget.bind("<Button-3>", lambda event: menu.post(event.x_root, event.y_root))
+
+    def paste_samples(self):
+        # Replace the samples with the clipboard's lines, e.g. a pasted feed to validate patterns against
+        try:
+            content = self.root.clipboard_get()
+        except tk.TclError:
+            messagebox.showwarning("Warning", "Clipboard is empty.")
+            return
+        count = self.samples.load_lines(content)
+        self.sample_view.first = 0
+        self.sample_view.render()
+        self.sample_count_label.config(text=f"{count} samples")
+        self.schedule_live_test_all()
+
+    def schedule_live_test_all(self):
+        # Debounced: a live Test All runs once typing pauses, not on every keystroke
+        if self.live_test_all_job is not None:
+            self.root.after_cancel(self.live_test_all_job)
+            self.live_test_all_job = None
+        if self.live_test_all.get():
+            self.live_test_all_job = self.root.after(LIVE_TEST_ALL_DELAY_MS, self.run_live_test_all)
+
+    def run_live_test_all(self):
+        self.live_test_all_job = None
+        self.test_all()
+
+    def set_busy(self, busy):
+        self.busy_label.config(text="Working..." if busy else "")
+        self.root.config(cursor="watch" if busy else "")
+
+    def show_worker_error(self, error):
+        messagebox.showerror("Error", f"Processing failed: {error}")
@@ -0,0 +1,142 @@
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+# Callbacks receiving each finished top-level stage record; stages are only timed while one is registered
+_hooks = []
+_local = threading.local()
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_STAGE = _NullStage()
+
+class _Stage:
+    """
+    One timed stage. Nested stages become children of the enclosing one on the same thread,
+    and their regex call / candidate counts are added to it.
+    """
+    __slots__ = ("name", "start", "regex_calls", "candidates", "children", "parent")
+
+    def __init__(self, name):
+        self.name = name
+        self.regex_calls = 0
+        self.candidates = 0
+        self.children = []
+        self.parent = None
+
+    def __enter__(self):
+        stack = _stack()
+        self.parent = stack[-1] if stack else None
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self.start
+        _stack().pop()
+        record = {
+            "stage": self.name,
+            "wall_ms": round(wall * 1000, 3),
+            "regex_calls": self.regex_calls,
+            "candidates": self.candidates,
+            "children": self.children,
+        }
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        if self.parent is not None:
+            self.parent.children.append(record)
+            self.parent.regex_calls += self.regex_calls
+            self.parent.candidates += self.candidates
+        else:
+            for hook in list(_hooks):
+                hook(record)
+        return False
+
+def _stack():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+def _current():
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if stack else None
+
+def add_hook(callback):
+    """Call callback(record) for every finished top-level stage, on the thread that ran it."""
+    _hooks.append(callback)
+
+def remove_hook(callback):
+    if callback in _hooks:
+        _hooks.remove(callback)
+
+def stage(name):
+    """Context manager timing a named stage; a shared no-op object when no hook is registered."""
+    if not _hooks:
+        return _NULL_STAGE
+    return _Stage(name)
+
+def instrumented(name=None):
+    """Decorator running the function as a stage (named after the function by default)."""
+    def decorate(fn):
+        stage_name = name or fn.__name__
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _hooks:
+                return fn(*args, **kwargs)
+            with _Stage(stage_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def count_regex(n=1):
+    """Add n regex calls to the innermost running stage."""
+    if _hooks:
+        current = _current()
+        if current is not None:
+            current.regex_calls += n
+
+def count_candidates(n):
+    """Add n considered candidates (time/date matches, separators, name patterns) to the innermost running stage."""
+    if _hooks:
+        current = _current()
+        if current is not None:
+            current.candidates += n
+
+@contextmanager
+def record_stages():
+    """
+    Collect the top-level stage records finished on this thread while the block runs.
+    Yields: list of records {"stage", "wall_ms", "regex_calls", "candidates", "children": [...]}.
+    """
+    records = []
+    thread_id = threading.get_ident()
+
+    def hook(record):
+        if threading.get_ident() == thread_id:
+            records.append(record)
+
+    add_hook(hook)
+    try:
+        yield records
+    finally:
+        remove_hook(hook)
+
+def format_stages(records, indent=0):
+    """Stage records as indented text lines, for display in the GUIs."""
+    lines = []
+    for record in records:
+        error = f"  ({record['error']})" if record.get("error") else ""
+        lines.append(f"{'  ' * indent}{record['stage']}: {record['wall_ms']:.2f} ms, "
+                     f"{record['regex_calls']} regex calls, {record['candidates']} candidates{error}")
+        lines.extend(format_stages(record["children"], indent + 1))
+    return lines
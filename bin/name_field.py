@@ -1,5 +1,11 @@
 import re
+from bin.patterns import compile_pattern, expand_name_pattern
+from bin.instrument import instrumented, count_candidates
 
+# Last resort when nothing else fits the selection: captures a single character, so it is no real pattern
+NAME_FALLBACK_PATTERN = r"^(.+?)"
+
+@instrumented()
 def process_name_field(selected_text, full_text, start_idx, end_idx, name_patterns, possible_separators):
     """
     Process the name field based on highlighted text.
@@ -25,20 +31,20 @@ def process_name_field(selected_text, full_text, start_idx, end_idx, name_patter
             extracted = f"{name_content} {number}"
         
         # Try to find the pattern in the full text
-        full_match = re.search(pattern, full_text, re.IGNORECASE)
+        full_match = compile_pattern(pattern).search(full_text)
         if full_match:
             extracted = full_match.group(0).strip()
         
         return pattern, extracted
     
     # Fallback to existing pattern matching logic
-    escaped_separators = "".join(re.escape(sep) for sep in possible_separators)
     best_pattern = None
     best_match = None
+    count_candidates(len(name_patterns))
     for name_pattern in name_patterns:
-        pattern_str = name_pattern["pattern"].replace("<symbols>", escaped_separators)
+        pattern_str = expand_name_pattern(name_pattern["pattern"], possible_separators)
         try:
-            match = re.search(pattern_str, full_text, re.IGNORECASE)
+            match = compile_pattern(pattern_str).search(full_text)
             if match and match.start() <= start_idx and match.end() >= end_idx:
                 if not best_match or (match.start() == 0 and match.end() - match.start() <= best_match.end() - best_match.start()):
                     best_pattern = pattern_str
@@ -50,6 +56,6 @@ def process_name_field(selected_text, full_text, start_idx, end_idx, name_patter
         extracted = best_match.group(0).strip()
         return best_pattern, extracted
     
-    pattern = fr"^(.+?)"
+    pattern = NAME_FALLBACK_PATTERN
     extracted = selected_text.strip()
     return pattern, extracted
\ No newline at end of file
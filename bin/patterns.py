@@ -0,0 +1,241 @@
+import re
+import sys
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from bin.instrument import count_regex
+from bin.engines import compile_with, check_engine, available_engines, DEFAULT_ENGINE
+
+# Date regex used by get_date_pattern when nothing else fits the selection
+FALLBACK_DATE_PATTERN = r"\d{1,2}[-./]\d{1,2}(?:[-./]\d{2,4})?"
+
+DEFAULT_FLAGS = re.IGNORECASE
+DEFAULT_CACHE_SIZE = 512
+# Atomic groups and possessive quantifiers are only understood by re from Python 3.11
+SAFE_PATTERNS_SUPPORTED = sys.version_info >= (3, 11)
+# A capturing or non-capturing group holding nothing but an alternation of plain words: (Jan|Feb|...)
+_WORD_GROUP = re.compile(r"(?<!\\)\((\?:)?((?:[^\W\d_]+\|)+[^\W\d_]+)\)")
+
+def _alternatives(words):
+    # words: [(suffix, position in the original alternation)], in that order.
+    # Branches sharing a first character are merged; the only order that matters between branches is a word's
+    # against the longer words it is a prefix of (any other two can't both match at one position), so the
+    # branches whose words came before the word ending here ("") are emitted before it, the rest after.
+    # Patterns may compile with IGNORECASE, where first characters differing only in case can both match:
+    # then the suffixes are kept as they are, in their original order.
+    firsts = {suffix[0] for suffix, _ in words if suffix}
+    if len({char.casefold() for char in firsts}) < len(firsts):
+        return [re.escape(suffix) for suffix, _ in words]
+    end = next((position for suffix, position in words if not suffix), None)
+    before, after = {}, {}
+    for suffix, position in words:
+        if suffix:
+            branches = before if end is None or position < end else after
+            branches.setdefault(suffix[0], []).append((suffix[1:], position))
+
+    def factored(branches):
+        return [re.escape(char) + _group(_alternatives(rest)) for char, rest in branches.items()]
+
+    return factored(before) + ([""] if end is not None else []) + factored(after)
+
+def _group(alternatives):
+    if len(alternatives) == 1:
+        return alternatives[0]
+    if len(alternatives) == 2 and "" in alternatives:
+        other = alternatives[0] or alternatives[1]
+        body = other if len(other) == 1 else f"(?:{other})"
+        return body + ("?" if alternatives[1] == "" else "??")  # Greedy when the longer words came first
+    if all(len(a) == 1 and a.isalnum() for a in alternatives):
+        return f"[{''.join(alternatives)}]"
+    return f"(?:{'|'.join(alternatives)})"
+
+def word_alternation(words):
+    """
+    Prefix-factored regex alternation of plain words (no enclosing group), e.g. for month and day names:
+    ["Jan", ..., "Jun", "Jul", ..., "January", ..., "June", "July"] -> "J(?:an(?:uary)??|u(?:ne??|ly??))|...".
+    re tries alternatives one by one, so this checks a few characters per position instead of every word.
+    Matches exactly what "|".join(words) matches, with the same preference between a word and its longer forms,
+    with or without IGNORECASE.
+    """
+    return _word_alternation(tuple(words))
+
+@lru_cache(maxsize=256)
+def _word_alternation(words):
+    # Memoized: the same day/month lists are factored for every date pattern Auto or a refresh builds
+    return "|".join(_alternatives([(word, i) for i, word in enumerate(dict.fromkeys(w for w in words if w))]))
+
+@lru_cache(maxsize=256)
+def factor_word_alternations(pattern):
+    """Rewrite every (word|word|...) group of pattern with word_alternation. Same matches, fewer steps."""
+    return _WORD_GROUP.sub(lambda m: f"({m.group(1) or ''}{word_alternation(m.group(2).split('|'))})", pattern)
+
+# Date regex used by auto_process when Sample 1 has no recognisable date components
+AUTO_FALLBACK_DATE_PATTERN = factor_word_alternations(
+    r"(?:Mon|Tue|Wed|Thu|Fri|Sat|Sun)\s+\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)(?:\s+\d{2,4})?"
+)
+
+def expand_name_pattern(pattern, possible_separators):
+    """Substitute the <symbols> placeholder of a name pattern with the escaped separators."""
+    escaped_separators = "".join(re.escape(sep) for sep in possible_separators)
+    return pattern.replace("<symbols>", escaped_separators)
+
+def normalize_flags(flags):
+    # Stored as plain ints so re.IGNORECASE, 2 and None/0 variants share cache entries
+    return int(flags or 0)
+
+class PatternRegistry:
+    """
+    Pre-compiled regexes for one configuration.
+    Patterns that come from config.json are compiled once at load time and never evicted;
+    patterns generated at runtime (anchored field regexes, user edits) go through a bounded LRU,
+    so batch runs over many distinct patterns don't fall out of re's small internal cache.
+    Patterns compile with the regex engine of config["regex_engine"] (bin.engines; stdlib re by default,
+    and when the configured one isn't installed).
+    """
+
+    def __init__(self, config=None, maxsize=DEFAULT_CACHE_SIZE, engine=None):
+        config = config or {}
+        if engine is None:
+            engine = config.get("regex_engine", DEFAULT_ENGINE)
+            if engine not in available_engines():
+                engine = DEFAULT_ENGINE  # Not installed here: the same config.json still works everywhere
+        check_engine(engine)
+        self.engine = engine
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._pinned = {}
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        # Opt-in: generate backtracking-safe anchored patterns ("safe_patterns" in config.json)
+        self.safe_patterns = bool(config.get("safe_patterns", False)) and SAFE_PATTERNS_SUPPORTED
+
+        separators = [item["symbol"] for item in config.get("separators", [])]
+        timezone_matches = {m for tz in config.get("timezones", []) for m in tz["match"]}
+        self.time_formats = [self._pin(p) for p in config.get("time_formats", [])]
+        date_formats = [factor_word_alternations(p) for p in config.get("date_formats", [])]
+        self.date_formats = [self._pin(p) for p in date_formats]
+        for p in date_formats:
+            self._pin(fr"^{p}$")  # get_date_pattern fullmatches selections against each format
+        self._pin(FALLBACK_DATE_PATTERN)
+        self._pin(AUTO_FALLBACK_DATE_PATTERN)
+        # Name patterns are expanded for both separator sets in use: all separators (GUI selection)
+        # and separators without timezone markers (auto_process)
+        for separator_set in (separators, [s for s in separators if s not in timezone_matches]):
+            for name_pattern in config.get("name_patterns", []):
+                self._pin(expand_name_pattern(name_pattern["pattern"], separator_set))
+
+    def _pin(self, pattern, flags=DEFAULT_FLAGS):
+        key = (pattern, normalize_flags(flags))
+        if key not in self._pinned:
+            try:
+                self._pinned[key] = compile_with(self.engine, pattern, key[1])
+            except re.error:
+                return None  # Left to the call site, which reports invalid patterns itself
+        return self._pinned[key]
+
+    def compile(self, pattern, flags=DEFAULT_FLAGS):
+        """Return the compiled form of `pattern`. Raises re.error for invalid patterns, like re.compile."""
+        key = (pattern, normalize_flags(flags))
+        compiled = self._pinned.get(key)
+        if compiled is not None:
+            self.hits += 1
+            return compiled
+        with self._lock:
+            compiled = self._cache.get(key)
+            if compiled is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return compiled
+        compiled = compile_with(self.engine, pattern, key[1])
+        with self._lock:
+            self.misses += 1
+            self._cache[key] = compiled
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return compiled
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "pinned": len(self._pinned),
+            "cached": len(self._cache),
+            "maxsize": self.maxsize,
+            "engine": self.engine,
+        }
+
+_registry = PatternRegistry()
+_config = {}
+
+def load_registry(config, engine=None):
+    """
+    Build the shared registry from a loaded config.json and make it the active one.
+    The config itself is left as loaded: the word alternations of its date_formats (day/month names, in any
+    language) are factored where the formats are compiled (factor_word_alternations).
+    engine: regex engine overriding config["regex_engine"]. Raises ValueError for an unavailable engine.
+    """
+    global _registry, _config
+    _registry = PatternRegistry(config, config.get("pattern_cache_size", DEFAULT_CACHE_SIZE), engine)
+    _config = config
+    return _registry
+
+def set_engine(engine):
+    """Rebuild the active registry, for the same config, on another regex engine. Raises ValueError for an unavailable engine."""
+    global _registry
+    if engine != _registry.engine:
+        _registry = PatternRegistry(_config, _registry.maxsize, engine)
+    return _registry
+
+def get_registry():
+    return _registry
+
+def compile_pattern(pattern, flags=DEFAULT_FLAGS):
+    """Compile `pattern` through the active registry (each call is counted as one regex call by bin.instrument)."""
+    count_regex()
+    return _registry.compile(pattern, flags)
+
+def safe_patterns_enabled(safe=None):
+    """Whether generated patterns use the backtracking-safe form (explicit `safe` overrides the registry)."""
+    if safe is None:
+        safe = _registry.safe_patterns
+    return bool(safe) and SAFE_PATTERNS_SUPPORTED
+
+def _safe_hops(first_step, escaped_sep, sep_count):
+    # The sep_count separator hops of the standard pattern, committed in one atomic group.
+    # Lazy .*? settles on the earliest separators; on a single line a later choice can only reach
+    # a subset of what the earliest one reaches, so the committed hops never change the match.
+    hops = first_step + escaped_sep
+    if sep_count > 1:
+        hops += r"(?:\s*.*?\s*" + escaped_sep + fr"){{{sep_count - 1}}}"
+    return fr"(?>{hops})"
+
+def anchored_field_pattern(separator, sep_count, base_pattern, safe=None):
+    """
+    Time/date regex capturing base_pattern after the sep_count-th separator.
+    The safe form matches like the standard one on single-line text, but is anchored at the start
+    and commits the separator hops, so a line that nearly matches fails in linear time.
+    """
+    escaped_sep = re.escape(separator)
+    if not safe_patterns_enabled(safe) or sep_count < 1:
+        return fr"(?:\s*{escaped_sep}\s*.*?){{{sep_count}}}\s*({base_pattern})"
+    hops = _safe_hops(r"\s*", escaped_sep, sep_count)
+    return fr"^(?:(?!{escaped_sep}).)*+{hops}\s*.*?\s*({base_pattern})"
+
+def title_field_pattern(opening_sep, opening_sep_count, closing_sep, safe=None):
+    """
+    Title regex capturing the text after the opening_sep_count-th opening separator, up to the
+    closing separator (up to the last one when closing_sep is "|").
+    The safe form is anchored, commits the separator hops and uses possessive quantifiers in the tail.
+    """
+    escaped_open = re.escape(opening_sep)
+    escaped_close = re.escape(closing_sep)
+    if not safe_patterns_enabled(safe) or opening_sep_count < 1:
+        prefix = fr"(?:.*?\s*{escaped_open}\s*){{{opening_sep_count}}}"
+        if closing_sep == "|":
+            return fr"{prefix}(.*?)\s*{escaped_close}\s*[^{escaped_close}]*$"
+        return fr"{prefix}(.*?)(?=\s*{escaped_close}\s*)"
+    prefix = "^" + _safe_hops(r".*?\s*", escaped_open, opening_sep_count) + r"\s*"
+    if closing_sep == "|":
+        return fr"{prefix}(.*?)\s*+{escaped_close}\s*+[^{escaped_close}]*+$"
+    return fr"{prefix}(.*?)(?=\s*{escaped_close})"
@@ -0,0 +1,191 @@
+import re
+from functools import lru_cache
+from bin.patterns import normalize_flags, DEFAULT_FLAGS
+
+try:
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+# Literal alternatives tracked per requirement/exact set before giving up on it
+MAX_ALTERNATIVES = 16
+# Shorter literals ("|", ":") are on nearly every line: checking them costs more than it saves
+MIN_LITERAL_LENGTH = 2
+# Requirements checked per pattern, most selective first
+MAX_REQUIREMENTS = 3
+
+_REPEATS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT, getattr(sre_constants, "POSSESSIVE_REPEAT", None)}
+_ZERO_WIDTH = {sre_constants.AT, sre_constants.ASSERT, sre_constants.ASSERT_NOT}
+_AT_START = {sre_constants.AT_BEGINNING, sre_constants.AT_BEGINNING_STRING}
+
+class Prefilter:
+    """
+    Literals any match of one pattern has to contain: a tuple of requirements, each a tuple of
+    alternatives of which at least one must occur in the line. Checking them with `in` is much cheaper
+    than a search that is bound to fail, and a line that fails the check can't match the pattern.
+    Case-insensitive patterns are checked against the lower-cased line, which is only exact for
+    ASCII lines; other lines always pass.
+    """
+    __slots__ = ("requirements", "ignore_case")
+
+    def __init__(self, requirements, ignore_case):
+        self.requirements = requirements
+        self.ignore_case = ignore_case
+
+    def __repr__(self):
+        return f"Prefilter({self.requirements!r}, ignore_case={self.ignore_case})"
+
+    def __call__(self, text, lowered=None):
+        """
+        False when the pattern can't match text. lowered: text.lower() if text.isascii() else None,
+        for callers checking several patterns against one line.
+        """
+        if self.ignore_case:
+            if lowered is None:
+                if not text.isascii():
+                    return True
+                lowered = text.lower()
+            text = lowered
+        for alternatives in self.requirements:
+            for literal in alternatives:
+                if literal in text:
+                    break
+            else:
+                return False
+        return True
+
+def lowered_text(text):
+    """The `lowered` argument of Prefilter for text."""
+    return text.lower() if text.isascii() else None
+
+def _cross(left, right):
+    if len(left) * len(right) > MAX_ALTERNATIVES:
+        return None
+    return {a + b for a in left for b in right}
+
+def _is_requirement(strings):
+    return bool(strings) and "" not in strings
+
+def _anchored_at_start(items, flags):
+    # re tries a ^-anchored pattern at position 0 only, which fails about as fast as any prefilter
+    if not items:
+        return False
+    op, av = items[0]
+    if op == sre_constants.AT:
+        return av == sre_constants.AT_BEGINNING_STRING or (av == sre_constants.AT_BEGINNING and not flags & re.MULTILINE)
+    if op == sre_constants.SUBPATTERN:
+        return _anchored_at_start(av[3], flags)
+    return False
+
+def anchored_at_start(pattern, flags=DEFAULT_FLAGS):
+    """Whether every match of pattern starts at position 0 (a leading ^ or \\A)."""
+    try:
+        parsed = sre_parse.parse(pattern, normalize_flags(flags))
+    except (re.error, RecursionError, OverflowError):
+        return False
+    return _anchored_at_start(list(parsed), parsed.state.flags)
+
+def _best(requirements):
+    return max(requirements, key=lambda alternatives: (min(map(len, alternatives)), -len(alternatives)), default=None)
+
+def _sequence(items, ignore_case):
+    """(exact strings the sequence matches or None, [requirements: sets of literal alternatives])."""
+    requirements = []
+    run = {""}  # What the literal run ending here matches
+    exact = True
+    for op, av in items:
+        node_exact, node_requirements = _node(op, av, ignore_case)
+        requirements.extend(node_requirements)
+        if node_exact is None:
+            exact = False
+            if _is_requirement(run):
+                requirements.append(run)
+            run = {""}
+            continue
+        joined = _cross(run, node_exact)
+        if joined is None:  # Too many combinations: keep what we had as a requirement and start over
+            exact = False
+            if _is_requirement(run):
+                requirements.append(run)
+            joined = set(node_exact)
+        run = joined
+    if _is_requirement(run):
+        requirements.append(run)
+    return (run if exact else None), requirements
+
+def _node(op, av, ignore_case):
+    if op == sre_constants.LITERAL:
+        char = chr(av)
+        return {char.lower() if ignore_case else char}, []
+    if op == sre_constants.IN:
+        if len(av) <= MAX_ALTERNATIVES and all(item_op == sre_constants.LITERAL for item_op, _ in av):
+            return {chr(c).lower() if ignore_case else chr(c) for _, c in av}, []
+        return None, []
+    if op in _ZERO_WIDTH:
+        return {""}, []  # Consumes nothing, so the literals around it are still adjacent
+    if op == sre_constants.SUBPATTERN:
+        _, add_flags, del_flags, items = av
+        if (add_flags | del_flags) & re.IGNORECASE:
+            return None, []  # Scoped case change: not worth tracking
+        return _sequence(items, ignore_case)
+    if op == getattr(sre_constants, "ATOMIC_GROUP", None):
+        return _sequence(av, ignore_case)
+    if op == sre_constants.BRANCH:
+        branches = [_sequence(items, ignore_case) for items in av[1]]
+        exact = set()
+        for branch_exact, _ in branches:
+            if branch_exact is None or exact is None:
+                exact = None
+                break
+            exact |= branch_exact
+        if exact is not None and len(exact) > MAX_ALTERNATIVES:
+            exact = None
+        # One of the branches matches, so the union of each branch's best requirement is required
+        union = set()
+        for branch_exact, branch_requirements in branches:
+            best = _best(branch_requirements + ([branch_exact] if _is_requirement(branch_exact) else []))
+            if best is None:
+                union = None
+                break
+            union |= best
+        requirements = [union] if union and len(union) <= MAX_ALTERNATIVES else []
+        return exact, requirements
+    if op in _REPEATS:
+        low, high, items = av
+        item_exact, item_requirements = _sequence(items, ignore_case)
+        if low == 0:
+            return (item_exact | {""} if item_exact is not None and high == 1 else None), []
+        if _is_requirement(item_exact):
+            item_requirements = item_requirements + [item_exact]
+        return (item_exact if low == high == 1 else None), item_requirements
+    return None, []
+
+@lru_cache(maxsize=1024)
+def build_prefilter(pattern, flags=DEFAULT_FLAGS, anchored=False):
+    """
+    The Prefilter of a pattern, or None when it has no usable required literal, is anchored at the start
+    of the line (unless anchored=True: for scans that look for the literal instead of checking one line), or
+    doesn't parse (compiling it reports that). Cached, so callers can ask once per pattern and line.
+    """
+    try:
+        parsed = sre_parse.parse(pattern, normalize_flags(flags))
+    except (re.error, RecursionError, OverflowError):
+        return None
+    if not anchored and _anchored_at_start(list(parsed), parsed.state.flags):
+        return None
+    ignore_case = bool(parsed.state.flags & re.IGNORECASE)
+    _, requirements = _sequence(list(parsed), ignore_case)
+    usable = []
+    for alternatives in requirements:
+        if min(map(len, alternatives)) < MIN_LITERAL_LENGTH:
+            continue
+        if ignore_case and not all(literal.isascii() for literal in alternatives):
+            continue  # Non-ASCII case folding is more than lower(): leave those to the regex
+        alternatives = tuple(sorted(alternatives, key=len))
+        if alternatives not in usable:
+            usable.append(alternatives)
+    if not usable:
+        return None
+    usable.sort(key=lambda alternatives: (-len(alternatives[0]), len(alternatives)))
+    return Prefilter(tuple(usable[:MAX_REQUIREMENTS]), ignore_case)
@@ -0,0 +1,81 @@
+from collections import namedtuple
+
+PLACEHOLDER_PREFIX = "SAMPLE DATA"
+DEFAULT_SAMPLE_COUNT = 5
+# One highlighted field value in a sample
+Highlight = namedtuple("Highlight", ["start_idx", "end_idx", "field"])
+
+def placeholder(row):
+    return f"{PLACEHOLDER_PREFIX} {row+1}"
+
+def is_sample(text):
+    """True for real sample text: not blank and not one of the "SAMPLE DATA n" placeholders."""
+    return bool(text) and not text.startswith(PLACEHOLDER_PREFIX)
+
+class SampleList:
+    """
+    Every sample line behind the GUIs' sample area, which only renders the rows in view.
+    Copy All checks and highlights are kept sparsely (rows that have any), so clearing a field's
+    highlights or collecting checked rows costs as much as the rows involved, not the whole list.
+    Highlights: row -> (Highlight(start_idx, end_idx, field), ...), offsets into the stripped sample text.
+    """
+
+    def __init__(self, count=DEFAULT_SAMPLE_COUNT):
+        self.texts = [placeholder(i) for i in range(count)]
+        self.checked = set()
+        self.highlights = {}
+
+    def __len__(self):
+        return len(self.texts)
+
+    def text(self, row):
+        return self.texts[row].strip()
+
+    def set_text(self, row, text):
+        self.texts[row] = text
+
+    def load_lines(self, content):
+        """Replace the samples with the non-blank lines of content (a pasted feed). Returns the new row count."""
+        lines = [line for line in content.splitlines() if line.strip()]
+        self.texts = lines or [placeholder(0)]
+        self.checked = set()
+        self.highlights = {}
+        return len(self.texts)
+
+    def valid_samples(self):
+        """[(row, stripped text)] for every row holding real sample text."""
+        samples = []
+        for row, text in enumerate(self.texts):
+            text = text.strip()
+            if is_sample(text):
+                samples.append((row, text))
+        return samples
+
+    def set_checked(self, row, checked):
+        if checked:
+            self.checked.add(row)
+        else:
+            self.checked.discard(row)
+
+    def checked_rows(self):
+        return sorted(row for row in self.checked if row < len(self.texts))
+
+    def row_highlights(self, row):
+        return self.highlights.get(row, ())
+
+    def set_highlights(self, row, highlights):
+        if highlights:
+            self.highlights[row] = tuple(Highlight._make(highlight) for highlight in highlights)
+        else:
+            self.highlights.pop(row, None)
+
+    def replace_field(self, row, field, highlights):
+        """Swap the row's highlights for `field` with `highlights`, keeping the other fields'."""
+        self.set_highlights(row, [h for h in self.row_highlights(row) if h.field != field] + list(highlights))
+
+    def clear_field(self, field):
+        """Drop `field` highlights from every row. Returns the rows that changed."""
+        changed = [row for row, highlights in self.highlights.items() if any(h.field == field for h in highlights)]
+        for row in changed:
+            self.replace_field(row, field, [])
+        return changed
@@ -0,0 +1,110 @@
+import mmap
+import re
+from bin.extract import FIELDS, NO_PATTERN
+from bin.patterns import compile_pattern, normalize_flags, DEFAULT_FLAGS
+from bin.prefilter import build_prefilter
+
+# re's str \s also matches \x1c-\x1f (str.isspace), bytes \s doesn't; lines holding them are checked as text
+_STR_ONLY_SPACE = re.compile(rb"[\x1c-\x1f]")
+# Non-ASCII letters a case-insensitive str pattern matches for an ASCII one (re.compile("k", re.I) matches the Kelvin sign)
+_ASCII_FOLDS = {"i": "\u0130\u0131", "k": "\u212a", "s": "\u017f"}
+
+def bytes_pattern(pattern, flags=DEFAULT_FLAGS):
+    """
+    Bytes-mode compile of an ASCII pattern, or None. On a line that is ASCII, without \\x1c-\\x1f, it matches exactly
+    where the str pattern does (\\w, \\d, \\b and case folding only differ outside ASCII).
+    """
+    if not pattern.isascii():
+        return None
+    try:
+        return re.compile(pattern.encode("ascii"), normalize_flags(flags) & ~re.UNICODE)
+    except re.error:
+        return None  # Str-only syntax, e.g. \N{...} or (?u)
+
+def _literal_bytes(literal, ignore_case):
+    # UTF-8 bytes regex for one prefilter literal. Case-insensitive str patterns also match the few non-ASCII letters
+    # that fold onto ASCII ones (the prefilter leaves non-ASCII lines to the regex for that reason), so those are spelled out
+    if not ignore_case:
+        return re.escape(literal.encode("utf-8"))
+    parts = []
+    for char in literal:
+        escaped = re.escape(char.encode("utf-8"))
+        folds = _ASCII_FOLDS.get(char.lower())
+        parts.append(b"(?:" + b"|".join([escaped] + [fold.encode("utf-8") for fold in folds]) + b")" if folds else escaped)
+    return b"".join(parts)
+
+def candidate_finder(patterns, require_all, flags=DEFAULT_FLAGS):
+    """
+    One bytes regex matching, in UTF-8, somewhere in every line that can satisfy the search, from the patterns'
+    prefilters (bin.prefilter): the best required literal of the most selective pattern when all are required,
+    of every pattern otherwise. None when some line could match without any literal.
+    """
+    prefilters = [build_prefilter(pattern, flags, anchored=True) for pattern in patterns]
+    if require_all:
+        prefilters = [prefilter for prefilter in prefilters if prefilter is not None]
+        if not prefilters:
+            return None
+        prefilters = [max(prefilters, key=lambda prefilter: min(map(len, prefilter.requirements[0])))]
+    elif None in prefilters:
+        return None
+    alternatives = []
+    for prefilter in prefilters:
+        literals = b"|".join(_literal_bytes(literal, prefilter.ignore_case) for literal in prefilter.requirements[0])
+        alternatives.append(b"(?i:" + literals + b")" if prefilter.ignore_case else literals)
+    return re.compile(b"|".join(alternatives))
+
+def scan_file(path, extractor, fields=None, require_all=False, encoding="utf-8", flags=DEFAULT_FLAGS):
+    """
+    Find the lines of a file a pattern set matches without decoding the others.
+    The file is memory-mapped and split at b"\\n" with find(). When the patterns have required literals (and the
+    file is UTF-8) the scan jumps from one occurrence to the next (candidate_finder) instead of visiting every line;
+    each candidate line is then tested with the bytes-mode patterns (bytes_pattern) when it is ASCII, and decoded and
+    tested with the str patterns otherwise, so the result is the same as testing every decoded line.
+    fields: the fields whose patterns are tested (default: every field with a pattern); require_all: a line must
+    match all of them instead of any. encoding must be ASCII-compatible (bin.batch.can_shard); lines are split
+    at "\\n" only (a lone "\\r" is not a line break here).
+    Yields: (byte offset of the line, ExtractionRecord of the decoded line) for each matching line, in file order.
+    """
+    patterns = dict(extractor.patterns)
+    fields = [field for field in (fields or FIELDS) if patterns.get(field) and patterns[field] != NO_PATTERN]
+    if not fields:
+        return
+    plans = [(compile_pattern(patterns[field], flags), bytes_pattern(patterns[field], flags)) for field in fields]
+    utf8 = encoding.replace("_", "-").lower() in ("utf-8", "utf8")
+    finder = candidate_finder([patterns[field] for field in fields], require_all, flags) if utf8 else None
+    test = all if require_all else any
+    with open(path, "rb") as f:
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return  # Empty file: nothing to map
+    with buf:
+        size = len(buf)
+        position = 0
+        while position < size:
+            if finder is not None:
+                found = finder.search(buf, position)
+                if found is None:
+                    return
+                newline = buf.rfind(b"\n", position, found.start())
+                start = newline + 1 if newline >= 0 else position
+            else:
+                start = position
+            end = buf.find(b"\n", start)
+            if end < 0:
+                end = size
+            position = end + 1
+            raw = buf[start:end]
+            if raw.isascii() and not _STR_ONLY_SPACE.search(raw):
+                line = raw.strip()
+                if not line:
+                    continue
+                if not test((compiled.search(line) if compiled is not None else regex.search(line.decode("ascii")))
+                            for regex, compiled in plans):
+                    continue
+                text = line.decode("ascii")
+            else:
+                text = raw.decode(encoding, errors="replace").strip()
+                if not text or not test(regex.search(text) for regex, _ in plans):
+                    continue
+            yield start, extractor.extract(text)
@@ -0,0 +1,129 @@
+import re
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+
+_WHITESPACE = re.compile(r"\s*")
+
+class SeparatorIndex:
+    """
+    Positions of every configured separator in one text, found in a single pass.
+    Answers the questions the per-separator lookaround regexes
+    (?:(?<=[\\S])\\s*SEP\\s*|^\\s*SEP\\s*|\\s*SEP\\s*(?=[\\S])|\\s*SEP\\s*$) used to answer by
+    rescanning slices of the text, using bisect lookups instead.
+    Match starts/ends include the surrounding whitespace, exactly as those regexes reported them.
+    """
+
+    def __init__(self, text, separators, ignore_case=False):
+        self.text = text
+        self.separators = [sep for sep in dict.fromkeys(separators) if sep]
+        self.flags = re.IGNORECASE if ignore_case else 0
+        # Per separator: occurrence starts, occurrence ends, leading-whitespace starts, match ends
+        self._positions = {sep: ([], [], [], []) for sep in self.separators}
+        if self.separators:
+            alternation = "|".join(re.escape(sep) for sep in sorted(self.separators, key=len, reverse=True))
+            finder = re.compile(fr"(?=(?:{alternation}))", self.flags)
+            matchers = [(sep, re.compile(re.escape(sep), self.flags).match) for sep in self.separators]
+            for candidate in finder.finditer(text):
+                pos = candidate.start()
+                for sep, matcher in matchers:
+                    occ_starts, occ_ends, leads, match_ends = self._positions[sep]
+                    if occ_ends and pos < occ_ends[-1]:
+                        continue  # overlaps the previous occurrence of this separator
+                    hit = matcher(text, pos)
+                    if hit:
+                        self._add(sep, pos, hit.end())
+
+    def _add(self, sep, pos, end):
+        occ_starts, occ_ends, leads, match_ends = self._positions[sep]
+        lead = pos
+        while lead > 0 and self.text[lead - 1].isspace():
+            lead -= 1
+        occ_starts.append(pos)
+        occ_ends.append(end)
+        leads.append(lead)
+        match_ends.append(_WHITESPACE.match(self.text, end).end())
+
+    def _lookup(self, sep):
+        positions = self._positions.get(sep)
+        if positions is None:
+            # Separator outside the configured list (e.g. a fallback default): index it on demand
+            positions = self._positions[sep] = ([], [], [], [])
+            if sep:
+                for hit in re.finditer(re.escape(sep), self.text, self.flags):
+                    self._add(sep, hit.start(), hit.end())
+        return positions
+
+    def count(self, separator, start_idx=0, end_idx=None):
+        """Number of `separator` matches inside text[start_idx:end_idx]."""
+        occ_starts, occ_ends, _, _ = self._lookup(separator)
+        end_idx = len(self.text) if end_idx is None else end_idx
+        return max(0, bisect_right(occ_ends, end_idx) - bisect_left(occ_starts, start_idx))
+
+    def count_before(self, end_idx, separator):
+        """Number of `separator` matches inside text[:end_idx]."""
+        return bisect_right(self._lookup(separator)[1], end_idx)
+
+    def last_before(self, end_idx, separator):
+        """(start, end, count) of the last `separator` match inside text[:end_idx], or None."""
+        _, occ_ends, leads, match_ends = self._lookup(separator)
+        count = bisect_right(occ_ends, end_idx)
+        if not count:
+            return None
+        start = leads[count - 1]
+        if count > 1:
+            # Leading whitespace already consumed by the previous match is not part of this one
+            start = max(start, match_ends[count - 2])
+        return start, min(match_ends[count - 1], end_idx), count
+
+    def first_after(self, start_idx, separator):
+        """(start, end) of the first `separator` match inside text[start_idx:], or None."""
+        occ_starts, _, leads, match_ends = self._lookup(separator)
+        i = bisect_left(occ_starts, start_idx)
+        if i == len(occ_starts):
+            return None
+        return max(leads[i], start_idx), match_ends[i]
+
+    def previous_separator(self, end_idx):
+        """Separator whose last match in text[:end_idx] starts latest, as (separator, start) or (None, -1)."""
+        latest_sep, latest_pos = None, -1
+        for sep in self.separators:
+            last = self.last_before(end_idx, sep)
+            if last and last[0] > latest_pos:
+                latest_sep, latest_pos = sep, last[0]
+        return latest_sep, latest_pos
+
+    def next_separator(self, start_idx):
+        """Separator whose first match in text[start_idx:] starts earliest, as (separator, start) or (None, len(text))."""
+        earliest_sep, earliest_pos = None, len(self.text)
+        for sep in self.separators:
+            first = self.first_after(start_idx, sep)
+            if first and first[0] < earliest_pos:
+                earliest_sep, earliest_pos = sep, first[0]
+        return earliest_sep, earliest_pos
+
+    def most_frequent(self, start_idx=0, end_idx=None):
+        """Separator with the most matches inside text[start_idx:end_idx] (config order breaks ties), or None."""
+        best_sep, best_count = None, 0
+        for sep in self.separators:
+            count = self.count(sep, start_idx, end_idx)
+            if count > best_count:
+                best_sep, best_count = sep, count
+        return best_sep
+
+@lru_cache(maxsize=32)
+def _cached_index(text, separators, ignore_case):
+    return SeparatorIndex(text, separators, ignore_case)
+
+def separator_index(text, separators, ignore_case=False):
+    """Shared SeparatorIndex for `text`, so repeated helper calls on one sample reuse a single scan."""
+    return _cached_index(text, tuple(separators), ignore_case)
+
+def separator_helpers(possible_separators):
+    """The detect_separator/count_separators_before callables the field processors expect (GUIs and headless tools alike)."""
+    def detect_separator(text):
+        return separator_index(text, possible_separators).most_frequent() or "|"
+
+    def count_separators_before(text, start_idx, separator):
+        return separator_index(text, possible_separators).count_before(start_idx, separator)
+
+    return detect_separator, count_separators_before
@@ -0,0 +1,228 @@
+import json
+import re
+from bin.consensus import synthesize_patterns
+from bin.extract import Extractor, FIELDS
+from bin.instrument import instrumented, stage
+
+# Shape classes of a line's tokens: one character each, so a token shape is a plain string
+WORD, DIGITS, MONTH, DAY, TZ, MERIDIEM = "a", "9", "M", "W", "Z", "P"
+MERIDIEMS = ("am", "pm")
+ORDINALS = ("st", "nd", "rd", "th")
+# Classes of a line's shape (line_shape): its times (with the timezone marker that follows one), its dates,
+# the brackets around them, and one TEXT for each stretch of anything else
+TEXT, TIME, DATE = "a", "T", "D"
+# Lines of each cluster kept (from its start) to check the template's extractor on
+DEFAULT_CHECK_LINES = 32
+
+_TOKENS = re.compile(r"(\d+)|([^\W\d_]+)|(\S)")
+# Over a token shape: 7:30, 7.30 PM, 7-30 pm, 7pm, 7-30 ET; the timezone marker right after one is kept
+_TIME = re.compile(r"(?:9[:.]9P?|9-9P|9P|9-9(?=Z))(Z?)")
+# Then: day/month names with a number (Sat 4 Nov 2023, Nov 21), 4/11/2023, 4-11, 4 11 2023
+_DATE = re.compile(r"[WM]+9[WM9]*|9[WM9]*[WM][WM9]*|9[-/.]9(?:[-/.]9)?|999")
+# Everything else, timezone markers that don't follow a time included
+_OTHER = re.compile(r"(?:[^TZD()\[\]]|(?<!T)Z)+")
+_BRACKETED_TEXT = re.compile(r"\(a\)|\[a\]")
+_TEXT_RUN = re.compile(r"a{2,}")
+
+def shape_vocabulary(config):
+    """Lower-cased word -> shape class, for the month/day names and timezone markers of config."""
+    vocabulary = {word.lower(): MERIDIEM for word in MERIDIEMS}
+    for names in config["months"].values():
+        vocabulary.update((name.lower(), MONTH) for name in names)
+    for names in config["days"].values():
+        vocabulary.update((name.lower(), DAY) for name in names)
+    for tz in config["timezones"]:
+        vocabulary.update((marker.lower(), TZ) for marker in tz["match"])
+    return vocabulary
+
+def token_shape(text, vocabulary):
+    """
+    One class per token of a listing line: digit runs become 9, month/day names M/W, timezone markers Z,
+    am/pm P, every run of other words a single a, and punctuation stays as is; whitespace and ordinal
+    suffixes (21st) are dropped.
+    "NAME 12 | Title - Team vs Team @ 7:30 PM ET" -> "a9|a-a@9:9PZ"
+    """
+    shape = []
+    for digits, word, symbol in _TOKENS.findall(text):
+        if digits:
+            token = DIGITS
+        elif word:
+            lowered = word.lower()
+            if lowered in ORDINALS and shape and shape[-1] == DIGITS:
+                continue
+            token = vocabulary.get(lowered, WORD)
+            if token == WORD and shape and shape[-1] == WORD:
+                continue  # Titles and channel names vary in length, not in shape
+        else:
+            token = symbol
+        shape.append(token)
+    return "".join(shape)
+
+def line_shape(text, vocabulary):
+    """
+    Layout signature of a listing line: the order of its time and date fields and little else, so the lines of
+    one layout share it whatever their channel names, titles, separators or time/date formats.
+    Times become T (TZ with a timezone marker right after), dates D, and each stretch of other text between
+    them a single a; brackets are kept around the fields, dropped around plain text ("(HD)" is just text).
+    "NAME 12 | Title - Team vs Team @ 7:30 PM ET" -> "aTZ", "NAME 4 - Team vs Team (Nov 21 3:30pm EST)" -> "a(DTZ)"
+    """
+    shape = _TIME.sub(lambda m: TIME + m.group(1), token_shape(text, vocabulary))
+    shape = _OTHER.sub(TEXT, _DATE.sub(DATE, shape))
+    return _TEXT_RUN.sub(TEXT, _BRACKETED_TEXT.sub(TEXT, shape))
+
+def cluster_lines(lines, vocabulary, check_lines=DEFAULT_CHECK_LINES):
+    """
+    Group the non-blank lines of an iterable by shape in one pass, keeping only counts and a few lines per shape.
+    Returns: ({signature: {"lines", "line_number" (first, 1-based), "examples": [stripped lines]}}, total lines)
+    """
+    clusters = {}
+    total = 0
+    for line_number, line in enumerate(lines, 1):
+        text = line.strip()
+        if not text:
+            continue
+        total += 1
+        signature = line_shape(text, vocabulary)
+        cluster = clusters.get(signature)
+        if cluster is None:
+            clusters[signature] = {"lines": 1, "line_number": line_number, "examples": [text]}
+            continue
+        cluster["lines"] += 1
+        if len(cluster["examples"]) < check_lines:
+            cluster["examples"].append(text)
+    return clusters, total
+
+def _covers(patterns, record):
+    # Every field the template has a pattern for was found
+    return all(value for field, value in zip(FIELDS, record) if patterns[field])
+
+@instrumented()
+def mine_templates(lines, config, timezone, detect_separator, count_separators_before, min_lines=1,
+                   check_lines=DEFAULT_CHECK_LINES):
+    """
+    Mine one pattern set per line layout of a mixed feed.
+    Lines are clustered by shape (line_shape) in a single streaming pass. Each cluster of at least min_lines
+    lines gets the consensus patterns of its first check_lines lines (synthesize_patterns: Auto on a few of
+    them, generalized over all, so the literal channel name Auto picks becomes a name pattern, and so on);
+    "matched" counts the checked lines the resulting extractor finds every field in.
+    Returns: (templates, total lines), templates as [{"signature", "lines", "line_number", "representative",
+    "patterns": {field: pattern}, "extractor", "checked", "matched"}], largest cluster first.
+    """
+    vocabulary = shape_vocabulary(config)
+    with stage("cluster"):
+        clusters, total = cluster_lines(lines, vocabulary, check_lines)
+    templates = []
+    with stage("synthesize"):
+        for signature, cluster in sorted(clusters.items(), key=lambda item: (-item[1]["lines"], item[1]["line_number"])):
+            if cluster["lines"] < min_lines:
+                break
+            representative = cluster["examples"][0]
+            consensus = synthesize_patterns(
+                cluster["examples"], config, timezone, detect_separator, count_separators_before
+            )
+            patterns = {field: consensus[field]["pattern"] for field in FIELDS}
+            try:
+                extractor = Extractor(patterns)
+            except re.error:
+                continue  # Auto proposed something unusable: the cluster stays uncovered
+            templates.append({
+                "signature": signature,
+                "lines": cluster["lines"],
+                "line_number": cluster["line_number"],
+                "representative": representative,
+                "patterns": patterns,
+                "extractor": extractor,
+                "checked": len(cluster["examples"]),
+                "matched": sum(_covers(patterns, extractor.extract(text)) for text in cluster["examples"]),
+            })
+    return templates, total
+
+def load_templates(path):
+    """
+    Load a `bossex templates` file.
+    Returns: ([{"signature", "patterns"}], vocabulary), or None when path holds something else (e.g. a plain pattern set).
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            data = json.load(f)
+        except json.JSONDecodeError:
+            return None
+    if not isinstance(data, dict) or "templates" not in data:
+        return None
+    if not isinstance(data.get("vocabulary"), dict):
+        raise ValueError(f"{path} has no shape vocabulary")
+    return [{"signature": t["signature"], "patterns": t["patterns"]} for t in data["templates"]], data["vocabulary"]
+
+class TemplateRouter:
+    """
+    Runtime dispatch over mined templates: each line's shape (line_shape, with the vocabulary the templates
+    were mined with) is looked up in a dict, so a line runs exactly one pattern set however many templates
+    there are. Lines of an unknown shape go to a fallback queue instead.
+    Immutable and safe to share between threads, like Extractor.
+    """
+    __slots__ = ("templates", "vocabulary", "_routes")
+
+    def __init__(self, templates, vocabulary):
+        """templates: [{"signature", "patterns"}], as returned by load_templates. Raises re.error on an invalid pattern."""
+        routes = {}
+        for template in templates:
+            routes.setdefault(template["signature"], Extractor(template["patterns"]))
+        object.__setattr__(self, "templates", tuple((t["signature"], dict(t["patterns"])) for t in templates))
+        object.__setattr__(self, "vocabulary", dict(vocabulary))
+        object.__setattr__(self, "_routes", routes)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("TemplateRouter is immutable")
+
+    def __repr__(self):
+        return f"TemplateRouter({len(self._routes)} templates)"
+
+    def spec(self):
+        """Plain-data arguments that rebuild this router (TemplateRouter(*spec)), e.g. in a worker process."""
+        return [{"signature": signature, "patterns": patterns} for signature, patterns in self.templates], self.vocabulary
+
+    def route(self, line):
+        """(signature, Extractor or None) for one listing line."""
+        signature = line_shape(line.strip(), self.vocabulary)
+        return signature, self._routes.get(signature)
+
+    def extract(self, line):
+        """(signature, ExtractionRecord), or (signature, None) for a line no template has the shape of."""
+        signature, extractor = self.route(line)
+        return signature, extractor.extract(line) if extractor is not None else None
+
+    def route_many(self, lines, fallback):
+        """
+        Route an iterable of lines without extracting, skipping blank ones: yields (line number, signature, Extractor,
+        stripped text), e.g. for a bin.guard RegexGuard; unmatched lines go to fallback as in extract_many.
+        """
+        routes = self._routes
+        vocabulary = self.vocabulary
+        for line_number, line in enumerate(lines, 1):
+            text = line.strip()
+            if not text:
+                continue
+            signature = line_shape(text, vocabulary)
+            extractor = routes.get(signature)
+            if extractor is None:
+                fallback.append((line_number, text))
+            else:
+                yield line_number, signature, extractor, text
+
+    def extract_many(self, lines, fallback):
+        """
+        Lazily extract an iterable of lines, skipping blank ones. Yields (line number, signature, ExtractionRecord)
+        with 1-based line numbers; unmatched lines are appended to fallback (a list, deque, ...) as (line number, text).
+        """
+        routes = self._routes
+        vocabulary = self.vocabulary
+        for line_number, line in enumerate(lines, 1):
+            text = line.strip()
+            if not text:
+                continue
+            signature = line_shape(text, vocabulary)
+            extractor = routes.get(signature)
+            if extractor is None:
+                fallback.append((line_number, text))
+            else:
+                yield line_number, signature, extractor.extract(text)
@@ -1,24 +1,93 @@
 import re
-
+from functools import lru_cache
+from bin.separators import separator_index
+from bin.patterns import compile_pattern, anchored_field_pattern
+from bin.timezones import timezone_score
+from bin.instrument import instrumented, count_regex, count_candidates
+
+AM_PM_SUFFIX = re.compile(r'[AaPp][Mm]$')
+# Maximal run of digits and time separators containing a digit, plus a trailing am/pm marker
+TIME_WINDOW = re.compile(r"[\d:.\-]*\d[\d:.\-]*(?:\s*[AaPp][Mm])?")
+# Time formats built only from digits, :.- separators and a final optional am/pm marker
+_WINDOW_SAFE_TOKEN = r"(?:\\d|\\[.:\-]|[:\-]|\[(?:\\?[.:\-])+\])(?:\{\d+(?:,\d*)?\}|[?*+])?|\(\?:|\)[?*]?"
+WINDOW_SAFE_FORMAT = re.compile(fr"(?:{_WINDOW_SAFE_TOKEN})+(?:(?:\(\?:)?(?:\\s\*)?\[AaPp\]\[Mm\](?:\)\??)*)?")
+# Distinct window texts remembered per time format set
+WINDOW_CACHE_SIZE = 4096
+
+@instrumented()
 def process_time_field(selected_text, full_text, start_idx, end_idx, time_formats, possible_separators, days, months, anchor_enabled, detect_separator, count_separators_before, tz_matches=None):
     pattern, extracted = get_time_pattern(selected_text, full_text, start_idx, time_formats, possible_separators, anchor_enabled, detect_separator, count_separators_before, tz_matches)
     format_str = get_time_format(extracted)
     return pattern, extracted, format_str
 
+def is_window_safe(time_format):
+    """
+    True when every match of `time_format` lies inside one TIME_WINDOW: digits and :.- runs,
+    optionally closed by an am/pm marker, with no anchors or lookarounds.
+    All shipped time_formats qualify; anything else goes through the per-format fallback.
+    """
+    return bool(WINDOW_SAFE_FORMAT.fullmatch(time_format))
+
+@lru_cache(maxsize=8)
+def _time_scan_plan(time_formats):
+    compiled_formats = [compile_pattern(pattern) for pattern in time_formats]
+    window_safe = all(is_window_safe(pattern) for pattern in time_formats)
+    # Bare digit runs (channel numbers, years, day numbers) only matter if a format matches them
+    keep_digit_runs = any(regex.search("0" * 32) for regex in compiled_formats)
+    return compiled_formats, window_safe, keep_digit_runs, {}
+
+def _merged_candidates(text, time_formats, compiled_formats):
+    count_regex(len(compiled_formats))
+    spans = {}
+    for i, regex in enumerate(compiled_formats):
+        for span in (match.span() for match in regex.finditer(text)):
+            if span not in spans:
+                spans[span] = i
+    candidates = []
+    for (start_idx, end_idx), i in sorted(spans.items(), key=lambda item: (item[0][0], item[1])):
+        time_text = text[start_idx:end_idx]
+        candidates.append((start_idx, end_idx, time_text, time_formats[i], bool(AM_PM_SUFFIX.search(time_text))))
+    return candidates
+
+def find_time_candidates(full_text, time_formats):
+    """
+    Find every time format match in full_text, deduplicated.
+    Equivalent to running re.finditer once per format and merging, minus the duplicate spans
+    that overlapping formats produce (each span is kept once, with the first format that matched it).
+    One pass over full_text collects the time-shaped windows; the formats only run once per
+    distinct window text, instead of each format rescanning the whole text.
+    Returns: list of (start, end, text, matched_format, is_am_pm), ordered by position then format.
+    """
+    if not time_formats:
+        return []
+    time_formats = tuple(time_formats)
+    compiled_formats, window_safe, keep_digit_runs, window_cache = _time_scan_plan(time_formats)
+    if not window_safe:
+        return _merged_candidates(full_text, time_formats, compiled_formats)
+
+    if len(window_cache) > WINDOW_CACHE_SIZE:
+        window_cache.clear()
+    count_regex()
+    candidates = []
+    for window in TIME_WINDOW.finditer(full_text):
+        window_text = window.group(0)
+        if not keep_digit_runs and window_text.isdigit():
+            continue
+        window_candidates = window_cache.get(window_text)
+        if window_candidates is None:
+            window_candidates = window_cache[window_text] = _merged_candidates(window_text, time_formats, compiled_formats)
+        offset = window.start()
+        for start_idx, end_idx, time_text, pattern, is_am_pm in window_candidates:
+            candidates.append((start_idx + offset, end_idx + offset, time_text, pattern, is_am_pm))
+    return candidates
+
+@instrumented()
 def refresh_time_field(full_text, time_formats, possible_separators, days, months, anchor_enabled, detect_separator, count_separators_before, tz_matches=None, current_time=None):
     matches = []
-    for pattern in time_formats:
-        for match in re.finditer(pattern, full_text, re.IGNORECASE):
-            time_text = match.group(0)
-            start_idx = match.start()
-            is_am_pm = bool(re.search(r'[AaPp][Mm]', time_text.strip()))
-            tz_score = 0
-            if tz_matches:
-                for m in tz_matches:
-                    tz_pos = full_text[max(0, start_idx-20):start_idx].upper().rfind(m)
-                    if tz_pos != -1:
-                        tz_score = max(tz_score, 20 - tz_pos)
-            matches.append((start_idx, start_idx + len(time_text), time_text, pattern, is_am_pm, tz_score))
+    for start_idx, end_idx, time_text, pattern, is_am_pm in find_time_candidates(full_text, time_formats):
+        tz_score = timezone_score(full_text, start_idx, tz_matches)
+        matches.append((start_idx, end_idx, time_text, pattern, is_am_pm, tz_score))
+    count_candidates(len(matches))
 
     if not matches:
         return "No pattern detected", "", "No format detected"
@@ -39,14 +108,15 @@ def get_time_pattern(selected_text, full_text, start_idx, time_formats, possible
     selected_text = selected_text.strip()
     base_pattern = None
     for pattern in time_formats:
-        if re.fullmatch(pattern, selected_text, re.IGNORECASE):
+        if compile_pattern(pattern).fullmatch(selected_text):
             base_pattern = pattern
             break
 
     if not base_pattern:
         base_pattern = time_formats[0]
 
-    matches = list(re.finditer(base_pattern, full_text, re.IGNORECASE))
+    matches = list(compile_pattern(base_pattern).finditer(full_text))
+    count_candidates(len(matches))
     if not matches:
         return "No pattern detected", selected_text
 
@@ -54,12 +124,7 @@ def get_time_pattern(selected_text, full_text, start_idx, time_formats, possible
     if tz_matches and anchor_enabled:
         max_tz_score = -1
         for match in matches:
-            match_start = match.start()
-            tz_score = 0
-            for m in tz_matches:
-                tz_pos = full_text[max(0, match_start-20):match_start].upper().rfind(m)
-                if tz_pos != -1:
-                    tz_score = max(tz_score, 20 - tz_pos)
+            tz_score = timezone_score(full_text, match.start(), tz_matches)
             if tz_score > max_tz_score:
                 max_tz_score = tz_score
                 best_match = match
@@ -72,10 +137,7 @@ def get_time_pattern(selected_text, full_text, start_idx, time_formats, possible
         if not separator:
             separator = detect_separator(full_text) or "|"
             sep_count = count_separators_before(full_text, best_match.start(), separator)
-        escaped_sep = re.escape(separator)
-        sep_pattern = fr"\s*{escaped_sep}\s*"
-        prior_pattern = fr"(?:{sep_pattern}.*?){{{sep_count}}}"
-        pattern = fr"{prior_pattern}\s*({base_pattern})"
+        pattern = anchored_field_pattern(separator, sep_count, base_pattern)
 
     return pattern, extracted
 
@@ -84,34 +146,33 @@ def get_closest_separator(full_text, start_idx, possible_separators, tz_matches=
     min_distance = float('inf')
     sep_count = 0
     sep_pos = None
+    index = separator_index(full_text, possible_separators, ignore_case=True)
 
     if tz_matches:
         for sep in [s for s in possible_separators if s in tz_matches]:
-            escaped_sep = re.escape(sep)
-            matches = list(re.finditer(fr"(?:(?<=[\S])\s*{escaped_sep}\s*|^\s*{escaped_sep}\s*|\s*{escaped_sep}\s*(?=[\S])|\s*{escaped_sep}\s*$)", full_text[:start_idx], re.IGNORECASE))
-            if matches:
-                last_match = matches[-1]
-                distance = start_idx - last_match.end()
+            last = index.last_before(start_idx, sep)
+            if last:
+                last_start, last_end, count = last
+                distance = start_idx - last_end
                 if distance < min_distance:
                     min_distance = distance
                     closest_sep = sep
-                    sep_count = len(matches)
-                    sep_pos = last_match.start()
+                    sep_count = count
+                    sep_pos = last_start
 
     if not closest_sep:
         for sep in possible_separators:
             if tz_matches and sep in tz_matches:
                 continue
-            escaped_sep = re.escape(sep)
-            matches = list(re.finditer(fr"(?:(?<=[\S])\s*{escaped_sep}\s*|^\s*{escaped_sep}\s*|\s*{escaped_sep}\s*(?=[\S])|\s*{escaped_sep}\s*$)", full_text[:start_idx], re.IGNORECASE))
-            if matches:
-                last_match = matches[-1]
-                distance = start_idx - last_match.end()
+            last = index.last_before(start_idx, sep)
+            if last:
+                last_start, last_end, count = last
+                distance = start_idx - last_end
                 if distance < min_distance:
                     min_distance = distance
                     closest_sep = sep
-                    sep_count = len(matches)
-                    sep_pos = last_match.start()
+                    sep_count = count
+                    sep_pos = last_start
 
     return closest_sep, sep_count, sep_pos
 
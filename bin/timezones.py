@@ -0,0 +1,84 @@
+import re
+from bisect import bisect_right
+from functools import lru_cache
+
+# Characters before a time/date that are searched for timezone markers
+DEFAULT_WINDOW = 20
+
+_window = DEFAULT_WINDOW
+_markers = ()
+
+def configure_timezones(config):
+    """Index every marker of config["timezones"] and take the proximity window from config ("timezone_window")."""
+    global _window, _markers
+    _window = int(config.get("timezone_window", DEFAULT_WINDOW))
+    _markers = tuple(dict.fromkeys(m for tz in config.get("timezones", []) for m in tz["match"]))
+
+class TimezoneIndex:
+    """
+    Positions of the timezone markers in one text, found in a single multi-keyword scan.
+    score() reproduces the proximity score previously computed per candidate as
+    window - full_text[max(0, start-window):start].upper().rfind(marker), without slicing or uppercasing.
+    """
+
+    def __init__(self, text, markers, window=DEFAULT_WINDOW):
+        self.text = text
+        self.window = window
+        self.markers = [m for m in dict.fromkeys(markers) if m]
+        upper = text.upper()
+        # Offsets only line up when uppercasing keeps the length (true for ASCII and most scripts)
+        self._upper = upper if len(upper) == len(text) else None
+        self._positions = {m: [] for m in self.markers}
+        if self._upper is not None and self.markers:
+            alternation = "|".join(re.escape(m) for m in sorted(self.markers, key=len, reverse=True))
+            for candidate in re.finditer(fr"(?=(?:{alternation}))", self._upper):
+                pos = candidate.start()
+                for m in self.markers:
+                    if self._upper.startswith(m, pos):
+                        self._positions[m].append(pos)
+
+    def _lookup(self, marker):
+        positions = self._positions.get(marker)
+        if positions is None:
+            # Marker outside the indexed set: index it on demand
+            positions = self._positions[marker] = []
+            if marker:
+                pos = self._upper.find(marker)
+                while pos != -1:
+                    positions.append(pos)
+                    pos = self._upper.find(marker, pos + 1)
+        return positions
+
+    def score(self, start_idx, markers):
+        """Proximity score of the closest-preceding-window match of any of `markers` before start_idx (0 if none)."""
+        window_start = max(0, start_idx - self.window)
+        best = 0
+        if self._upper is None:
+            window_text = self.text[window_start:start_idx].upper()
+            for m in markers:
+                pos = window_text.rfind(m)
+                if pos != -1:
+                    best = max(best, self.window - pos)
+            return best
+        for m in markers:
+            if not m:
+                continue
+            positions = self._lookup(m)
+            i = bisect_right(positions, start_idx - len(m)) - 1
+            if i >= 0 and positions[i] >= window_start:
+                best = max(best, self.window - (positions[i] - window_start))
+        return best
+
+@lru_cache(maxsize=32)
+def _cached_index(text, markers, window):
+    return TimezoneIndex(text, markers, window)
+
+def timezone_index(text, markers=()):
+    """Shared TimezoneIndex for `text` covering the configured markers plus `markers`."""
+    return _cached_index(text, tuple(dict.fromkeys(_markers + tuple(markers))), _window)
+
+def timezone_score(full_text, start_idx, tz_matches):
+    """Proximity score of `tz_matches` markers shortly before start_idx in full_text."""
+    if not tz_matches:
+        return 0
+    return timezone_index(full_text, tz_matches).score(start_idx, tz_matches)
@@ -1,5 +1,8 @@
-import re
+from bin.separators import separator_index
+from bin.patterns import compile_pattern, title_field_pattern
+from bin.instrument import instrumented, count_candidates
 
+@instrumented()
 def process_title_field(selected_text, full_text, start_idx, end_idx, possible_separators, detect_separator):
     """
     Process the title field based on highlighted text.
@@ -20,53 +23,40 @@ def process_title_field(selected_text, full_text, start_idx, end_idx, possible_s
     opening_sep = None
     opening_sep_count = 0
     
+    index = separator_index(full_text, valid_separators, ignore_case=True)
+    count_candidates(len(valid_separators))
     for sep in valid_separators:
-        pattern = fr"(?:(?<=[\S])\s*{re.escape(sep)}\s*|^\s*{re.escape(sep)}\s*|\s*{re.escape(sep)}\s*(?=[\S])|\s*{re.escape(sep)}\s*$)"
-        matches = [m for m in re.finditer(pattern, full_text[:start_idx], re.IGNORECASE)]
-        if matches:
-            pos = matches[-1].start()
+        last = index.last_before(start_idx, sep)
+        if last:
+            pos, _, count = last
             if pos > latest_pos:
                 latest_pos = pos
                 opening_sep = sep
-                opening_sep_count = len(matches)
+                opening_sep_count = count
     
     if not opening_sep:
         opening_sep = detect_separator(full_text[:start_idx]) or ":"
         # Assume first occurrence if using fallback
-        opening_sep_count = 1
-        matches = [m for m in re.finditer(fr"\s*{re.escape(opening_sep)}\s*", full_text[:start_idx], re.IGNORECASE)]
-        if matches:
-            opening_sep_count = len(matches)
+        opening_sep_count = index.count_before(start_idx, opening_sep) or 1
     
     # Find the closing separator (after the selection)
     earliest_pos = len(full_text)
     closing_sep = None
     
     for sep in valid_separators:
-        pattern = fr"(?:(?<=[\S])\s*{re.escape(sep)}\s*|^\s*{re.escape(sep)}\s*|\s*{re.escape(sep)}\s*(?=[\S])|\s*{re.escape(sep)}\s*$)"
-        matches = [m for m in re.finditer(pattern, full_text[end_idx:], re.IGNORECASE)]
-        if matches:
-            pos = matches[0].start() + end_idx
-            if pos < earliest_pos:
-                earliest_pos = pos
-                closing_sep = sep
+        first = index.first_after(end_idx, sep)
+        if first and first[0] < earliest_pos:
+            earliest_pos = first[0]
+            closing_sep = sep
     
     if not closing_sep:
         closing_sep = detect_separator(full_text[end_idx:]) or "//"
     
     # Build regex: skip to n-th opening_sep, capture group, match closing_sep
-    escaped_open = re.escape(opening_sep)
-    escaped_close = re.escape(closing_sep)
+    # (up to the last occurrence when the closing separator is a pipe)
+    pattern = title_field_pattern(opening_sep, opening_sep_count, closing_sep)
     
-    # Modified pattern to capture up to the last occurrence of closing separator
-    if closing_sep == "|":
-        # Special handling for pipe - capture everything up to last pipe
-        pattern = fr"(?:.*?\s*{escaped_open}\s*){{{opening_sep_count}}}(.*?)\s*{escaped_close}\s*[^{escaped_close}]*$"
-    else:
-        # Original pattern for other separators
-        pattern = fr"(?:.*?\s*{escaped_open}\s*){{{opening_sep_count}}}(.*?)(?=\s*{escaped_close}\s*)"
-    
-    match = re.search(pattern, full_text, re.IGNORECASE)
+    match = compile_pattern(pattern).search(full_text)
     extracted = match.group(1).strip() if match else selected_text.strip()
     
     return pattern, extracted
\ No newline at end of file
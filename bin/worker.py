@@ -0,0 +1,93 @@
+import threading
+
+class Cancelled(Exception):
+    """Raised by CancelToken.check() inside a job whose request was superseded or cancelled."""
+
+class CancelToken:
+    __slots__ = ("_event",)
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def check(self):
+        """Stop the job here if a newer request replaced it."""
+        if self._event.is_set():
+            raise Cancelled()
+
+class BackgroundRunner:
+    """
+    Runs GUI actions (Auto, Alt., Test All) off the UI thread, with one live request per key.
+    Submitting a key again cancels the request still running under it instead of queueing behind it:
+    the old job stops at its next token.check() and its result is dropped. Only the latest request's
+    result reaches the UI, on the UI thread, through `schedule` (root.after / Clock.schedule_once).
+    A regex already running inside re can't be interrupted; the worker thread just finishes it unseen
+    (Test All and copying run edited patterns through a bin.guard RegexGuard, which bounds that).
+    """
+
+    def __init__(self, schedule, on_busy=None):
+        self.schedule = schedule  # schedule(fn): run fn() on the UI thread
+        self.on_busy = on_busy  # on_busy(bool), called on the UI thread when work starts/stops
+        self._lock = threading.Lock()
+        self._tokens = {}
+
+    @property
+    def busy(self):
+        return bool(self._tokens)
+
+    def submit(self, key, job, on_done, on_error=None):
+        """
+        Run job(token) on a worker thread; call on_done(result) or on_error(exception) on the UI thread.
+        Must be called from the UI thread. Returns the request's CancelToken.
+        """
+        token = CancelToken()
+        with self._lock:
+            was_busy = bool(self._tokens)
+            previous = self._tokens.get(key)
+            if previous is not None:
+                previous.cancel()
+            self._tokens[key] = token
+        if not was_busy and self.on_busy:
+            self.on_busy(True)
+        threading.Thread(target=self._run, args=(key, token, job, on_done, on_error), daemon=True).start()
+        return token
+
+    def cancel(self, key):
+        """Cancel the live request under key, if any (UI thread)."""
+        with self._lock:
+            token = self._tokens.pop(key, None)
+            now_busy = bool(self._tokens)
+        if token is not None:
+            token.cancel()
+            if not now_busy and self.on_busy:
+                self.on_busy(False)
+
+    def _run(self, key, token, job, on_done, on_error):
+        try:
+            result, error = job(token), None
+        except Cancelled:
+            return
+        except Exception as e:
+            result, error = None, e
+        self.schedule(lambda: self._deliver(key, token, result, error, on_done, on_error))
+
+    def _deliver(self, key, token, result, error, on_done, on_error):
+        with self._lock:
+            if self._tokens.get(key) is not token:
+                return  # Superseded or cancelled while the result was on its way
+            del self._tokens[key]
+            now_busy = bool(self._tokens)
+        if not now_busy and self.on_busy:
+            self.on_busy(False)
+        if error is None:
+            on_done(result)
+        elif on_error is not None:
+            on_error(error)
+        else:
+            raise error
@@ -0,0 +1,496 @@
+"""
+Headless BossEx tools, run from the project root:
+
+    python -m bossex extract PATTERNS [INPUT] [-o OUTPUT] [--jobs N] [--fallback UNMATCHED] [--timeout SECONDS]
+    python -m bossex extract PATTERNS [INPUT] --columns DIRECTORY [--memory-limit MIB]
+    python -m bossex extract PATTERNS [INPUT] --cache CACHE [--cache-size MIB] [--rebuild-cache | --no-cache]
+    python -m bossex search PATTERNS INPUT [-o OUTPUT] [--field FIELD ...] [--all]
+    python -m bossex profile [INPUT] [-o OUTPUT] [--timezone ET/EST]
+    python -m bossex synthesize [INPUT] [-o PATTERNS] [--timezone ET/EST]
+    python -m bossex templates [INPUT] [-o TEMPLATES] [--timezone ET/EST] [--min-lines N]
+
+PATTERNS is a saved pattern set (JSON keyed by name/title/time/date, or Copy All text).
+INPUT is a listings file, one listing per line ("-" or omitted for stdin).
+extract --jobs N splits a file into newline-aligned byte-range shards and extracts them in N processes
+(0: one per CPU); the output is identical to a single-process run.
+PATTERNS may also be a `bossex templates` file: each line is then extracted with the one template of its shape,
+records gain a "template" key, and lines of no known shape are written to --fallback (or just counted).
+extract --timeout runs every search under a time budget (bin.guard): a pattern that runs away on a line is
+given up on and listed in that record's "timed_out" key instead of stalling the run; past a few timeouts in a chunk of
+lines, its other lines aren't searched and list the field under "skipped".
+extract --columns writes one JSON-lines file per column (line, [template,] name, title, time, date) under DIRECTORY
+instead of JSONL records, buffering at most --memory-limit MiB of values in between (bin.columns).
+extract --cache keeps every line's record in a SQLite file across runs (bin.cache), so re-running a feed that has
+barely changed only searches its new lines; --rebuild-cache empties it first, --no-cache ignores it.
+search memory-maps INPUT and writes only the lines the pattern set matches (bin.scan), keyed by byte offset:
+lines without a pattern's required literals are skipped at find() speed and never decoded.
+profile runs Auto on every listing and writes its stage timings (bin.instrument records) as JSONL.
+synthesize writes the consensus pattern set for all listings (bin.consensus) as JSON, ready for extract.
+templates clusters a mixed feed by line shape and writes one Auto pattern set per layout (bin.templates) as JSON.
+Every command takes --config (default: bin/config.json) and --engine re/regex/re2 (bin.engines), which overrides its
+regex_engine; patterns an engine can't run identically stay on re.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import sqlite3
+import sys
+import time
+from bin.auto import auto_process
+from bin.batch import extract_file_sharded, can_shard, cpu_count
+from bin.cache import ExtractionCache, DEFAULT_MAX_SIZE
+from bin.columns import ColumnWriter, DEFAULT_MEMORY_LIMIT
+from bin.consensus import synthesize_patterns, DEFAULT_PROBE_COUNT
+from bin.extract import Extractor, FIELDS
+from bin.instrument import record_stages
+from bin.patterns import load_registry
+from bin.engines import ENGINES
+from bin.guard import RegexGuard, guarded_lines
+from bin.scan import scan_file
+from bin.separators import separator_helpers
+from bin.templates import mine_templates, shape_vocabulary, load_templates, TemplateRouter
+from bin.timezones import configure_timezones
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bin", "config.json")
+
+def open_input(path, encoding):
+    if path == "-":
+        return sys.stdin
+    return open(path, "r", encoding=encoding, errors="replace")
+
+def open_source(command, args):
+    """args.input opened for reading, or None after reporting why it can't be."""
+    try:
+        return open_input(args.input, args.encoding)
+    except OSError as e:
+        print(f"bossex {command}: {e}", file=sys.stderr)
+        return None
+
+def open_output(path):
+    if path == "-":
+        return sys.stdout
+    return open(path, "w", encoding="utf-8")
+
+def load_extractor(path):
+    """A TemplateRouter for a `bossex templates` file, otherwise an Extractor for a saved pattern set."""
+    templates = load_templates(path)
+    if templates is not None:
+        return TemplateRouter(*templates)
+    return Extractor.from_file(path)
+
+class FallbackQueue:
+    """Lines no template routed: written to a file as they come (when one is given) and counted."""
+
+    def __init__(self, path=None):
+        self.count = 0
+        self.sink = open_output(path) if path else None
+
+    def append(self, item):
+        self.count += 1
+        if self.sink is not None:
+            self.sink.write(item[1] + "\n")
+
+    def close(self, quiet=False):
+        if self.sink is not None and self.sink is not sys.stdout:
+            self.sink.close()
+        if self.count and not quiet:
+            print(f"{self.count:,} lines matched no template", file=sys.stderr)
+
+def run_extract(args):
+    try:
+        load_config(args.config, args.engine)  # For its regex_engine
+        extractor = load_extractor(args.patterns)
+    except (OSError, ValueError, re.error) as e:
+        print(f"bossex extract: {e}", file=sys.stderr)
+        return 2
+    if args.fallback and not isinstance(extractor, TemplateRouter):
+        print("bossex extract: --fallback needs a templates file", file=sys.stderr)
+        return 2
+    if args.columns and (args.timeout or args.output != "-"):
+        print("bossex extract: --columns can't be combined with --timeout or -o", file=sys.stderr)
+        return 2
+    if args.no_cache:
+        args.cache = None
+    if args.cache and (args.timeout or args.columns):
+        print("bossex extract: --cache can't be combined with --timeout or --columns", file=sys.stderr)
+        return 2
+
+    if args.jobs != 1:
+        if args.input != "-" and can_shard(args.encoding) and not args.columns and not args.cache:
+            return run_extract_sharded(args, extractor)
+        print("bossex extract: --jobs needs an input file in an ASCII-compatible encoding, without --columns or --cache; "
+              "running in one process", file=sys.stderr)
+
+    source = open_source("extract", args)
+    if source is None:
+        return 2
+    cache = None
+    if args.cache:
+        try:
+            cache = ExtractionCache(args.cache, args.cache_size * 1024 * 1024, rebuild=args.rebuild_cache)
+        except sqlite3.Error as e:
+            print(f"bossex extract: cache {args.cache}: {e}", file=sys.stderr)
+            if source is not sys.stdin:
+                source.close()
+            return 2
+    sink = open_output(args.output)
+    fallback = FallbackQueue(args.fallback)
+    try:
+        if args.columns:
+            write_columns(args, extractor, source, fallback)
+        elif cache is not None:
+            write_cached(args, cache, extractor, source, sink, fallback)
+        elif args.timeout:
+            write_guarded(args, extractor, source, sink, fallback)
+        elif isinstance(extractor, TemplateRouter):
+            for line_number, signature, record in extractor.extract_many(source, fallback):
+                if args.matched_only and not any(record):
+                    continue
+                sink.write(json.dumps({"line": line_number, "template": signature, **record._asdict()}, ensure_ascii=False))
+                sink.write("\n")
+        else:
+            for line_number, line in enumerate(source, 1):
+                if line.isspace():
+                    continue
+                record = extractor.extract(line)
+                if args.matched_only and not any(record):
+                    continue
+                sink.write(json.dumps({"line": line_number, **record._asdict()}, ensure_ascii=False))
+                sink.write("\n")
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+        else:
+            sink.flush()
+        fallback.close(args.quiet)
+    return 0
+
+def write_columns(args, extractor, source, fallback):
+    """Extract into one file per column under args.columns (bin.columns), holding at most --memory-limit MiB of values."""
+    templated = isinstance(extractor, TemplateRouter)
+    columns = ("line", "template", *FIELDS) if templated else ("line", *FIELDS)
+    writer = ColumnWriter(args.columns, columns, args.memory_limit * 1024 * 1024)
+    try:
+        if templated:
+            for line_number, signature, record in extractor.extract_many(source, fallback):
+                if args.matched_only and not any(record):
+                    continue
+                writer.append((line_number, signature, *record))
+        else:
+            extract = extractor.extract
+            for line_number, line in enumerate(source, 1):
+                if line.isspace():
+                    continue
+                record = extract(line)
+                if args.matched_only and not any(record):
+                    continue
+                writer.append((line_number, *record))
+    finally:
+        writer.close()
+    if not args.quiet:
+        print(f"{writer.rows:,} rows written to {args.columns} in {writer.flushes} flushes", file=sys.stderr)
+
+def write_cached(args, cache, extractor, source, sink, fallback):
+    """Extract through an ExtractionCache: only lines it has no record of with these patterns are searched."""
+    try:
+        for (line_number, signature), record in cache.extract_many(guarded_lines(extractor, source, fallback)):
+            if args.matched_only and not any(record):
+                continue
+            body = {"line": line_number} if signature is None else {"line": line_number, "template": signature}
+            body.update(record._asdict())
+            sink.write(json.dumps(body, ensure_ascii=False))
+            sink.write("\n")
+    finally:
+        cache.close()
+    if not args.quiet:
+        print(f"cache: {cache.hits:,} lines reused, {cache.misses:,} extracted"
+              + (f", {cache.evicted:,} records evicted" if cache.evicted else ""), file=sys.stderr)
+
+def write_guarded(args, extractor, source, sink, fallback):
+    """
+    Extract with every search limited to args.timeout seconds; records gain "timed_out": [fields] when one ran out,
+    and "skipped": [fields] the guard didn't search because their pattern had timed out too often in the chunk.
+    """
+    guard = RegexGuard(args.timeout)
+    try:
+        for (line_number, signature), record, timed_out, skipped in guard.extract_many(guarded_lines(extractor, source, fallback)):
+            if args.matched_only and not any(record) and not timed_out and not skipped:
+                continue
+            body = {"line": line_number} if signature is None else {"line": line_number, "template": signature}
+            body.update(record._asdict())
+            if timed_out:
+                body["timed_out"] = list(timed_out)
+            if skipped:
+                body["skipped"] = list(skipped)
+            sink.write(json.dumps(body, ensure_ascii=False))
+            sink.write("\n")
+    finally:
+        guard.close()
+    if guard.timed_out and not args.quiet:
+        print(f"{guard.timed_out:,} searches timed out after {args.timeout:g} s"
+              + (f", {guard.skipped:,} skipped" if guard.skipped else ""), file=sys.stderr)
+
+def run_extract_sharded(args, extractor):
+    jobs = args.jobs or cpu_count()
+    began = time.perf_counter()
+
+    def report(shard, shards, lines, seconds):
+        if not args.quiet:
+            rate = lines / seconds if seconds else 0
+            print(f"shard {shard}/{shards}: {lines:,} lines in {seconds:.2f} s ({rate:,.0f} lines/s)", file=sys.stderr)
+
+    router = extractor if isinstance(extractor, TemplateRouter) else None
+    sink = open_output(args.output)
+    fallback = FallbackQueue(args.fallback)
+    try:
+        total = extract_file_sharded(
+            None if router else dict(extractor.patterns), args.input, sink, jobs, args.encoding, args.matched_only,
+            args.shard_size * 1024 * 1024, report, router, fallback, args.timeout
+        )
+    except OSError as e:
+        print(f"bossex extract: {e}", file=sys.stderr)
+        return 2
+    finally:
+        if sink is not sys.stdout:
+            sink.close()
+        else:
+            sink.flush()
+        fallback.close(args.quiet)
+    if not args.quiet:
+        elapsed = time.perf_counter() - began
+        print(f"{total:,} lines in {elapsed:.2f} s with {jobs} processes ({total / elapsed if elapsed else 0:,.0f} lines/s)", file=sys.stderr)
+    return 0
+
+def run_search(args):
+    try:
+        load_config(args.config, args.engine)
+        extractor = Extractor.from_file(args.patterns)
+    except (OSError, ValueError, re.error) as e:
+        print(f"bossex search: {e}", file=sys.stderr)
+        return 2
+    if not can_shard(args.encoding):
+        print(f"bossex search: {args.encoding} is not an ASCII-compatible encoding", file=sys.stderr)
+        return 2
+    began = time.perf_counter()
+    matched = 0
+    sink = open_output(args.output)
+    try:
+        for offset, record in scan_file(args.input, extractor, args.field, args.all, args.encoding):
+            sink.write(json.dumps({"offset": offset, **record._asdict()}, ensure_ascii=False))
+            sink.write("\n")
+            matched += 1
+    except OSError as e:
+        print(f"bossex search: {e}", file=sys.stderr)
+        return 2
+    finally:
+        if sink is not sys.stdout:
+            sink.close()
+        else:
+            sink.flush()
+    if not args.quiet:
+        print(f"{matched:,} matching lines in {time.perf_counter() - began:.2f} s", file=sys.stderr)
+    return 0
+
+def load_config(path, engine=None):
+    with open(path, "r") as f:
+        config = json.load(f)
+    load_registry(config, engine)
+    configure_timezones(config)
+    return config
+
+def load_config_and_timezone(command, args):
+    """(config, timezone) for a command taking --config/--timezone, or None after reporting the problem."""
+    try:
+        config = load_config(args.config, args.engine)
+    except (OSError, ValueError) as e:
+        print(f"bossex {command}: {e}", file=sys.stderr)
+        return None
+    timezones = [tz["friendly_name"] for tz in config["timezones"]]
+    timezone = args.timezone or timezones[0]
+    if timezone not in timezones:
+        print(f"bossex {command}: unknown timezone {timezone!r} (choose from {', '.join(timezones)})", file=sys.stderr)
+        return None
+    return config, timezone
+
+def run_profile(args):
+    loaded = load_config_and_timezone("profile", args)
+    if loaded is None:
+        return 2
+    config, timezone = loaded
+    detect_separator, count_separators_before = separator_helpers([item["symbol"] for item in config["separators"]])
+
+    source = open_source("profile", args)
+    if source is None:
+        return 2
+    sink = open_output(args.output)
+    try:
+        for line_number, line in enumerate(source, 1):
+            text = line.strip()
+            if not text:
+                continue
+            with record_stages() as stages:
+                auto_process(text, config, timezone, detect_separator, count_separators_before)
+            sink.write(json.dumps({"line": line_number, "stages": stages}, ensure_ascii=False))
+            sink.write("\n")
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+        else:
+            sink.flush()
+    return 0
+
+def run_synthesize(args):
+    loaded = load_config_and_timezone("synthesize", args)
+    if loaded is None:
+        return 2
+    config, timezone = loaded
+    source = open_source("synthesize", args)
+    if source is None:
+        return 2
+    try:
+        lines = [text for text in (line.strip() for line in source) if text]
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    if not lines:
+        print("bossex synthesize: no listings in input", file=sys.stderr)
+        return 2
+
+    consensus = synthesize_patterns(
+        lines, config, timezone, *separator_helpers([item["symbol"] for item in config["separators"]]), probe_count=args.probes
+    )
+    for field, result in consensus.items():
+        misses = f" (first misses: listings {', '.join(str(i + 1) for i in result['failures'])})" if result["failures"] else ""
+        print(f"{field}: {result['matched']}/{result['total']}{misses}", file=sys.stderr)
+
+    sink = open_output(args.output)
+    try:
+        json.dump({field: result["pattern"] for field, result in consensus.items()}, sink, indent=2, ensure_ascii=False)
+        sink.write("\n")
+    finally:
+        if sink is not sys.stdout:
+            sink.close()
+        else:
+            sink.flush()
+    return 0
+
+def run_templates(args):
+    loaded = load_config_and_timezone("templates", args)
+    if loaded is None:
+        return 2
+    config, timezone = loaded
+    source = open_source("templates", args)
+    if source is None:
+        return 2
+    try:
+        templates, total = mine_templates(
+            source, config, timezone, *separator_helpers([item["symbol"] for item in config["separators"]]),
+            min_lines=args.min_lines
+        )
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    if not total:
+        print("bossex templates: no listings in input", file=sys.stderr)
+        return 2
+
+    for template in templates:
+        print(f"{template['signature']}: {template['lines']:,} lines ({template['lines'] / total:.1%}), "
+              f"{template['matched']}/{template['checked']} checked lines matched", file=sys.stderr)
+    covered = sum(template["lines"] for template in templates)
+    print(f"{len(templates)} templates cover {covered:,} of {total:,} lines ({covered / total:.1%})", file=sys.stderr)
+
+    sink = open_output(args.output)
+    try:
+        json.dump({
+            "total": total,
+            "vocabulary": shape_vocabulary(config),
+            "templates": [{key: value for key, value in template.items() if key != "extractor"} for template in templates],
+        }, sink, indent=2, ensure_ascii=False)
+        sink.write("\n")
+    finally:
+        if sink is not sys.stdout:
+            sink.close()
+        else:
+            sink.flush()
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="bossex", description="Headless BossEx tools.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    extract = commands.add_parser("extract", help="Apply a saved pattern set to every line of a listings file (JSONL output).")
+    extract.add_argument("patterns", help="Saved pattern set: JSON keyed by name/title/time/date, or Copy All text.")
+    extract.add_argument("input", nargs="?", default="-", help="Listings file, one listing per line ('-' for stdin).")
+    extract.add_argument("-o", "--output", default="-", help="JSONL output file ('-' for stdout).")
+    extract.add_argument("--encoding", default="utf-8", help="Input file encoding (default: utf-8).")
+    extract.add_argument("--config", default=CONFIG_PATH, help="config.json to use (default: bin/config.json).")
+    extract.add_argument("--matched-only", action="store_true", help="Skip lines where no field matched.")
+    extract.add_argument("-j", "--jobs", type=int, default=1, help="Worker processes for a sharded run (0: one per CPU; default: 1).")
+    extract.add_argument("--shard-size", type=int, default=16, help="Shard size in MiB for --jobs (default: 16).")
+    extract.add_argument("--fallback", help="With a templates file: write lines of no known shape here ('-' for stdout).")
+    extract.add_argument("--timeout", type=float, help="Give up on a pattern after this many seconds on one line; its field is listed under \"timed_out\".")
+    extract.add_argument("--columns", metavar="DIRECTORY", help="Write one JSON-lines file per column here instead of JSONL records.")
+    extract.add_argument("--memory-limit", type=int, default=DEFAULT_MEMORY_LIMIT // (1024 * 1024),
+                         help=f"With --columns: MiB of values buffered before they are written (default: {DEFAULT_MEMORY_LIMIT // (1024 * 1024)}).")
+    extract.add_argument("--cache", help="SQLite file of records kept across runs: lines already extracted with these patterns are reused.")
+    extract.add_argument("--cache-size", type=int, default=DEFAULT_MAX_SIZE // (1024 * 1024),
+                         help=f"MiB of records the cache keeps, least recently used evicted first (default: {DEFAULT_MAX_SIZE // (1024 * 1024)}).")
+    extract.add_argument("--rebuild-cache", action="store_true", help="Empty the cache before extracting.")
+    extract.add_argument("--no-cache", action="store_true", help="Ignore --cache (neither read nor written).")
+    extract.add_argument("-q", "--quiet", action="store_true", help="No per-shard progress, fallback count or cache summary on stderr.")
+    extract.set_defaults(func=run_extract)
+
+    search = commands.add_parser("search", help="List the lines of a (large) listings file a pattern set matches, by byte offset (JSONL output).")
+    search.add_argument("patterns", help="Saved pattern set: JSON keyed by name/title/time/date, or Copy All text.")
+    search.add_argument("input", help="Listings file, one listing per line (memory-mapped, so not stdin).")
+    search.add_argument("-o", "--output", default="-", help="JSONL output file ('-' for stdout).")
+    search.add_argument("--encoding", default="utf-8", help="Input file encoding, ASCII-compatible (default: utf-8).")
+    search.add_argument("--config", default=CONFIG_PATH, help="config.json to use (default: bin/config.json).")
+    search.add_argument("--field", action="append", choices=FIELDS, help="Field whose pattern must match (repeatable; default: every field with a pattern).")
+    search.add_argument("--all", action="store_true", help="A line must match every --field pattern, not just one.")
+    search.add_argument("-q", "--quiet", action="store_true", help="No match count on stderr.")
+    search.set_defaults(func=run_search)
+
+    profile = commands.add_parser("profile", help="Run Auto on every line of a listings file and dump per-stage timings (JSONL output).")
+    profile.add_argument("input", nargs="?", default="-", help="Listings file, one listing per line ('-' for stdin).")
+    profile.add_argument("-o", "--output", default="-", help="JSONL output file ('-' for stdout).")
+    profile.add_argument("--timezone", help="Timezone friendly name from config.json (default: the first one).")
+    profile.add_argument("--config", default=CONFIG_PATH, help="config.json to use (default: bin/config.json).")
+    profile.add_argument("--encoding", default="utf-8", help="Input file encoding (default: utf-8).")
+    profile.set_defaults(func=run_profile)
+
+    synthesize = commands.add_parser("synthesize", help="Build one pattern set that holds across every line of a listings file (JSON output).")
+    synthesize.add_argument("input", nargs="?", default="-", help="Listings file, one listing per line ('-' for stdin).")
+    synthesize.add_argument("-o", "--output", default="-", help="Pattern set JSON file ('-' for stdout).")
+    synthesize.add_argument("--timezone", help="Timezone friendly name from config.json (default: the first one).")
+    synthesize.add_argument("--config", default=CONFIG_PATH, help="config.json to use (default: bin/config.json).")
+    synthesize.add_argument("--encoding", default="utf-8", help="Input file encoding (default: utf-8).")
+    synthesize.add_argument("--probes", type=int, default=DEFAULT_PROBE_COUNT, help=f"Listings Auto proposes candidates from (default: {DEFAULT_PROBE_COUNT}).")
+    synthesize.set_defaults(func=run_synthesize)
+
+    templates = commands.add_parser("templates", help="Mine one pattern set per line layout of a mixed listings file (JSON output).")
+    templates.add_argument("input", nargs="?", default="-", help="Listings file, one listing per line ('-' for stdin).")
+    templates.add_argument("-o", "--output", default="-", help="Templates JSON file ('-' for stdout).")
+    templates.add_argument("--timezone", help="Timezone friendly name from config.json (default: the first one).")
+    templates.add_argument("--config", default=CONFIG_PATH, help="config.json to use (default: bin/config.json).")
+    templates.add_argument("--encoding", default="utf-8", help="Input file encoding (default: utf-8).")
+    templates.add_argument("--min-lines", type=int, default=1, help="Smallest cluster that gets a template (default: 1).")
+    templates.set_defaults(func=run_templates)
+    for command in (extract, search, profile, synthesize, templates):
+        command.add_argument("--engine", choices=ENGINES, help="Regex engine for the field patterns (default: config.json's regex_engine, or re).")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Frozen builds: RegexGuard and --jobs worker processes start by re-running this script
+    sys.exit(main())
@@ -1,6 +1,5 @@
 import os
 import sys
-import re
 import json # Still needed for config.json
 from kivy.app import App
 from kivy.uix.boxlayout import BoxLayout
@@ -10,20 +9,37 @@ from kivy.uix.button import Button
 from kivy.uix.textinput import TextInput
 from kivy.uix.spinner import Spinner
 from kivy.uix.checkbox import CheckBox
-from kivy.uix.scrollview import ScrollView
 from kivy.uix.popup import Popup
 from kivy.uix.image import Image # For loading PNG logo
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.core.clipboard import Clipboard
 from kivy.properties import ObjectProperty, StringProperty, BooleanProperty, DictProperty, ListProperty
 from kivy.logger import Logger
 from kivy.metrics import dp
+from kivy.clock import Clock
 
 # Import your processing modules from the 'bin' directory
 # These imports assume 'bin' is added to sys.path by main.py
 from name_field import process_name_field
 from title_field import process_title_field
-from time_field import process_time_field, refresh_time_field
+from time_field import process_time_field, refresh_time_field, find_time_candidates
 from date_field import process_date_field, refresh_date_field
 from auto import auto_process
+from bin.separators import separator_index, separator_helpers
+from bin.date_components import build_base_pattern, identify_components
+from bin.patterns import compile_pattern, load_registry
+from bin.instrument import record_stages, format_stages
+from bin.worker import BackgroundRunner
+from bin.extract import TestAllGrid
+from bin.guard import RegexGuard, check_patterns, DEFAULT_TIMEOUT
+from bin.samples import SampleList
+from bin.consensus import synthesize_patterns
+from bin.timezones import configure_timezones, timezone_score
+
+# Pause in typing (seconds) before a live Test All runs
+LIVE_TEST_ALL_DELAY = 0.3
 
 # Helper: get file path whether .py or PyInstaller .exe or Kivy on Android
 # This resource_path is for locating assets relative to the Kivy app's execution.
@@ -41,13 +57,48 @@ def resource_path(relative_path):
 
     return os.path.join(base_path, relative_path)
 
+class SampleRow(RecycleDataViewBehavior, BoxLayout):
+    """One recycled sample row (number, check, Copy, text), rebound to whichever sample scrolls into its place."""
+    row = None
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.spacing = dp(2)
+        self.app = App.get_running_app()
+        self.number = Label(size_hint_x=None, width=dp(40))
+        self.checkbox = CheckBox(size_hint_x=None, width=dp(30))
+        self.checkbox.bind(active=self.on_check)
+        copy_btn = Button(text="Copy", size_hint_x=None, width=dp(60),
+                          on_release=lambda instance: self.app.copy_single_field(f"sample_{self.row}"))
+        self.text_input = TextInput(multiline=False)
+        self.text_input.bind(text=self.on_text)
+        for widget in (self.number, self.checkbox, copy_btn, self.text_input):
+            self.add_widget(widget)
+
+    def refresh_view_attrs(self, rv, index, data):
+        super().refresh_view_attrs(rv, index, data)  # Sets self.row first, so the updates below are no-op edits
+        samples = self.app.samples
+        self.number.text = str(self.row + 1)
+        self.checkbox.active = self.row in samples.checked
+        if self.text_input.text != samples.texts[self.row]:
+            self.text_input.text = samples.texts[self.row]
+        # Kivy TextInput has no per-range tags, so a highlighted sample gets a light green background
+        self.text_input.background_color = [0.8, 1, 0.8, 1] if samples.row_highlights(self.row) else [1, 1, 1, 1]
+
+    def on_check(self, instance, value):
+        if self.row is not None:
+            self.app.samples.set_checked(self.row, value)
+
+    def on_text(self, instance, value):
+        if self.row is not None and value != self.app.samples.texts[self.row]:
+            self.app.samples.set_text(self.row, value)
+            self.app.schedule_live_test_all()
+
 class BossExApp(App):
     # Kivy Properties for data binding and UI updates
     config = DictProperty({})
     timezone_options = ListProperty([])
     timezone_selection = StringProperty('')
-    sample_texts = ListProperty(['' for _ in range(5)])
-    sample_check_states = DictProperty({f'sample_{i}': False for i in range(5)})
     regex_expressions = DictProperty({'name': '', 'title': '', 'time': '', 'date': ''})
     regex_check_states = DictProperty({f'regex_{field}': False for field in ['name', 'title', 'time', 'date']})
     format_expressions = DictProperty({'time': '', 'date': ''})
@@ -56,11 +107,11 @@ class BossExApp(App):
     extraction_check_state = BooleanProperty(False)
     test_all_output = StringProperty('')
     test_all_check_state = BooleanProperty(False)
+    live_test_all = BooleanProperty(False)
     anchor_enabled = DictProperty({"time": True, "date": True})
 
     # Internal state for processing
     current_field = StringProperty(None, allownone=True)
-    calculated_samples = DictProperty({i: [] for i in range(5)}) # Store highlights
     last_separator = DictProperty({"time": None, "date": None})
     last_pattern = DictProperty({"time": None, "date": None})
     last_time_matches = ListProperty([]) # Store time matches from auto_process
@@ -69,8 +120,18 @@ class BossExApp(App):
         super().__init__(**kwargs)
         # The config is now passed directly from main.py
         self.config = kwargs.get('config', {})
-        self.max_samples = 5
+        self.samples = SampleList()  # Sample texts, Copy All checks and highlights
         self.possible_separators = [item["symbol"] for item in self.config.get("separators", [])]
+        self.detect_separator, self.count_separators_before = separator_helpers(self.possible_separators)
+        load_registry(self.config)
+        configure_timezones(self.config)
+        self.last_stages = []  # Stage timings of the last Auto/Alt. run
+        # Auto/Alt./Test All run on worker threads; results come back through Clock.schedule_once on the UI thread
+        self.worker = BackgroundRunner(lambda fn: Clock.schedule_once(lambda dt: fn()), on_busy=self.set_busy)
+        # Edited patterns run with a time budget per search ("regex_timeout" in config.json), so a runaway one can't hang the app
+        self.regex_guard = RegexGuard(self.config.get("regex_timeout", DEFAULT_TIMEOUT))
+        self.test_all_grid = TestAllGrid(guard=self.regex_guard)  # Only cells whose sample or regex changed are re-evaluated
+        self.live_test_all_event = Clock.create_trigger(lambda dt: self.test_all(None), LIVE_TEST_ALL_DELAY)
         self.timezone_options = [tz["friendly_name"] for tz in self.config.get("timezones", [])]
         if self.timezone_options:
             self.timezone_selection = self.timezone_options[0]
@@ -104,30 +165,28 @@ class BossExApp(App):
         timezone_spinner.bind(text=self.setter('timezone_selection'))
         timezone_layout.add_widget(timezone_spinner)
         timezone_layout.add_widget(Button(text="Auto", size_hint_x=None, width=dp(80), on_release=self.auto_process))
+        timezone_layout.add_widget(Button(text="Consensus", size_hint_x=None, width=dp(110), on_release=self.consensus_process))
+        self.busy_label = Label(text="", size_hint_x=None, width=dp(100))
+        timezone_layout.add_widget(self.busy_label)
         timezone_layout.add_widget(Label()) # Spacer
         self.root_widget.add_widget(timezone_layout)
 
-        # Sample Area
-        sample_scroll_view = ScrollView(size_hint_y=None, height=dp(200))
-        self.sample_grid = GridLayout(cols=3, size_hint_y=None, spacing=dp(2), padding=dp(5))
-        self.sample_grid.bind(minimum_height=self.sample_grid.setter('height'))
-
-        for i in range(self.max_samples):
-            checkbox = CheckBox(size_hint_x=None, width=dp(30), active=self.sample_check_states[f'sample_{i}'])
-            checkbox.bind(active=lambda instance, value, idx=i: self._set_check_state(f'sample_{idx}', value))
-            self.sample_grid.add_widget(checkbox)
-
-            copy_btn = Button(text="Copy", size_hint_x=None, width=dp(60), on_release=lambda instance, idx=i: self.copy_single_field(f"sample_{idx}"))
-            self.sample_grid.add_widget(copy_btn)
-
-            text_input = TextInput(text=f"SAMPLE DATA {i+1}", multiline=False, size_hint_y=None, height=dp(30),
-                                   on_text_validate=self.update_sample_text)
-            text_input.bind(text=lambda instance, value, idx=i: self._update_sample_text_list(idx, value))
-            # Store reference to TextInput for later access (e.g., highlighting)
-            setattr(self, f'sample_text_input_{i}', text_input)
-            self.sample_grid.add_widget(text_input)
-        sample_scroll_view.add_widget(self.sample_grid)
-        self.root_widget.add_widget(sample_scroll_view)
+        # Sample Area (a RecycleView: only the rows in view have widgets)
+        self.sample_view = RecycleView(size_hint_y=None, height=dp(200))
+        sample_layout = RecycleBoxLayout(orientation='vertical', size_hint_y=None, spacing=dp(2), padding=dp(5),
+                                         default_size=(None, dp(30)), default_size_hint=(1, None))
+        sample_layout.bind(minimum_height=sample_layout.setter('height'))
+        self.sample_view.add_widget(sample_layout)
+        self.sample_view.viewclass = SampleRow
+        self.sample_view.data = [{"row": i} for i in range(len(self.samples))]
+        self.root_widget.add_widget(self.sample_view)
+
+        sample_tools = BoxLayout(size_hint_y=None, height=dp(40), spacing=dp(5))
+        sample_tools.add_widget(Button(text="Paste Lines", size_hint_x=None, width=dp(120), on_release=self.paste_samples))
+        self.sample_count_label = Label(text=f"{len(self.samples)} samples", size_hint_x=None, width=dp(120))
+        sample_tools.add_widget(self.sample_count_label)
+        sample_tools.add_widget(Label()) # Spacer
+        self.root_widget.add_widget(sample_tools)
 
         # Selection buttons
         button_layout = BoxLayout(size_hint_y=None, height=dp(40), spacing=dp(5))
@@ -137,6 +196,11 @@ class BossExApp(App):
         button_layout.add_widget(Button(text="Date", on_release=lambda x: self.select_field("date")))
         button_layout.add_widget(Button(text="Copy All", on_release=self.copy_all))
         button_layout.add_widget(Button(text="Test All", on_release=self.test_all))
+        button_layout.add_widget(Button(text="Timings", on_release=self.show_timings))
+        live_checkbox = CheckBox(size_hint_x=None, width=dp(30), active=self.live_test_all)
+        live_checkbox.bind(active=self.setter('live_test_all'))
+        button_layout.add_widget(live_checkbox)
+        button_layout.add_widget(Label(text="Live", size_hint_x=None, width=dp(40)))
         self.root_widget.add_widget(button_layout)
 
         # Regex and extraction
@@ -213,50 +277,30 @@ class BossExApp(App):
         self.root_widget.add_widget(test_all_layout)
 
         # Bind properties to update UI
-        self.bind(sample_texts=self.update_sample_text_inputs)
         self.bind(regex_expressions=self.update_regex_entries)
         self.bind(format_expressions=self.update_format_entries)
         self.bind(extraction_text=self.update_extraction_entry)
         self.bind(test_all_output=self.update_test_all_text)
+        self.bind(regex_expressions=self.schedule_live_test_all, live_test_all=self.schedule_live_test_all)
 
         return self.root_widget
 
     def _set_check_state(self, key, value):
-        if key.startswith('sample_'):
-            self.sample_check_states[key] = value
-        elif key.startswith('regex_'):
+        if key.startswith('regex_'):
             self.regex_check_states[key] = value
         elif key.startswith('format_'):
             self.format_check_states[key] = value
 
-    def _update_sample_text_list(self, idx, value):
-        # Update the internal list property when a TextInput changes
-        temp_list = list(self.sample_texts)
-        temp_list[idx] = value
-        self.sample_texts = temp_list
+    def refresh_samples(self):
+        # Rebind the visible sample rows to their (possibly re-highlighted) samples
+        self.sample_view.refresh_from_data()
 
-    def update_sample_text_inputs(self, instance, value):
-        # Update TextInput widgets when sample_texts property changes (e.g., after auto_process)
-        for i, text_val in enumerate(value):
-            text_input_widget = getattr(self, f'sample_text_input_{i}')
-            if text_input_widget.text != text_val:
-                text_input_widget.text = text_val
-            # Clear existing highlights before applying new ones
-            text_input_widget.background_color = [1, 1, 1, 1] # White background
-
-        # Re-apply highlights based on calculated_samples
-        for sample_idx, highlights in self.calculated_samples.items():
-            text_input_widget = getattr(self, f'sample_text_input_{sample_idx}')
-            full_text = text_input_widget.text
-            # Kivy TextInput doesn't have direct tag_add like Tkinter.
-            # For highlighting, we'd typically need to use markup or a custom widget.
-            # For now, we'll just set the background color of the whole input if it's highlighted.
-            # A more sophisticated solution for specific word highlighting would involve Kivy Text Markup.
-            # For simplicity, if any part of a sample is highlighted, we'll change the whole input's background.
-            if highlights:
-                text_input_widget.background_color = [0.8, 1, 0.8, 1] # Light green for highlighted
-            else:
-                text_input_widget.background_color = [1, 1, 1, 1] # White
+    def paste_samples(self, instance):
+        # Replace the samples with the clipboard's lines, e.g. a pasted feed to validate patterns against
+        count = self.samples.load_lines(Clipboard.paste() or "")
+        self.sample_view.data = [{"row": i} for i in range(count)]
+        self.sample_count_label.text = f"{count} samples"
+        self.schedule_live_test_all()
 
     def update_regex_entries(self, instance, value):
         for field, text_val in value.items():
@@ -285,12 +329,15 @@ class BossExApp(App):
         output = ""
         if field_key.startswith("sample_"):
             idx = int(field_key.split("_")[1])
-            content = getattr(self, f'sample_text_input_{idx}').text.strip()
+            content = self.samples.text(idx) if idx < len(self.samples) else ""
             output = f"Sample {idx+1}: {content}"
         elif field_key.startswith("regex_"):
             field = field_key.split("_")[1]
             content = self.regex_expressions[field].strip()
             output = f"{field.capitalize()} Regex: {content}"
+            if content:
+                self.copy_checked({field: content}, output, f"Copied to clipboard: {output}")
+                return
         elif field_key.startswith("format_"):
             field = field_key.split("_")[1]
             content = self.format_expressions[field].strip()
@@ -300,24 +347,44 @@ class BossExApp(App):
             output = f"Extraction: {content}"
 
         if output:
-            from kivy.app import App
-            App.get_running_app().clipboard.copy(output)
-            self.show_message("Success", f"Copied to clipboard: {output}")
+            self.copy_to_clipboard(output, f"Copied to clipboard: {output}")
         else:
             self.show_message("Warning", "No content to copy.")
 
+    def copy_to_clipboard(self, output, success_message):
+        from kivy.app import App
+        App.get_running_app().clipboard.copy(output)
+        self.show_message("Success", success_message)
+
+    def copy_checked(self, patterns, output, success_message):
+        # Copy-time validation: the patterns run over the samples through the guard, off the UI thread;
+        # problems are shown with the confirmation instead of blocking the copy
+        samples = self.samples.valid_samples()
+
+        def done(problems):
+            self.copy_to_clipboard(output, success_message + ("\n\nCheck before use:\n" + "\n".join(problems) if problems else ""))
+
+        self.worker.submit("copy", lambda token: check_patterns(self.regex_guard, patterns, samples, token), done, self.show_worker_error)
+
+    def show_timings(self, instance):
+        if not self.last_stages:
+            self.show_message("Timings", "No timings yet. Run Auto or Alt. first.")
+            return
+        self.show_message("Timings", "\n".join(format_stages(self.last_stages)))
+
     def copy_all(self, instance):
         output = []
-        for i in range(self.max_samples):
-            if self.sample_check_states[f"sample_{i}"]:
-                content = getattr(self, f'sample_text_input_{i}').text.strip()
-                if content:
-                    output.append(f"Sample {i+1}: {content}")
+        for i in self.samples.checked_rows():
+            content = self.samples.text(i)
+            if content:
+                output.append(f"Sample {i+1}: {content}")
+        patterns = {}
         for field in ["name", "title", "time", "date"]:
             if self.regex_check_states[f"regex_{field}"]:
                 content = self.regex_expressions[field].strip()
                 if content:
                     output.append(f"{field.capitalize()} Regex: {content}")
+                    patterns[field] = content
         for field in ["time", "date"]:
             if self.format_check_states[f"format_{field}"]:
                 content = self.format_expressions[field].strip()
@@ -332,55 +399,18 @@ class BossExApp(App):
             if content:
                 output.append("Test All Extractions:\n" + content)
 
-        if output:
-            from kivy.app import App
-            App.get_running_app().clipboard.copy("\n".join(output))
-            self.show_message("Success", "Selected fields copied to clipboard!")
+        if output and patterns:
+            self.copy_checked(patterns, "\n".join(output), "Selected fields copied to clipboard!")
+        elif output:
+            self.copy_to_clipboard("\n".join(output), "Selected fields copied to clipboard!")
         else:
             self.show_message("Warning", "No fields selected or no content to copy.")
 
     def find_previous_separator(self, text, end_idx):
-        latest_pos = -1
-        latest_sep = None
-        for sep in self.possible_separators:
-            pattern = fr"(?:(?<=[\S])\s*{re.escape(sep)}\s*|^\s*{re.escape(sep)}\s*|\s*{re.escape(sep)}\s*(?=[\S])|\s*{re.escape(sep)}\s*$)"
-            matches = [m for m in re.finditer(pattern, text[:end_idx])]
-            if matches:
-                pos = matches[-1].start()
-                if pos > latest_pos:
-                    latest_pos = pos
-                    latest_sep = sep
-        return latest_sep, latest_pos
+        return separator_index(text, self.possible_separators).previous_separator(end_idx)
 
     def find_next_separator(self, text, start_idx):
-        earliest_pos = len(text)
-        earliest_sep = None
-        for sep in self.possible_separators:
-            pattern = fr"(?:(?<=[\S])\s*{re.escape(sep)}\s*|^\s*{re.escape(sep)}\s*|\s*{re.escape(sep)}\s*(?=[\S])|\s*{re.escape(sep)}\s*$)"
-            matches = [m for m in re.finditer(pattern, text[start_idx:])]
-            if matches:
-                pos = matches[0].start() + start_idx
-                if pos < earliest_pos:
-                    earliest_pos = pos
-                    earliest_sep = sep
-        return earliest_sep, earliest_pos
-
-    def count_separators_before(self, text, start_idx, separator):
-        pattern = fr"(?:(?<=[\S])\s*{re.escape(separator)}\s*|^\s*{re.escape(separator)}\s*|\s*{re.escape(separator)}\s*(?=[\S])|\s*{re.escape(separator)}\s*$)"
-        matches = list(re.finditer(pattern, text[:start_idx]))
-        return len(matches)
-
-    def detect_separator(self, text):
-        max_segments = 1
-        selected_separator = None
-        for sep in self.possible_separators:
-            pattern = fr"(?:(?<=[\S])\s*{re.escape(sep)}\s*|^\s*{re.escape(sep)}\s*|\s*{re.escape(sep)}\s*(?=[\S])|\s*{re.escape(sep)}\s*$)"
-            matches = list(re.finditer(pattern, text))
-            segments = len(matches) + 1
-            if segments > max_segments:
-                max_segments = segments
-                selected_separator = sep
-        return selected_separator if selected_separator else "|"
+        return separator_index(text, self.possible_separators).next_separator(start_idx)
 
     def toggle_anchor(self, field):
         if field not in ["time", "date"]:
@@ -403,7 +433,7 @@ class BossExApp(App):
         # working with the full text of the first sample input.
         # To simulate Tkinter's selection, we'll take the first sample text.
         
-        full_text = getattr(self, f'sample_text_input_{0}').text.strip()
+        full_text = self.samples.text(0)
         # For simplicity in Kivy, we'll assume the "selection" is just the full text
         # of the first sample input, or you'd need a custom selection mechanism.
         # If you have a specific selection, you'd need to get it from the TextInput's
@@ -448,17 +478,17 @@ class BossExApp(App):
                 self.config["name_patterns"], self.possible_separators
             )
             # Kivy doesn't have direct highlight tags like Tkinter.
-            # We'll update calculated_samples and rely on update_sample_text_inputs to apply a general highlight.
+            # We'll update the sample highlights and rely on refresh_samples to apply a general highlight.
             if pattern and part:
-                match = re.search(pattern, full_text, re.IGNORECASE)
+                match = compile_pattern(pattern).search(full_text)
                 if match:
                     start_idx = match.start()
                     end_idx = match.end()
-                    self.calculated_samples[0] = [(start_idx, end_idx, field)]
+                    self.samples.set_highlights(0, [(start_idx, end_idx, field)])
                 else:
-                    self.calculated_samples[0] = []
+                    self.samples.set_highlights(0, [])
             else:
-                self.calculated_samples[0] = []
+                self.samples.set_highlights(0, [])
             self.anchor_enabled[field] = False # Name/Title don't use anchor
             
         elif field == "title":
@@ -467,15 +497,15 @@ class BossExApp(App):
                 self.possible_separators, self.detect_separator
             )
             if pattern and part:
-                match = re.search(pattern, full_text, re.IGNORECASE)
+                match = compile_pattern(pattern).search(full_text)
                 if match:
                     start_idx = match.start()
                     end_idx = match.end()
-                    self.calculated_samples[0] = [(start_idx, end_idx, field)]
+                    self.samples.set_highlights(0, [(start_idx, end_idx, field)])
                 else:
-                    self.calculated_samples[0] = []
+                    self.samples.set_highlights(0, [])
             else:
-                self.calculated_samples[0] = []
+                self.samples.set_highlights(0, [])
             self.anchor_enabled[field] = False
 
         elif field == "time":
@@ -487,15 +517,15 @@ class BossExApp(App):
                 self.count_separators_before, tz_matches
             )
             if pattern and part:
-                match = re.search(pattern, full_text, re.IGNORECASE)
+                match = compile_pattern(pattern).search(full_text)
                 if match:
                     start_idx = match.start()
                     end_idx = match.end()
-                    self.calculated_samples[0] = [(start_idx, end_idx, field)]
+                    self.samples.set_highlights(0, [(start_idx, end_idx, field)])
                 else:
-                    self.calculated_samples[0] = []
+                    self.samples.set_highlights(0, [])
             else:
-                self.calculated_samples[0] = []
+                self.samples.set_highlights(0, [])
             separator, _ = self.find_previous_separator(full_text, start_idx)
             self.last_separator[field] = separator if separator else "|"
             base_pattern = r"|".join(self.config["time_formats"])
@@ -510,19 +540,19 @@ class BossExApp(App):
                 self.count_separators_before, tz_matches
             )
             if pattern and part:
-                match = re.search(pattern, full_text, re.IGNORECASE)
+                match = compile_pattern(pattern).search(full_text)
                 if match:
                     start_idx = match.start()
                     end_idx = match.end()
-                    self.calculated_samples[0] = [(start_idx, end_idx, field)]
+                    self.samples.set_highlights(0, [(start_idx, end_idx, field)])
                 else:
-                    self.calculated_samples[0] = []
+                    self.samples.set_highlights(0, [])
             else:
-                self.calculated_samples[0] = []
+                self.samples.set_highlights(0, [])
             separator, _ = self.find_previous_separator(full_text, start_idx)
             self.last_separator[field] = separator if separator else "|"
             components = identify_components(selected_text, self.config["days"], self.config["months"])
-            base_pattern = build_base_pattern(components, self.config["days"], self.config["months"])
+            base_pattern = build_base_pattern(components, self.config["days"], self.config["months"], spacing=r"\s*")
             self.last_pattern[field] = fr"({base_pattern})"
         else:
             return
@@ -533,71 +563,110 @@ class BossExApp(App):
             self.format_expressions[field] = format_str if format_str else "No format detected"
         
         # Trigger UI update for highlights
-        self.update_sample_text_inputs(None, self.sample_texts)
+        self.refresh_samples()
 
 
     def auto_process(self, instance):
-        full_text = getattr(self, f'sample_text_input_{0}').text.strip()
+        full_text = self.samples.text(0)
         if not full_text or full_text.startswith("SAMPLE DATA"):
             self.show_message("Warning", "Please enter valid text in Sample 1.")
             return
 
         timezone = self.timezone_selection
-        results = auto_process(full_text, self.config, timezone, self.detect_separator, self.count_separators_before)
-
-        # Store time matches for refresh
-        self.last_time_matches = []
-        for pattern_str in self.config["time_formats"]:
-            for match in re.finditer(pattern_str, full_text, re.IGNORECASE):
-                time_text = match.group(0)
-                start_idx = match.start()
-                is_am_pm = bool(re.search(r'[AaPp][Mm]$', time_text, re.IGNORECASE))
-                selected_tz = next((tz for tz in self.config["timezones"] if tz["friendly_name"] == timezone), None)
-                tz_score = 0
-                if selected_tz:
-                    for m in selected_tz["match"]:
-                        tz_pos = full_text[max(0, start_idx-20):start_idx].upper().rfind(m)
-                        if tz_pos != -1:
-                            tz_score = max(tz_score, 20 - tz_pos)
-                self.last_time_matches.append((start_idx, start_idx + len(time_text), time_text, pattern_str, is_am_pm, tz_score))
-        self.last_time_matches.sort(key=lambda x: (-x[5], not x[4], x[0]))
+
+        def job(token):
+            with record_stages() as stages:
+                results = auto_process(full_text, self.config, timezone, self.detect_separator, self.count_separators_before)
+            token.check()
+
+            # Store time matches for refresh
+            time_matches = []
+            selected_tz = next((tz for tz in self.config["timezones"] if tz["friendly_name"] == timezone), None)
+            for start_idx, end_idx, time_text, pattern_str, is_am_pm in find_time_candidates(full_text, self.config["time_formats"]):
+                tz_score = timezone_score(full_text, start_idx, selected_tz["match"]) if selected_tz else 0
+                time_matches.append((start_idx, end_idx, time_text, pattern_str, is_am_pm, tz_score))
+            time_matches.sort(key=lambda x: (-x[5], not x[4], x[0]))
+            return results, time_matches, stages
+
+        # A new Auto press replaces the one still running
+        self.worker.submit("auto", job, self.apply_auto_results, self.show_worker_error)
+
+    def apply_auto_results(self, outcome):
+        results, self.last_time_matches, self.last_stages = outcome
 
         # Clear existing fields and update with auto-processed results
         new_regex_expressions = self.regex_expressions.copy()
         new_format_expressions = self.format_expressions.copy()
-        new_calculated_samples = {0: []} # Reset highlights for sample 0
+        highlights = [] # Reset highlights for sample 0
 
         for field in ["name", "title", "time", "date"]:
-            new_regex_expressions[field] = results[field]["pattern"] or "No pattern detected"
+            new_regex_expressions[field] = results[field].pattern or "No pattern detected"
             if field in ["time", "date"]:
-                new_format_expressions[field] = results[field]["format"] or "No format detected"
+                new_format_expressions[field] = results[field].format or "No format detected"
             self.anchor_enabled[field] = True if field in ["time", "date"] else False
             if field in ["time", "date"]:
                 anchor_btn = getattr(self, f'anchor_button_{field}')
                 anchor_btn.text = "Anchor"
 
-            if results[field]["pattern"] and results[field]["start_idx"] is not None:
-                start_idx = results[field]["start_idx"]
-                end_idx = results[field]["end_idx"]
-                new_calculated_samples[0].append((start_idx, end_idx, field))
+            if results[field].pattern and results[field].start_idx is not None:
+                start_idx = results[field].start_idx
+                end_idx = results[field].end_idx
+                highlights.append((start_idx, end_idx, field))
 
         self.regex_expressions = new_regex_expressions
         self.format_expressions = new_format_expressions
-        self.calculated_samples = new_calculated_samples
+        self.samples.set_highlights(0, highlights)
 
         # Update extraction
-        extraction_parts = [f"{field}: {results[field]['extracted']}" for field in ["name", "title", "time", "date"] if results[field]["extracted"]]
+        extraction_parts = [f"{field}: {results[field].extracted}" for field in ["name", "title", "time", "date"] if results[field].extracted]
         self.extraction_text = " | ".join(extraction_parts)
         
         # Trigger UI update for highlights
-        self.update_sample_text_inputs(None, self.sample_texts)
+        self.refresh_samples()
+
+
+    def consensus_process(self, instance):
+        # Patterns that hold on every sample; highlighted spans (from Auto or the field buttons) mark the fields
+        samples = self.samples.valid_samples()
+        if not samples:
+            self.show_message("Warning", "Please enter sample text.")
+            return
+        rows = [row for row, _ in samples]
+        lines = [text for _, text in samples]
+        positions = {row: i for i, row in enumerate(rows)}
+        marks = {}
+        for row, highlights in self.samples.highlights.items():
+            if row in positions:
+                marks[positions[row]] = {field: (start_idx, end_idx) for start_idx, end_idx, field in highlights}
+        timezone = self.timezone_selection
+
+        def job(token):
+            with record_stages() as stages:
+                consensus = synthesize_patterns(lines, self.config, timezone, self.detect_separator, self.count_separators_before, marks, token=token)
+            return consensus, rows, stages
 
+        # Shares Auto's slot: either one replaces the other while it runs
+        self.worker.submit("auto", job, self.apply_consensus, self.show_worker_error)
+
+    def apply_consensus(self, outcome):
+        consensus, rows, self.last_stages = outcome
+        new_regex_expressions = self.regex_expressions.copy()
+        for field in ["name", "title", "time", "date"]:
+            new_regex_expressions[field] = consensus[field]["pattern"] or "No pattern detected"
+        self.regex_expressions = new_regex_expressions
+        self.extraction_text = " | ".join(f"{field}: {result['matched']}/{result['total']}" for field, result in consensus.items())
+        misses = [
+            f"{field}: sample {', '.join(str(rows[i] + 1) for i in result['failures'])}"
+            for field, result in consensus.items() if result["failures"]
+        ]
+        if misses:
+            self.show_message("Consensus", "No pattern matched every sample. First misses:\n" + "\n".join(misses))
 
     def refresh_field(self, field):
         if field not in ["time", "date"]:
             return
 
-        full_text = getattr(self, f'sample_text_input_{0}').text.strip()
+        full_text = self.samples.text(0)
         if not full_text or full_text.startswith("SAMPLE DATA"):
             self.show_message("Warning", "Please enter valid text in Sample 1.")
             return
@@ -615,16 +684,17 @@ class BossExApp(App):
                 current_extracted_value = part.replace(f"[{field}:", "").replace("]", "").strip()
                 break
 
-        pattern = ""
-        extracted = ""
-        format_str = ""
+        anchor_enabled = self.anchor_enabled[field]
 
         if field == "time":
-            pattern, extracted, format_str = refresh_time_field(
-                full_text, self.config["time_formats"], self.possible_separators,
-                self.config["days"], self.config["months"], self.anchor_enabled["time"],
-                self.detect_separator, self.count_separators_before, tz_matches, current_extracted_value
-            )
+            def job(token):
+                with record_stages() as stages:
+                    refreshed = refresh_time_field(
+                        full_text, self.config["time_formats"], self.possible_separators,
+                        self.config["days"], self.config["months"], anchor_enabled,
+                        self.detect_separator, self.count_separators_before, tz_matches, current_extracted_value
+                    )
+                return refreshed, stages
         elif field == "date":
             # For date, refresh_date_field needs selected_text, full_text, start_idx, end_idx
             # Since we don't have a direct selection in Kivy, we'll use the current extracted date
@@ -633,13 +703,17 @@ class BossExApp(App):
                 start_idx_current = full_text.find(current_extracted_value)
                 if start_idx_current != -1:
                     end_idx_current = start_idx_current + len(current_extracted_value)
-                    pattern, extracted, format_str = refresh_date_field(
-                        current_extracted_value, full_text, start_idx_current, end_idx_current,
-                        self.config["date_formats"], self.possible_separators,
-                        self.config["days"], self.config["months"],
-                        self.anchor_enabled["date"], self.detect_separator,
-                        self.count_separators_before
-                    )
+
+                    def job(token):
+                        with record_stages() as stages:
+                            refreshed = refresh_date_field(
+                                current_extracted_value, full_text, start_idx_current, end_idx_current,
+                                self.config["date_formats"], self.possible_separators,
+                                self.config["days"], self.config["months"],
+                                anchor_enabled, self.detect_separator,
+                                self.count_separators_before
+                            )
+                        return refreshed, stages
                 else:
                     self.show_message("Warning", f"Could not find '{current_extracted_value}' in sample text for date refresh.")
                     return
@@ -647,6 +721,10 @@ class BossExApp(App):
                 self.show_message("Warning", "No current date extraction to refresh.")
                 return
 
+        self.worker.submit("refresh", job, lambda outcome: self.apply_refreshed_field(field, full_text, outcome), self.show_worker_error)
+
+    def apply_refreshed_field(self, field, full_text, outcome):
+        (pattern, extracted, format_str), self.last_stages = outcome
         new_regex_expressions = self.regex_expressions.copy()
         new_format_expressions = self.format_expressions.copy()
         new_regex_expressions[field] = pattern if pattern else "No pattern detected"
@@ -670,16 +748,16 @@ class BossExApp(App):
         self.extraction_text = " | ".join(updated_extraction_parts)
 
         # Update highlights for the refreshed field
-        new_calculated_samples_for_0 = [h for h in self.calculated_samples[0] if h[2] != field]
+        new_highlights = []
         if extracted:
             start_idx = full_text.find(extracted)
             if start_idx != -1:
                 end_idx = start_idx + len(extracted)
-                new_calculated_samples_for_0.append((start_idx, end_idx, field))
-        self.calculated_samples[0] = new_calculated_samples_for_0
+                new_highlights.append((start_idx, end_idx, field))
+        self.samples.replace_field(0, field, new_highlights)
         
         # Trigger UI update for highlights
-        self.update_sample_text_inputs(None, self.sample_texts)
+        self.refresh_samples()
 
 
     def clear_field(self, field):
@@ -705,97 +783,38 @@ class BossExApp(App):
         self.extraction_text = " | ".join(updated_extraction_parts)
 
         # Clear highlights for the specific field across all samples
-        new_calculated_samples = self.calculated_samples.copy()
-        for sample_idx in range(self.max_samples):
-            remaining_highlights = [
-                (start_idx, end_idx, f) for start_idx, end_idx, f in new_calculated_samples[sample_idx]
-                if f != field
-            ]
-            new_calculated_samples[sample_idx] = remaining_highlights
-        self.calculated_samples = new_calculated_samples
+        self.samples.clear_field(field)
         
         # Trigger UI update for highlights
-        self.update_sample_text_inputs(None, self.sample_texts)
+        self.refresh_samples()
 
 
     def test_all(self, instance):
-        summary_lines = []
-        for i in range(self.max_samples):
-            full_text = getattr(self, f'sample_text_input_{i}').text.strip()
-            if full_text and not full_text.startswith("SAMPLE DATA"):
-                sample_summary = {"name": "", "title": "", "time": "", "date": ""}
-
-                for field in ["name", "title", "time", "date"]:
-                    pattern = self.regex_expressions[field].strip()
-                    if pattern and pattern != "No pattern detected":
-                        try:
-                            match = re.search(pattern, full_text, re.IGNORECASE)
-                            if match:
-                                # For name, group(0) is fine. For others, group(1) if available, else group(0)
-                                extracted = match.group(0).strip()
-                                if match.groups(): # If there are capturing groups, use the first one
-                                    extracted = match.group(1).strip()
-                                
-                                if field == "date":
-                                    extracted = re.sub(r"(th|rd|st|nd)", "", extracted).strip()
-                                sample_summary[field] = extracted
-                        except re.error as e:
-                            Logger.error(f"Error in {field} regex for sample {i+1}: {e}")
-
+        samples = self.samples.valid_samples()
+        patterns = {field: self.regex_expressions[field].strip() for field in ["name", "title", "time", "date"]}
+
+        def job(token):
+            summary_lines = []
+            for i, sample_summary, errors in self.test_all_grid.run(samples, patterns, token):
+                for field, error in errors:
+                    Logger.error(f"Error in {field} regex for sample {i+1}: {error}")
                 summary_lines.append(f"SAMPLE {i+1:<12} name: {sample_summary['name']:<30} title: {sample_summary['title']:<40} time: {sample_summary['time']:<15} date: {sample_summary['date']}")
+            return "\n".join(summary_lines)
+
+        self.worker.submit("test_all", job, self.show_test_all, self.show_worker_error)
+
+    def show_test_all(self, output):
+        self.test_all_output = output
+
+    def schedule_live_test_all(self, *args):
+        # Debounced: re-arming the trigger restarts its delay, so a live Test All runs once typing pauses
+        self.live_test_all_event.cancel()
+        if self.live_test_all:
+            self.live_test_all_event()
+
+    def set_busy(self, busy):
+        self.busy_label.text = "Working..." if busy else ""
 
-        self.test_all_output = "\n".join(summary_lines)
-
-# Helper functions (from your original gui.py, moved here or imported)
-# These functions need to be accessible within the Kivy app class or imported.
-# Since they are not part of the BossExApp class, they need to be defined outside it
-# or imported from a separate module if they are not already in bin.
-# Assuming they are in bin/date_field.py etc. as per your imports.
-
-def build_base_pattern(components, days, months):
-    day_short_pattern = "|".join(days["short"])
-    day_long_pattern = "|".join(days["long"])
-    month_short_pattern = "|".join(months["short"])
-    month_long_pattern = "|".join(months["long"])
-    date_pattern = r"\d{1,2}"
-    year_pattern = r"\d{2,4}"
-
-    pattern_parts = []
-    for comp_type, _, _, length in components:
-        if comp_type == "day":
-            pattern = f"({day_short_pattern})" if length == "short" else f"({day_long_pattern})"
-        elif comp_type == "month":
-            pattern = f"({month_short_pattern})" if length == "short" else f"({month_long_pattern})"
-        elif comp_type == "date":
-            pattern = f"({date_pattern})"
-        elif comp_type == "year":
-            pattern = f"({year_pattern})"
-        pattern_parts.append(pattern)
-
-    return r"\s*".join(pattern_parts) # Use \s* for flexible spacing
-
-def identify_components(selected_text, days, months):
-    cleaned_text = re.sub(r"(th|st|nd|rd)", "", selected_text).strip()
-    parts = re.findall(r'\S+', cleaned_text)
-    components = []
-
-    for i, part in enumerate(parts):
-        part_lower = part.lower()
-        if part_lower in [d.lower() for d in days["short"]]:
-            components.append(("day", part, i, "short"))
-        elif part_lower in [d.lower() for d in days["long"]]:
-            components.append(("day", part, i, "long"))
-        elif part_lower in [m.lower() for m in months["short"]]:
-            components.append(("month", part, i, "short"))
-        elif part_lower in [m.lower() for m in months["long"]]:
-            components.append(("month", part, i, "long"))
-        elif re.match(r"^\d{1,2}$", part):
-            try:
-                if int(part) <= 31: # Simple check for date day
-                    components.append(("date", part, i, None))
-            except ValueError:
-                pass
-        elif re.match(r"^\d{2,4}$", part):
-            components.append(("year", part, i, None))
-
-    return sorted(components, key=lambda x: x[2])
\ No newline at end of file
+    def show_worker_error(self, error):
+        Logger.error(f"Processing failed: {error}")
+        self.show_message("Error", f"Processing failed: {error}")
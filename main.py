@@ -1,6 +1,7 @@
 import os
 import sys
 import json
+import multiprocessing
 from kivy.logger import Logger
 from kivy.app import App
 
@@ -58,6 +59,7 @@ def load_or_generate_config():
         sys.exit(1)
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # PyInstaller builds: the regex guard's evaluation process starts with spawn
     setup_dependencies()
 
     try: